@@ -0,0 +1,234 @@
+import numpy as np
+import json
+import os
+
+from core.physics_predictor import WHEEL_ORDER, NUM_POCKETS
+
+# Posición de cada número en la rueda (inversa de WHEEL_ORDER)
+WHEEL_INDEX = np.empty(NUM_POCKETS, dtype=np.intp)
+WHEEL_INDEX[WHEEL_ORDER] = np.arange(NUM_POCKETS)
+
+# Residuos posibles (-18..18) e índices de la convolución circular:
+# SHIFT_INDEX[i, k] es la posición que acaba en i al desplazar RESIDUAL_SHIFTS[k]
+RESIDUAL_SHIFTS = np.arange(NUM_POCKETS) - NUM_POCKETS // 2
+SHIFT_INDEX = (np.arange(NUM_POCKETS)[:, None] - RESIDUAL_SHIFTS[None, :]) % NUM_POCKETS
+
+class LearningEngine:
+    """Aprendizaje incremental a partir de los resultados de cada giro
+
+    Todo el estado vive en arrays de NumPy de tamaño fijo y cada giro lo
+    actualiza en O(1), sin recorrer el histórico:
+    - frecuencias por número y por sector en una ventana deslizante de
+      `max_prediction_history` giros (se suma el nuevo y se resta el que sale)
+    - sesgo por número con pesos de decaimiento exponencial (escala global
+      perezosa para no reescalar el vector entero en cada giro)
+    - residuos del predictor (bolsillos de diferencia en la rueda entre el
+      número previsto y el real) con su histograma y momentos acumulados
+    """
+
+    def __init__(self, config_file=None):
+        if config_file is None:
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            config_file = os.path.join(project_root, 'config', 'settings.json')
+        self.config = self.load_config(config_file)
+        prediction_config = self.config.get('prediction', {})
+
+        self.min_training_spins = prediction_config.get('min_training_spins', 50)
+        self.capacity = prediction_config.get('max_prediction_history', 1000)
+
+        self.learning_params = {
+            'decay': 0.02,             # Peso del giro más reciente en el sesgo
+            'num_sectors': 8,          # Sectores de la rueda para las frecuencias por zona
+            'bias_strength': 0.5,      # Influencia del sesgo al ajustar una predicción
+        }
+
+        num_sectors = self.learning_params['num_sectors']
+        # Sector de cada número según su posición en la rueda
+        self.pocket_sector = (WHEEL_INDEX * num_sectors) // NUM_POCKETS
+
+        self.reset()
+
+    def load_config(self, config_file):
+        """Cargar configuración"""
+        try:
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+                print(f"✅ Configuración cargada desde: {config_file}")
+                return config
+        except Exception as e:
+            print(f"❌ Error cargando configuración: {e}")
+            return {}
+
+    def reset(self):
+        """Borrar todo lo aprendido"""
+        num_sectors = self.learning_params['num_sectors']
+
+        # Ventana deslizante de resultados y residuos (buffers circulares)
+        self.results = np.zeros(self.capacity, dtype=np.int8)
+        self.residuals = np.zeros(self.capacity, dtype=np.int8)
+        self.has_residual = np.zeros(self.capacity, dtype=bool)
+        self.head = 0
+        self.count = 0
+        self.total_spins = 0
+
+        self.window_counts = np.zeros(NUM_POCKETS, dtype=np.int64)
+        self.sector_counts = np.zeros(num_sectors, dtype=np.int64)
+        self.total_counts = np.zeros(NUM_POCKETS, dtype=np.int64)
+
+        # Sesgo con decaimiento: valor real = bias_weights * bias_scale
+        self.bias_weights = np.full(NUM_POCKETS, 1.0 / NUM_POCKETS)
+        self.bias_scale = 1.0
+
+        # Residuos en bolsillos de rueda, desplazados a 0..36 (18 = sin error)
+        self.residual_counts = np.zeros(NUM_POCKETS, dtype=np.int64)
+        self.residual_sum = 0
+        self.residual_sq_sum = 0
+        self.residual_samples = 0
+
+    def record_spin(self, number, predicted=None):
+        """Registrar el resultado de un giro (y el número previsto, si lo hubo)"""
+        number = int(number)
+        slot = self.head
+
+        # Sacar de la ventana el giro más antiguo si el buffer está lleno
+        if self.count == self.capacity:
+            old = self.results[slot]
+            self.window_counts[old] -= 1
+            self.sector_counts[self.pocket_sector[old]] -= 1
+            if self.has_residual[slot]:
+                old_residual = int(self.residuals[slot])
+                self.residual_counts[old_residual + NUM_POCKETS // 2] -= 1
+                self.residual_sum -= old_residual
+                self.residual_sq_sum -= old_residual * old_residual
+                self.residual_samples -= 1
+        else:
+            self.count += 1
+
+        self.results[slot] = number
+        self.window_counts[number] += 1
+        self.sector_counts[self.pocket_sector[number]] += 1
+        self.total_counts[number] += 1
+        self.total_spins += 1
+
+        # Sesgo: en lugar de multiplicar todo el vector por (1 - decay) se
+        # divide la escala, y el nuevo giro entra con el peso reescalado
+        decay = self.learning_params['decay']
+        self.bias_scale *= (1.0 - decay)
+        self.bias_weights[number] += decay / self.bias_scale
+        if self.bias_scale < 1e-12:
+            self.bias_weights *= self.bias_scale
+            self.bias_scale = 1.0
+
+        if predicted is not None:
+            residual = self.wheel_distance(int(predicted), number)
+            self.residuals[slot] = residual
+            self.has_residual[slot] = True
+            self.residual_counts[residual + NUM_POCKETS // 2] += 1
+            self.residual_sum += residual
+            self.residual_sq_sum += residual * residual
+            self.residual_samples += 1
+        else:
+            self.has_residual[slot] = False
+
+        self.head = (slot + 1) % self.capacity
+
+    @staticmethod
+    def wheel_distance(predicted, actual):
+        """Bolsillos de rueda desde `predicted` hasta `actual` (-18..18)"""
+        delta = WHEEL_INDEX[actual] - WHEEL_INDEX[predicted]
+        return int((delta + NUM_POCKETS // 2) % NUM_POCKETS - NUM_POCKETS // 2)
+
+    def is_ready(self):
+        """Indica si hay suficientes giros para aplicar lo aprendido"""
+        return self.count >= self.min_training_spins
+
+    def get_frequencies(self):
+        """Frecuencia de cada número en la ventana actual"""
+        if self.count == 0:
+            return np.full(NUM_POCKETS, 1.0 / NUM_POCKETS)
+        return self.window_counts / self.count
+
+    def get_sector_frequencies(self):
+        """Frecuencia de cada sector de la rueda en la ventana actual"""
+        if self.count == 0:
+            return np.full(len(self.sector_counts), 1.0 / len(self.sector_counts))
+        return self.sector_counts / self.count
+
+    def get_bias(self):
+        """Probabilidad por número ponderada con decaimiento exponencial"""
+        weights = self.bias_weights * self.bias_scale
+        return weights / weights.sum()
+
+    def get_residual_stats(self):
+        """Media y desviación de los residuos del predictor (en bolsillos)"""
+        if self.residual_samples == 0:
+            return {'mean': 0.0, 'std': 0.0, 'samples': 0}
+        mean = self.residual_sum / self.residual_samples
+        variance = max(self.residual_sq_sum / self.residual_samples - mean * mean, 0.0)
+        return {'mean': mean, 'std': float(np.sqrt(variance)), 'samples': self.residual_samples}
+
+    def adjust_probabilities(self, probabilities):
+        """Corregir una distribución del predictor físico con lo aprendido
+
+        Aplica la distribución empírica de residuos (convolución circular en
+        el orden de la rueda) y pondera por el sesgo observado. Hasta alcanzar
+        `min_training_spins` devuelve la distribución sin cambios.
+        """
+        if not self.is_ready():
+            return probabilities
+
+        in_wheel_order = np.asarray(probabilities, dtype=np.float64)[WHEEL_ORDER]
+
+        if self.residual_samples > 0:
+            # Desplazar cada predicción según la frecuencia de cada residuo
+            kernel = self.residual_counts / self.residual_samples
+            in_wheel_order = in_wheel_order[SHIFT_INDEX] @ kernel
+
+        adjusted = np.empty(NUM_POCKETS)
+        adjusted[WHEEL_ORDER] = in_wheel_order
+
+        strength = self.learning_params['bias_strength']
+        adjusted *= np.maximum(1.0 + strength * (self.get_bias() * NUM_POCKETS - 1.0), 0.0)
+
+        total = adjusted.sum()
+        return adjusted / total if total > 0 else np.asarray(probabilities, dtype=np.float64)
+
+    def get_state(self):
+        """Estado serializable (para guardar en learned_parameters)"""
+        return {
+            'capacity': self.capacity,
+            'head': self.head,
+            'count': self.count,
+            'total_spins': self.total_spins,
+            'results': self.results.tolist(),
+            'residuals': self.residuals.tolist(),
+            'has_residual': self.has_residual.tolist(),
+            'total_counts': self.total_counts.tolist(),
+            'bias': self.get_bias().tolist()
+        }
+
+    def load_state(self, state):
+        """Restaurar un estado guardado con get_state()"""
+        self.reset()
+        results = np.asarray(state['results'], dtype=np.int8)
+        residuals = np.asarray(state['residuals'], dtype=np.int8)
+        has_residual = np.asarray(state['has_residual'], dtype=bool)
+        count = int(state['count'])
+        head = int(state['head'])
+        capacity = len(results)
+
+        # Reproducir la ventana en orden cronológico
+        start = (head - count) % capacity
+        for i in range(count):
+            slot = (start + i) % capacity
+            number = int(results[slot])
+            predicted = None
+            if has_residual[slot]:
+                predicted = int(WHEEL_ORDER[(WHEEL_INDEX[number] - int(residuals[slot])) % NUM_POCKETS])
+            self.record_spin(number, predicted)
+
+        self.total_spins = int(state.get('total_spins', self.total_spins))
+        self.total_counts = np.asarray(state.get('total_counts', self.total_counts), dtype=np.int64)
+        bias = np.asarray(state.get('bias', self.get_bias()), dtype=np.float64)
+        self.bias_weights = bias / bias.sum()
+        self.bias_scale = 1.0
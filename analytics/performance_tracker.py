@@ -0,0 +1,252 @@
+import numpy as np
+import json
+import threading
+import time
+from bisect import bisect_right
+
+# Etapas del pipeline medidas por defecto
+DEFAULT_STAGES = (
+    'capture',
+    'conversion',
+    'wheel_detection',
+    'ball_detection',
+    'tracking',
+    'prediction',
+    'db_write',
+)
+
+# Límites (segundos) de los buckets exportados en formato Prometheus
+PROMETHEUS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                      0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class StageTimer:
+    """Cronómetro reutilizable de una etapa (uso con `with`)"""
+
+    __slots__ = ('tracker', 'index', 'start_ns')
+
+    def __init__(self, tracker, index):
+        self.tracker = tracker
+        self.index = index
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracker.record_index(self.index, time.perf_counter_ns() - self.start_ns)
+        return False
+
+
+class NullTimer:
+    """Cronómetro vacío para cuando la instrumentación está desactivada"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class PerformanceTracker:
+    """Histogramas de latencia por etapa con coste mínimo por medida
+
+    Cada etapa tiene un histograma preasignado de buckets log-lineales
+    (potencias de 2 subdivididas en `sub_buckets` partes, error relativo
+    < 1/sub_buckets) entre 1 µs y ~70 s. Registrar una medida es una
+    búsqueda binaria y un incremento; los percentiles se calculan solo al
+    pedir el resumen. Un cerrojo protege los histogramas: el hilo productor
+    de captura registra medidas mientras el principal registra y exporta.
+    """
+
+    def __init__(self, stages=DEFAULT_STAGES, sub_buckets=8, enabled=True):
+        self.enabled = enabled
+        self.stages = list(stages)
+        self.stage_ids = {name: i for i, name in enumerate(self.stages)}
+
+        # Límites superiores de los buckets en nanosegundos
+        bounds = []
+        for exponent in range(10, 37):
+            base = 1 << exponent
+            for step in range(sub_buckets):
+                bounds.append(base + (base * step) // sub_buckets)
+        self.bounds = bounds
+        self.bounds_ns = np.array(bounds + [bounds[-1] * 2], dtype=np.int64)
+
+        self._timers = [StageTimer(self, i) for i in range(len(self.stages))]
+        self._null_timer = NullTimer()
+        # Reentrante: el resumen y las exportaciones llaman a percentile()
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """Vaciar todos los histogramas"""
+        with self._lock:
+            n_stages = len(self.stages)
+            # Listas de Python: incrementar un entero es mucho más barato que en un array
+            self.counts = [[0] * (len(self.bounds) + 1) for _ in range(n_stages)]
+            self.totals_ns = [0] * n_stages
+            self.samples = [0] * n_stages
+            self.min_ns = [None] * n_stages
+            self.max_ns = [0] * n_stages
+            self.started_at = time.time()
+
+    def add_stage(self, name):
+        """Registrar una etapa adicional"""
+        with self._lock:
+            if name in self.stage_ids:
+                return self.stage_ids[name]
+            # Histogramas antes que el índice: otro hilo puede usarlo en cuanto aparece
+            index = len(self.stages)
+            self.counts.append([0] * (len(self.bounds) + 1))
+            self.totals_ns.append(0)
+            self.samples.append(0)
+            self.min_ns.append(None)
+            self.max_ns.append(0)
+            self._timers.append(StageTimer(self, index))
+            self.stages.append(name)
+            self.stage_ids[name] = index
+            return index
+
+    def measure(self, stage):
+        """Cronómetro de contexto para `stage`: with tracker.measure('capture'): ..."""
+        if not self.enabled:
+            return self._null_timer
+        index = self.stage_ids.get(stage)
+        if index is None:
+            index = self.add_stage(stage)
+        return self._timers[index]
+
+    def start(self):
+        """Marca de tiempo inicial para record(stage, tracker.start())"""
+        return time.perf_counter_ns()
+
+    def stop(self, stage, start_ns):
+        """Registrar el tiempo transcurrido desde `start_ns`"""
+        self.record(stage, time.perf_counter_ns() - start_ns)
+
+    def record(self, stage, duration_ns):
+        """Registrar una duración (ns) en la etapa `stage`"""
+        if not self.enabled:
+            return
+        index = self.stage_ids.get(stage)
+        if index is None:
+            index = self.add_stage(stage)
+        self.record_index(index, duration_ns)
+
+    def record_index(self, index, duration_ns):
+        """Registrar una duración (ns) por índice de etapa (ruta rápida)"""
+        bucket = bisect_right(self.bounds, duration_ns)
+        with self._lock:
+            self.counts[index][bucket] += 1
+            self.totals_ns[index] += duration_ns
+            self.samples[index] += 1
+            if self.min_ns[index] is None or duration_ns < self.min_ns[index]:
+                self.min_ns[index] = duration_ns
+            if duration_ns > self.max_ns[index]:
+                self.max_ns[index] = duration_ns
+
+    def percentile(self, stage, q):
+        """Percentil `q` (0-100) de la etapa, en milisegundos"""
+        with self._lock:
+            index = self.stage_ids[stage]
+            total = self.samples[index]
+            if total == 0:
+                return 0.0
+            cumulative = np.cumsum(self.counts[index])
+            max_ns = self.max_ns[index]
+        bucket = int(np.searchsorted(cumulative, q / 100.0 * total))
+        bucket = min(bucket, len(self.bounds_ns) - 1)
+        # Límite superior del bucket acotado por el máximo observado
+        return min(int(self.bounds_ns[bucket]), max_ns) / 1e6
+
+    def get_summary(self):
+        """Resumen por etapa: muestras, media, mínimo, máximo y p50/p95/p99 (ms)"""
+        with self._lock:
+            summary = {}
+            for stage, index in self.stage_ids.items():
+                count = self.samples[index]
+                if count == 0:
+                    continue
+                summary[stage] = {
+                    'count': count,
+                    'mean_ms': self.totals_ns[index] / count / 1e6,
+                    'min_ms': self.min_ns[index] / 1e6,
+                    'max_ms': self.max_ns[index] / 1e6,
+                    'p50_ms': self.percentile(stage, 50),
+                    'p95_ms': self.percentile(stage, 95),
+                    'p99_ms': self.percentile(stage, 99),
+                    'total_ms': self.totals_ns[index] / 1e6
+                }
+            return summary
+
+    def snapshot(self):
+        """Instantánea completa (resumen + histogramas no vacíos)"""
+        with self._lock:
+            histograms = {}
+            for stage, index in self.stage_ids.items():
+                counts = np.array(self.counts[index], dtype=np.int64)
+                nonzero = np.nonzero(counts)[0]
+                histograms[stage] = {
+                    'upper_bounds_ns': self.bounds_ns[nonzero].tolist(),
+                    'counts': counts[nonzero].tolist()
+                }
+            return {
+                'started_at': self.started_at,
+                'timestamp': time.time(),
+                'stages': self.get_summary(),
+                'histograms': histograms
+            }
+
+    def export_json(self, path=None):
+        """Exportar la instantánea como JSON (y guardarla en `path` si se indica)"""
+        data = json.dumps(self.snapshot(), indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(data)
+        return data
+
+    def export_prometheus(self, prefix='ruleta'):
+        """Exportar los histogramas en formato de texto de Prometheus"""
+        with self._lock:
+            name = f"{prefix}_stage_latency_seconds"
+            lines = [
+                f"# HELP {name} Latencia por etapa del pipeline de detección",
+                f"# TYPE {name} histogram",
+            ]
+            for stage, index in self.stage_ids.items():
+                cumulative = np.cumsum(self.counts[index])
+                for le in PROMETHEUS_BUCKETS:
+                    # Buckets finos cuyo límite superior cabe en `le`
+                    fine = bisect_right(self.bounds, int(le * 1e9))
+                    count = int(cumulative[fine - 1]) if fine > 0 else 0
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {count}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {self.samples[index]}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {self.totals_ns[index] / 1e9:.9f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {self.samples[index]}')
+
+            quantile_name = f"{prefix}_stage_latency_quantile_seconds"
+            lines.append(f"# HELP {quantile_name} Percentiles de latencia por etapa")
+            lines.append(f"# TYPE {quantile_name} gauge")
+            for stage, index in self.stage_ids.items():
+                if self.samples[index] == 0:
+                    continue
+                for q in (50, 95, 99):
+                    value = self.percentile(stage, q) / 1e3
+                    lines.append(f'{quantile_name}{{stage="{stage}",quantile="{q / 100}"}} {value:.9f}')
+            return "\n".join(lines) + "\n"
+
+    def print_report(self):
+        """Mostrar una tabla con la latencia de cada etapa"""
+        summary = self.get_summary()
+        if not summary:
+            print("📊 Sin medidas de rendimiento")
+            return
+        print("📊 Latencia por etapa (ms):")
+        print(f"  {'etapa':<16}{'n':>8}{'media':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+        for stage, s in summary.items():
+            print(f"  {stage:<16}{s['count']:>8}{s['mean_ms']:>9.3f}{s['p50_ms']:>9.3f}"
+                  f"{s['p95_ms']:>9.3f}{s['p99_ms']:>9.3f}{s['max_ms']:>9.3f}")
@@ -0,0 +1,210 @@
+import numpy as np
+import time
+
+class BallTracker:
+    """Seguimiento de la bola con un filtro de Kalman en coordenadas polares
+
+    El estado es (ángulo, velocidad angular, aceleración angular, radio)
+    relativo al centro de la rueda bloqueada: θ en radianes, ω en rad/s,
+    α en rad/s² y ρ en píxeles.
+    El modelo es de aceleración angular constante con ruido de tirón
+    (jerk) blanco. A partir de la predicción se calcula una ventana de
+    búsqueda pequeña para detect_ball; cuando la bola se pierde varios
+    frames seguidos la ventana desaparece y se vuelve a la búsqueda completa.
+    """
+
+    def __init__(self):
+        self.params = {
+            'jerk_noise': 3.0,            # Ruido del modelo (rad/s³) para θ, ω, α
+            'radius_noise': 30.0,         # Ruido del modelo para el radio (px/√s)
+            'measurement_noise_px': 3.0,  # Error típico de la posición medida (px)
+            'initial_velocity_std': 20.0, # Incertidumbre inicial de ω (rad/s)
+            'initial_accel_std': 5.0,     # Incertidumbre inicial de α (rad/s²)
+            'gate_sigma': 4.0,            # Distancia de Mahalanobis máxima para aceptar una medida
+            'window_sigma': 3.0,          # Tamaño de la ventana en desviaciones típicas
+            'min_window': 24,             # Semilado mínimo de la ventana (px)
+            'max_window': 120,            # Semilado máximo de la ventana (px)
+            'max_misses': 5,              # Frames sin bola antes de dar el seguimiento por perdido
+            'min_updates_for_window': 3,  # Medidas necesarias antes de confiar en la ventana
+        }
+
+        self.H = np.array([[1.0, 0.0, 0.0, 0.0],
+                           [0.0, 0.0, 0.0, 1.0]])
+        self.reset()
+
+    def reset(self):
+        """Descartar el seguimiento actual"""
+        self.x = np.zeros(4)
+        self.P = np.eye(4)
+        self.timestamp = None
+        self.tracking = False
+        self.misses = 0
+        self.updates = 0
+
+    def is_tracking(self):
+        """Indica si hay una trayectoria activa"""
+        return self.tracking
+
+    def to_polar(self, ball_position, wheel):
+        """Convertir una posición (x, y) a (ángulo, radio) respecto al centro de la rueda"""
+        cx, cy = float(wheel[0]), float(wheel[1])
+        dx = ball_position[0] - cx
+        dy = ball_position[1] - cy
+        return np.arctan2(dy, dx), np.hypot(dx, dy)
+
+    def to_cartesian(self, angle, radius, wheel):
+        """Convertir (ángulo, radio) a coordenadas del frame"""
+        return (float(wheel[0]) + radius * np.cos(angle),
+                float(wheel[1]) + radius * np.sin(angle))
+
+    def transition(self, dt):
+        """Matrices F y Q del modelo de aceleración angular constante"""
+        F = np.array([[1.0, dt, 0.5 * dt * dt, 0.0],
+                      [0.0, 1.0, dt, 0.0],
+                      [0.0, 0.0, 1.0, 0.0],
+                      [0.0, 0.0, 0.0, 1.0]])
+
+        # Ruido de tirón blanco integrado sobre dt
+        q = self.params['jerk_noise'] ** 2
+        dt2, dt3, dt4, dt5 = dt * dt, dt ** 3, dt ** 4, dt ** 5
+        Q = np.zeros((4, 4))
+        Q[:3, :3] = q * np.array([[dt5 / 20, dt4 / 8, dt3 / 6],
+                                  [dt4 / 8, dt3 / 3, dt2 / 2],
+                                  [dt3 / 6, dt2 / 2, dt]])
+        Q[3, 3] = self.params['radius_noise'] ** 2 * dt
+        return F, Q
+
+    def predict(self, timestamp):
+        """Avanzar el estado hasta `timestamp` (segundos, reloj monotónico)"""
+        if not self.tracking:
+            return None
+
+        dt = timestamp - self.timestamp
+        if dt > 0:
+            F, Q = self.transition(dt)
+            self.x = F @ self.x
+            self.P = F @ self.P @ F.T + Q
+            self.timestamp = timestamp
+        return self.x.copy()
+
+    def update(self, ball_position, wheel, timestamp=None):
+        """Incorporar la detección del frame (None si no se encontró la bola)
+
+        Devuelve True si la medida se aceptó en la trayectoria.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if wheel is None:
+            self.reset()
+            return False
+
+        if not self.tracking:
+            if ball_position is None:
+                return False
+            self._start(ball_position, wheel, timestamp)
+            return True
+
+        self.predict(timestamp)
+
+        if ball_position is None:
+            return self._miss()
+
+        angle, radius = self.to_polar(ball_position, wheel)
+        measurement_std = self.params['measurement_noise_px']
+        R = np.diag([(measurement_std / max(radius, 1.0)) ** 2, measurement_std ** 2])
+
+        innovation = np.array([angle - self.x[0], radius - self.x[3]])
+        # Ángulo envuelto a [-π, π)
+        innovation[0] = (innovation[0] + np.pi) % (2 * np.pi) - np.pi
+
+        S = self.H @ self.P @ self.H.T + R
+        S_inv = np.linalg.inv(S)
+        if innovation @ S_inv @ innovation > self.params['gate_sigma'] ** 2:
+            # Fuera de la puerta de validación: reflejo u otro objeto brillante
+            return self._miss()
+
+        K = self.P @ self.H.T @ S_inv
+        self.x = self.x + K @ innovation
+        self.x[0] = (self.x[0] + np.pi) % (2 * np.pi) - np.pi
+        self.P = (np.eye(4) - K @ self.H) @ self.P
+        self.misses = 0
+        self.updates += 1
+        return True
+
+    def _start(self, ball_position, wheel, timestamp):
+        """Iniciar una trayectoria nueva a partir de una detección"""
+        angle, radius = self.to_polar(ball_position, wheel)
+        self.x = np.array([angle, 0.0, 0.0, radius])
+        angle_std = self.params['measurement_noise_px'] / max(radius, 1.0)
+        self.P = np.diag([angle_std ** 2,
+                          self.params['initial_velocity_std'] ** 2,
+                          self.params['initial_accel_std'] ** 2,
+                          self.params['measurement_noise_px'] ** 2])
+        self.timestamp = timestamp
+        self.tracking = True
+        self.misses = 0
+        self.updates = 1
+
+    def _miss(self):
+        """Registrar un frame sin medida válida"""
+        self.misses += 1
+        if self.misses > self.params['max_misses']:
+            self.reset()
+        return False
+
+    def predicted_position(self, wheel, timestamp=None):
+        """Posición (x, y) prevista en `timestamp` sin modificar el estado"""
+        if not self.tracking:
+            return None
+        x = self.x
+        if timestamp is not None and timestamp > self.timestamp:
+            F, _ = self.transition(timestamp - self.timestamp)
+            x = F @ x
+        return self.to_cartesian(x[0], x[3], wheel)
+
+    def get_search_window(self, wheel, image_shape, timestamp=None):
+        """Ventana (x0, y0, x1, y1) donde buscar la bola, o None para búsqueda completa"""
+        if not self.tracking or wheel is None:
+            return None
+        if self.updates < self.params['min_updates_for_window']:
+            # Velocidad aún sin estimar: la predicción no es fiable todavía
+            return None
+
+        x, P = self.x, self.P
+        if timestamp is not None and timestamp > self.timestamp:
+            F, Q = self.transition(timestamp - self.timestamp)
+            x = F @ x
+            P = F @ P @ F.T + Q
+
+        px, py = self.to_cartesian(x[0], x[3], wheel)
+        # Incertidumbre de la posición: componente tangencial (ρ·σθ) y radial (σρ)
+        position_std = np.sqrt(x[3] ** 2 * P[0, 0] + P[3, 3])
+        half = self.params['window_sigma'] * position_std
+        half = int(np.clip(half, self.params['min_window'], self.params['max_window']))
+
+        height, width = image_shape[:2]
+        x0 = max(0, int(px) - half)
+        y0 = max(0, int(py) - half)
+        x1 = min(width, int(px) + half + 1)
+        y1 = min(height, int(py) + half + 1)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return (x0, y0, x1, y1)
+
+    def get_state(self):
+        """Estado ajustado de la bola para el predictor físico"""
+        if not self.tracking:
+            return None
+        return {
+            'angle': float(self.x[0]),
+            'angular_velocity': float(self.x[1]),
+            # Desaceleración positiva = la bola pierde velocidad, gire en el sentido que gire
+            'angular_deceleration': float(-self.x[2] * np.sign(self.x[1])),
+            'radius': float(self.x[3]),
+            'angle_std': float(np.sqrt(self.P[0, 0])),
+            'velocity_std': float(np.sqrt(self.P[1, 1])),
+            'deceleration_std': float(np.sqrt(self.P[2, 2])),
+            'timestamp': self.timestamp,
+            'updates': self.updates,
+            'misses': self.misses
+        }
@@ -0,0 +1,438 @@
+import cv2
+import numpy as np
+import json
+import os
+import queue
+import time
+import multiprocessing as mp
+from functools import partial
+from multiprocessing import shared_memory
+
+from core.ball_tracker import BallTracker
+from core.detection_results import WheelDetection
+
+# Marca de fin en las colas entre procesos
+STOP = None
+
+def _wait_free_slot(free_slots, stop_event, drop_when_full):
+    """Slot libre del ring, o None si hay que descartar el frame"""
+    if drop_when_full:
+        try:
+            return free_slots.get_nowait()
+        except queue.Empty:
+            return None
+    while not stop_event.is_set():
+        try:
+            return free_slots.get(timeout=0.5)
+        except queue.Empty:
+            continue
+    return None
+
+def _capture_process(source_factory, shm, frame_shape, ring_slots, free_slots, tasks,
+                     stop_event, drop_when_full, dropped, workers):
+    """Proceso de captura: copia cada frame a un slot libre del ring y lo anuncia"""
+    ring = np.ndarray((ring_slots,) + frame_shape, dtype=np.uint8, buffer=shm.buf)
+    source = None
+    seq = 0
+    try:
+        # Dentro del try: si el origen no se puede abrir los workers reciben igualmente STOP
+        source = source_factory()
+        if drop_when_full is None:
+            # En vivo se descarta si los workers van por detrás; en repetición se espera
+            drop_when_full = source.live
+        while not stop_event.is_set():
+            frame, timestamp = source.read()
+            if frame is None:
+                if source.finished:
+                    break
+                continue
+            if frame.shape != frame_shape:
+                print(f"❌ Tamaño de frame inesperado: {frame.shape} != {frame_shape}")
+                continue
+
+            slot = _wait_free_slot(free_slots, stop_event, drop_when_full)
+            if slot is None:
+                with dropped.get_lock():
+                    dropped.value += 1
+                continue
+
+            np.copyto(ring[slot], frame)
+            tasks.put((seq, slot, timestamp))
+            seq += 1
+    except Exception as e:
+        print(f"❌ Error en proceso de captura: {e}")
+    finally:
+        if source is not None:
+            source.close()
+        for _ in range(workers):
+            tasks.put(STOP)
+        del ring
+        shm.close()
+
+def _detection_worker(worker_id, config_file, shm, frame_shape, ring_slots, free_slots,
+                      tasks, results, detect_ball, ball_method=None):
+    """Proceso de detección: lee frames del ring sin copiarlos y devuelve solo datos
+
+    `detect_ball` es un flag compartido: con 0 solo se busca la rueda.
+    `ball_method` sustituye a detection.ball_method de la configuración.
+    """
+    from core.roulette_detector import RouletteDetector
+
+    # Un hilo de OpenCV por proceso: el paralelismo lo dan los procesos
+    cv2.setNumThreads(1)
+    ring = np.ndarray((ring_slots,) + frame_shape, dtype=np.uint8, buffer=shm.buf)
+
+    detector = RouletteDetector(config_file)
+    detector.set_verbose(False)
+    # Cada worker ve frames no consecutivos: la puerta de movimiento y el
+    # seguimiento se hacen en orden en el proceso principal
+    detector.gate_params['enabled'] = False
+    detector.tracking_enabled = False
+    if ball_method is not None:
+        detector.ball_params['method'] = ball_method
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is STOP:
+                break
+            seq, slot, timestamp = task
+            start = time.perf_counter()
+            wheel = None
+            ball = None
+            searched = bool(detect_ball.value)
+            try:
+                frame = ring[slot]
+                wheel = detector.detect_roulette(frame)
+                if wheel is not None:
+                    wheel = WheelDetection(*(int(v) for v in wheel))
+                    if searched:
+                        ball, _ = detector.track_ball(frame, wheel, None, timestamp)
+            except Exception as e:
+                print(f"❌ Error en worker {worker_id}: {e}")
+            finally:
+                free_slots.put(slot)
+            latency_ms = (time.perf_counter() - start) * 1000
+            results.put((seq, timestamp, wheel, ball, searched, worker_id, latency_ms))
+    finally:
+        results.put((STOP, worker_id))
+        del ring
+        shm.close()
+
+
+class DetectionPipeline:
+    """Pipeline multiproceso: captura → ring en memoria compartida → workers de detección
+
+    Un proceso de captura escribe cada frame en un slot libre de un buffer
+    circular de `multiprocessing.shared_memory` y envía (secuencia, slot,
+    timestamp) por una cola; los workers leen el slot como vista de NumPy
+    sin copiarlo, detectan rueda y bola, devuelven el slot a la cola de
+    libres y envían solo el resultado. El proceso principal reordena los
+    resultados por número de secuencia y alimenta el BallTracker en orden,
+    así que el orden y los timestamps de los frames se conservan aunque los
+    workers terminen desordenados. Si un worker muere sin despedirse, los
+    frames que tenía en curso nunca llegan: se saltan (stats['lost']) en
+    cuanto los demás workers se quedan sin trabajo o los resultados
+    retenidos superan `max_pending`, y results() no se queda esperando.
+    Si muere el proceso de captura no llegan más frames ni los STOP:
+    results() termina cuando los workers se quedan sin trabajo.
+
+    set_ball_detection() activa o desactiva la búsqueda de la bola en los
+    workers (p. ej. según la fase del giro). El cambio se aplica a los
+    frames que aún no han empezado a procesarse, así que llega con el
+    retraso de los frames en curso; cada resultado indica en
+    'searched_ball' si se buscó la bola, y el tracker solo se actualiza
+    con los frames en los que se buscó.
+    """
+
+    def __init__(self, config_file=None, source_factory=None, workers=None, ring_slots=None,
+                 frame_shape=None, drop_when_full=None, tracking=True, max_pending=None,
+                 ball_method=None):
+        if config_file is None:
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            config_file = os.path.join(project_root, 'config', 'settings.json')
+        self.config_file = config_file
+        self.config = self.load_config(config_file)
+        pipeline_config = self.config.get('pipeline', {})
+
+        if source_factory is None:
+            from core.frame_source import ScreenFrameSource
+            source_factory = partial(ScreenFrameSource, config_file=config_file)
+        self.source_factory = source_factory
+
+        if workers is None:
+            # null en settings.json: un worker por núcleo sin contar la captura y el proceso principal
+            workers = pipeline_config.get('workers') or max(1, (os.cpu_count() or 2) - 2)
+        self.workers = int(workers)
+        if ring_slots is None:
+            ring_slots = pipeline_config.get('ring_slots') or 2 * self.workers + 2
+        # Al menos un slot por worker y uno para la captura
+        self.ring_slots = max(int(ring_slots), self.workers + 1)
+        self.frame_shape = tuple(frame_shape) if frame_shape is not None else None
+        self.drop_when_full = drop_when_full
+        self.ball_method = ball_method
+        # Resultados retenidos como máximo esperando un frame que falta
+        self.max_pending = max_pending or 4 * self.ring_slots
+        self.poll_interval = 0.5
+
+        self.tracking = tracking
+        self.ball_tracker = BallTracker()
+
+        self._shm = None
+        self._detect_ball = None
+        self._processes = []
+        self._capture_dead = False
+        self._running = False
+        self.stats = {'frames': 0, 'dropped': 0, 'reordered': 0, 'lost': 0, 'dead_workers': 0,
+                      'worker_frames': {}}
+
+    def load_config(self, config_file):
+        """Cargar configuración"""
+        try:
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+                print(f"✅ Configuración cargada desde: {config_file}")
+                return config
+        except Exception as e:
+            print(f"❌ Error cargando configuración: {e}")
+            return {}
+
+    def probe_frame_shape(self):
+        """Leer un frame del origen para dimensionar el ring"""
+        source = self.source_factory()
+        try:
+            frame = None
+            for _ in range(50):
+                frame, _ = source.read()
+                if frame is not None or source.finished:
+                    break
+            if frame is None:
+                raise RuntimeError("El origen de frames no entregó ningún frame")
+            return frame.shape
+        finally:
+            source.close()
+
+    def start(self):
+        """Crear el ring compartido y arrancar captura y workers"""
+        if self._running:
+            return
+        if self.frame_shape is None:
+            self.frame_shape = tuple(self.probe_frame_shape())
+
+        frame_bytes = int(np.prod(self.frame_shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=frame_bytes * self.ring_slots)
+
+        self._free_slots = mp.Queue()
+        for slot in range(self.ring_slots):
+            self._free_slots.put(slot)
+        self._tasks = mp.Queue(maxsize=self.ring_slots)
+        self._results = mp.Queue()
+        self._stop_event = mp.Event()
+        self._dropped = mp.Value('i', 0)
+        # Flag de un byte leído por los workers en cada frame (sin cerrojo)
+        self._detect_ball = mp.RawValue('b', 1)
+
+        self._processes = []
+        for worker_id in range(self.workers):
+            process = mp.Process(
+                target=_detection_worker, name=f"DetectionWorker-{worker_id}",
+                args=(worker_id, self.config_file, self._shm, self.frame_shape, self.ring_slots,
+                      self._free_slots, self._tasks, self._results, self._detect_ball,
+                      self.ball_method),
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+        capture = mp.Process(
+            target=_capture_process, name="CaptureProcess",
+            args=(self.source_factory, self._shm, self.frame_shape, self.ring_slots,
+                  self._free_slots, self._tasks, self._stop_event, self.drop_when_full,
+                  self._dropped, self.workers),
+            daemon=True
+        )
+        capture.start()
+        self._processes.append(capture)
+
+        self._pending = {}
+        self._next_seq = 0
+        self._finished = set()
+        self._capture_dead = False
+        self.ball_tracker.reset()
+        self.stats = {'frames': 0, 'dropped': 0, 'reordered': 0, 'lost': 0, 'dead_workers': 0,
+                      'worker_frames': {i: 0 for i in range(self.workers)}}
+        self._running = True
+        print(f"🧵 Pipeline iniciado: {self.workers} workers, {self.ring_slots} slots de "
+              f"{self.frame_shape[1]}x{self.frame_shape[0]}")
+
+    def set_ball_detection(self, enabled):
+        """Activar/desactivar la búsqueda de la bola en los workers"""
+        if self._detect_ball is not None:
+            self._detect_ball.value = 1 if enabled else 0
+
+    def _emit(self, item):
+        """Resultado en orden: actualizar el tracker y construir el diccionario"""
+        seq, timestamp, wheel, ball, searched, worker_id, latency_ms = item
+        if self.tracking and (searched or wheel is None):
+            self.ball_tracker.update(ball, wheel, timestamp)
+        self.stats['frames'] += 1
+        self.stats['worker_frames'][worker_id] += 1
+        return {
+            'seq': seq,
+            'timestamp': timestamp,
+            'wheel': wheel,
+            'ball': ball,
+            'searched_ball': searched,
+            'detected': wheel is not None,
+            'worker': worker_id,
+            'latency_ms': latency_ms,
+            'ball_state': self.ball_tracker.get_state() if self.tracking else None
+        }
+
+    def _check_workers(self):
+        """Dar por terminados los workers que murieron sin enviar STOP y detectar la caída de la captura"""
+        capture = self._processes[self.workers] if len(self._processes) > self.workers else None
+        if (capture is not None and not self._capture_dead and not capture.is_alive()
+                and capture.exitcode != 0):
+            # Muerta sin pasar por su finally: los workers nunca recibirán STOP
+            self._capture_dead = True
+            print(f"❌ El proceso de captura terminó inesperadamente (código {capture.exitcode})")
+        for worker_id, process in enumerate(self._processes[:self.workers]):
+            if worker_id in self._finished or process.is_alive():
+                continue
+            # Un worker que sale con código 0 ya envió su STOP (aún en la cola)
+            if process.exitcode != 0:
+                self._finished.add(worker_id)
+                self.stats['dead_workers'] += 1
+                print(f"❌ Worker {worker_id} terminó inesperadamente (código {process.exitcode})")
+
+    def _skip_missing(self):
+        """Saltar hasta el primer resultado retenido: los frames intermedios no llegarán"""
+        if self._pending:
+            first = min(self._pending)
+            self.stats['lost'] += first - self._next_seq
+            self._next_seq = first
+
+    def _ready(self):
+        """Resultados consecutivos disponibles a partir de `_next_seq`"""
+        while self._next_seq in self._pending:
+            yield self._emit(self._pending.pop(self._next_seq))
+            self._next_seq += 1
+
+    def results(self, timeout=None):
+        """Generar los resultados en el orden de captura hasta que se agote el origen
+
+        Con `timeout` termina si pasan esos segundos sin ningún resultado.
+        """
+        poll = self.poll_interval if timeout is None else min(self.poll_interval, timeout)
+        last_result = time.perf_counter()
+        while self._running and len(self._finished) < self.workers:
+            try:
+                item = self._results.get(timeout=poll)
+            except queue.Empty:
+                capture_was_dead = self._capture_dead
+                self._check_workers()
+                if capture_was_dead:
+                    # Segundo intervalo sin resultados tras caer la captura: no queda trabajo
+                    self._finished.update(range(self.workers))
+                    continue
+                if self.stats['dead_workers']:
+                    # Los workers vivos no tienen nada en curso: lo que falta se perdió
+                    self._skip_missing()
+                    yield from self._ready()
+                if timeout is not None and time.perf_counter() - last_result >= timeout:
+                    return
+                continue
+            last_result = time.perf_counter()
+            if item[0] is STOP:
+                self._finished.add(item[1])
+                continue
+
+            if item[0] != self._next_seq:
+                self.stats['reordered'] += 1
+            self._pending[item[0]] = item
+            if len(self._pending) > self.max_pending:
+                self._skip_missing()
+            yield from self._ready()
+
+        # Todos los workers terminaron: lo retenido se entrega saltando los huecos
+        while self._pending:
+            self._skip_missing()
+            yield from self._ready()
+
+    def run(self, max_frames=None, duration=None):
+        """Procesar hasta agotar el origen, `max_frames` o `duration` segundos"""
+        self.start()
+        start_time = time.perf_counter()
+        detections = 0
+        latencies = []
+        try:
+            for result in self.results():
+                detections += result['detected']
+                latencies.append(result['latency_ms'])
+                if max_frames is not None and self.stats['frames'] >= max_frames:
+                    break
+                if duration is not None and time.perf_counter() - start_time >= duration:
+                    break
+        finally:
+            self.stop()
+
+        elapsed = time.perf_counter() - start_time
+        frames = self.stats['frames']
+        summary = dict(self.stats)
+        summary.update({
+            'detections': detections,
+            'elapsed': elapsed,
+            'fps': frames / elapsed if elapsed > 0 else 0.0,
+            'mean_worker_ms': float(np.mean(latencies)) if latencies else 0.0
+        })
+        print(f"✅ Pipeline: {frames} frames en {elapsed:.2f}s ({summary['fps']:.1f} FPS), "
+              f"descartados: {summary['dropped']}, perdidos: {summary['lost']}")
+        return summary
+
+    def stop(self, timeout=5.0):
+        """Detener los procesos y liberar la memoria compartida"""
+        if not self._running:
+            return
+        self._stop_event.set()
+
+        # Vaciar la cola de resultados: un proceso no termina mientras su cola tenga datos sin leer
+        deadline = time.perf_counter() + timeout
+        while len(self._finished) < self.workers and time.perf_counter() < deadline:
+            try:
+                item = self._results.get(timeout=0.1)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if item[0] is STOP:
+                self._finished.add(item[1])
+
+        if self._capture_dead:
+            # Sin captura los workers siguen esperando tareas que no llegarán
+            for process in self._processes[:self.workers]:
+                if process.is_alive():
+                    process.terminate()
+
+        for process in self._processes:
+            process.join(max(0.1, deadline - time.perf_counter()))
+            if process.is_alive():
+                process.terminate()
+                process.join(1.0)
+
+        self.stats['dropped'] = self._dropped.value
+        for q in (self._free_slots, self._tasks, self._results):
+            q.close()
+            q.join_thread()
+        self._processes = []
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+        self._running = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
@@ -0,0 +1,108 @@
+import numpy as np
+from collections import namedtuple
+
+# Resultados de detección: tuplas con nombre (sin __dict__, 1 objeto por resultado)
+# que siguen desempaquetándose como antes: x, y, r = wheel / x, y = ball
+WheelDetection = namedtuple('WheelDetection', ['x', 'y', 'r'])
+BallDetection = namedtuple('BallDetection', ['x', 'y'])
+FrameDetection = namedtuple('FrameDetection', ['wheel', 'ball', 'detected', 'timestamp'])
+
+# Un registro por frame en el histórico (19 bytes); -1 = no detectado
+DETECTION_HISTORY_DTYPE = np.dtype([
+    ('timestamp', np.float64),
+    ('wheel_x', np.int16),
+    ('wheel_y', np.int16),
+    ('wheel_r', np.int16),
+    ('ball_x', np.int16),
+    ('ball_y', np.int16),
+    ('wheel_detected', np.bool_),
+])
+
+class DetectionHistory:
+    """Histórico de detecciones en un buffer circular de NumPy de tamaño fijo
+
+    Guarda los últimos `capacity` frames en un array estructurado reservado
+    una sola vez, así que la memoria no crece en una sesión larga. Los
+    contadores de la ventana se actualizan al entrar cada frame y al salir
+    el más antiguo, y los de toda la sesión solo se incrementan: las
+    estadísticas se leen en O(1) sin recorrer el histórico.
+    """
+
+    def __init__(self, capacity=36000):
+        self.capacity = int(capacity)
+        self.records = np.zeros(self.capacity, dtype=DETECTION_HISTORY_DTYPE)
+        # Vistas por campo: escribir escalares sueltos es más rápido que un registro entero
+        self._timestamp = self.records['timestamp']
+        self._wheel_x = self.records['wheel_x']
+        self._wheel_y = self.records['wheel_y']
+        self._wheel_r = self.records['wheel_r']
+        self._ball_x = self.records['ball_x']
+        self._ball_y = self.records['ball_y']
+        self._wheel_detected = self.records['wheel_detected']
+        self.reset()
+
+    def reset(self):
+        """Vaciar el histórico y los contadores"""
+        self.head = 0
+        self.count = 0
+        self.window_wheels = 0
+        self.window_balls = 0
+        self.total_frames = 0
+        self.total_wheels = 0
+        self.total_balls = 0
+
+    def append(self, detection):
+        """Añadir la detección de un frame (FrameDetection)"""
+        wheel = detection.wheel
+        ball = detection.ball
+        has_wheel = wheel is not None
+        has_ball = ball is not None
+        slot = self.head
+
+        if self.count == self.capacity:
+            # Sale de la ventana el frame más antiguo
+            self.window_wheels -= bool(self._wheel_detected[slot])
+            self.window_balls -= bool(self._ball_x[slot] >= 0)
+        else:
+            self.count += 1
+
+        self._timestamp[slot] = detection.timestamp if detection.timestamp is not None else np.nan
+        if has_wheel:
+            self._wheel_x[slot], self._wheel_y[slot], self._wheel_r[slot] = wheel
+        else:
+            self._wheel_x[slot] = self._wheel_y[slot] = self._wheel_r[slot] = -1
+        if has_ball:
+            self._ball_x[slot], self._ball_y[slot] = ball
+        else:
+            self._ball_x[slot] = self._ball_y[slot] = -1
+        self._wheel_detected[slot] = has_wheel
+        self.window_wheels += has_wheel
+        self.window_balls += has_ball
+        self.total_frames += 1
+        self.total_wheels += has_wheel
+        self.total_balls += has_ball
+        self.head = (slot + 1) % self.capacity
+
+    def __len__(self):
+        return self.count
+
+    def recent(self, n=None):
+        """Copia de los últimos `n` registros en orden cronológico"""
+        n = self.count if n is None else min(int(n), self.count)
+        indices = (self.head - n + np.arange(n)) % self.capacity
+        return self.records[indices]
+
+    def get_stats(self):
+        """Tasas de detección de la ventana y totales de la sesión"""
+        total = self.count
+        return {
+            'total_detections': total,
+            'wheel_detections': self.window_wheels,
+            'ball_detections': self.window_balls,
+            'wheel_rate': (self.window_wheels / total * 100) if total > 0 else 0,
+            'ball_rate': (self.window_balls / total * 100) if total > 0 else 0,
+            'session_frames': self.total_frames,
+            'session_wheel_detections': self.total_wheels,
+            'session_ball_detections': self.total_balls,
+            'capacity': self.capacity
+        }
@@ -0,0 +1,41 @@
+import numpy as np
+
+class FrameBufferPool:
+    """Buffers reutilizables por nombre y tamaño para el pipeline de frames
+
+    Las conversiones (gris, HSV, desenfoque, máscaras...) escriben en estos
+    buffers con el parámetro `dst` de OpenCV, de modo que en régimen
+    estacionario no se reserva memoria nueva por frame. Un buffer solo se
+    vuelve a crear cuando cambia su forma o tipo.
+    """
+
+    def __init__(self):
+        self.buffers = {}
+        self.allocations = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        """Obtener el buffer `name` con la forma y tipo pedidos"""
+        shape = tuple(shape)
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            self.buffers[name] = buffer
+            self.allocations += 1
+        return buffer
+
+    def like(self, name, image):
+        """Obtener un buffer con la misma forma y tipo que `image`"""
+        return self.get(name, image.shape, image.dtype)
+
+    def clear(self):
+        """Liberar todos los buffers"""
+        self.buffers.clear()
+
+    def get_stats(self):
+        """Estadísticas de uso de memoria del pool"""
+        return {
+            'buffers': len(self.buffers),
+            'allocations': self.allocations,
+            'bytes': sum(b.nbytes for b in self.buffers.values())
+        }
+
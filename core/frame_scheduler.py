@@ -0,0 +1,139 @@
+import json
+import os
+import time
+
+from core.motion_gate import MotionGate
+
+class FrameScheduler:
+    """Ritmo de captura adaptativo según lo que hay en la mesa
+
+    Tres fases:
+      - 'idle': rueda visible pero quieta, se captura a `idle_fps`.
+      - 'active': hay bola o movimiento en la rueda, se captura a `fps`
+        (capture.fps) y se mantiene `active_hold` segundos tras el último
+        movimiento para no perder el final del giro.
+      - 'absent': la rueda lleva `absent_after` frames sin verse; el
+        intervalo se multiplica por `backoff_factor` en cada frame vacío
+        hasta `absent_max_interval`.
+    El nuevo intervalo se aplica ya al siguiente frame, así que en cuanto
+    aparece la bola se pasa al ritmo máximo.
+
+    wait() duerme hasta el siguiente instante programado compensando la
+    deriva: cada instante es el anterior programado más el intervalo, así
+    que el tiempo de proceso de cada frame no se suma al intervalo y el
+    modelo físico recibe muestras regulares. Si el bucle se retrasa más de
+    un intervalo completo se vuelve a anclar en el momento actual en lugar
+    de encadenar frames sin pausa.
+    """
+
+    IDLE = 'idle'
+    ACTIVE = 'active'
+    ABSENT = 'absent'
+
+    def __init__(self, config_file=None, fps=None, verbose=True):
+        if config_file is None:
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            config_file = os.path.join(project_root, 'config', 'settings.json')
+        self.config = self.load_config(config_file)
+        capture_config = self.config.get('capture', {})
+
+        # ✅ PARÁMETROS DEL RITMO DE CAPTURA
+        self.schedule_params = {
+            'fps': fps or capture_config.get('fps', 10),                           # Ritmo con la bola en juego
+            'idle_fps': capture_config.get('idle_fps', 2),                         # Ritmo con la rueda quieta
+            'active_hold': 1.5,                                                    # Segundos en 'active' tras el último movimiento
+            'absent_after': 3,                                                     # Frames sin rueda antes de espaciar capturas
+            'backoff_factor': 2.0,                                                 # Multiplicador del intervalo sin rueda
+            'absent_max_interval': capture_config.get('absent_max_interval', 5.0), # Intervalo máximo sin rueda (s)
+        }
+        self.verbose = verbose
+        self.reset()
+
+    def load_config(self, config_file):
+        """Cargar configuración"""
+        try:
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+                print(f"✅ Configuración cargada desde: {config_file}")
+                return config
+        except Exception as e:
+            print(f"❌ Error cargando configuración: {e}")
+            return {}
+
+    def reset(self):
+        """Volver a la fase inicial (activa, para localizar la rueda cuanto antes)"""
+        self.phase = self.ACTIVE
+        self.interval = 1.0 / self.schedule_params['fps']
+        self.next_time = None
+        self.last_motion = None
+        self.absent_frames = 0
+        self.stats = {
+            'frames': {self.IDLE: 0, self.ACTIVE: 0, self.ABSENT: 0},
+            'slept': 0.0,
+            'overruns': 0,
+            'phase_changes': 0,
+        }
+
+    def set_verbose(self, verbose):
+        """Activar/desactivar mensajes de cambio de fase"""
+        self.verbose = verbose
+
+    def update(self, wheel, ball, motion=None, now=None):
+        """Elegir la fase a partir de la detección del frame; devuelve la fase"""
+        if now is None:
+            now = time.perf_counter()
+        params = self.schedule_params
+        phase = self.phase
+        interval = self.interval
+
+        if wheel is None:
+            self.absent_frames += 1
+            excess = self.absent_frames - params['absent_after']
+            if excess >= 0:
+                phase = self.ABSENT
+                interval = min(params['backoff_factor'] ** (excess + 1) / params['idle_fps'],
+                               params['absent_max_interval'])
+        else:
+            self.absent_frames = 0
+            if ball is not None or motion == MotionGate.MOVING:
+                self.last_motion = now
+            if self.last_motion is not None and now - self.last_motion < params['active_hold']:
+                phase = self.ACTIVE
+                interval = 1.0 / params['fps']
+            else:
+                phase = self.IDLE
+                interval = 1.0 / params['idle_fps']
+
+        if phase != self.phase:
+            self.stats['phase_changes'] += 1
+            if self.verbose:
+                print(f"⏱️ Captura en fase '{phase}' ({1.0 / interval:.1f} FPS)")
+        self.phase = phase
+        self.interval = interval
+        self.stats['frames'][phase] += 1
+        return phase
+
+    def wait(self):
+        """Dormir hasta el siguiente frame programado; devuelve los segundos dormidos"""
+        now = time.perf_counter()
+        if self.next_time is None:
+            self.next_time = now
+        self.next_time += self.interval
+        delay = self.next_time - now
+        if delay > 0:
+            time.sleep(delay)
+            self.stats['slept'] += delay
+            return delay
+        if -delay > self.interval:
+            # Retraso de más de un intervalo: reanclar en lugar de recuperar a ráfagas
+            self.stats['overruns'] += 1
+            self.next_time = now
+        return 0.0
+
+    def get_stats(self):
+        """Frames por fase, tiempo dormido y retrasos"""
+        stats = dict(self.stats)
+        stats['frames'] = dict(self.stats['frames'])
+        stats['phase'] = self.phase
+        stats['fps'] = 1.0 / self.interval
+        return stats
@@ -0,0 +1,286 @@
+import cv2
+import numpy as np
+import os
+import time
+
+# Extensiones aceptadas en una carpeta de imágenes
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+class FrameSource:
+    """Origen de frames común para captura en vivo, repetición y memoria
+
+    read() devuelve (frame, timestamp) con el timestamp en segundos; cuando
+    el origen se agota devuelve (None, None) y marca `finished`. Un origen
+    en vivo puede devolver (None, None) de forma puntual sin terminar. El
+    frame puede ser una vista de un buffer interno: es válido hasta la
+    siguiente lectura.
+    """
+
+    live = False
+
+    def __init__(self):
+        self.finished = False
+        self.frames_read = 0
+
+    def read(self):
+        """Siguiente frame: (frame, timestamp) o (None, None)"""
+        raise NotImplementedError
+
+    def close(self):
+        """Liberar los recursos del origen"""
+        self.finished = True
+
+    def get_info(self):
+        """Información básica del origen"""
+        return {
+            'type': type(self).__name__,
+            'live': self.live,
+            'frames_read': self.frames_read,
+            'finished': self.finished
+        }
+
+    def __iter__(self):
+        while not self.finished:
+            frame, timestamp = self.read()
+            if frame is None:
+                if self.live:
+                    continue
+                break
+            yield frame, timestamp
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class ScreenFrameSource(FrameSource):
+    """Frames en vivo desde ScreenCapture (mss)"""
+
+    live = True
+
+    def __init__(self, capture=None, config_file=None):
+        super().__init__()
+        if capture is None:
+            # Importación diferida: mss solo es necesario para la captura en vivo
+            from core.screen_capture import ScreenCapture
+            capture = ScreenCapture(config_file)
+        self.capture = capture
+        # Con 'bgra' los frames se entregan sin convertir (el detector acepta BGRA)
+        pixel_format = capture.config.get('capture', {}).get('pixel_format', 'bgr')
+        self._grab = capture.capture_screen_bgra if pixel_format == 'bgra' else capture.capture_screen
+
+    def read(self):
+        if self.capture.is_threaded():
+            frame, timestamp, _ = self.capture.get_latest_frame()
+        else:
+            frame, success = self._grab()
+            timestamp = time.perf_counter() if success else None
+        if frame is None:
+            return None, None
+        self.frames_read += 1
+        return frame, timestamp
+
+    def close(self):
+        self.capture.stop_threaded_capture()
+        super().close()
+
+    def get_info(self):
+        info = super().get_info()
+        info.update(self.capture.get_capture_info())
+        return info
+
+
+class ReplayFrameSource(FrameSource):
+    """Repetición de una grabación (archivo de vídeo o carpeta de imágenes)
+
+    Con `realtime=False` los frames se entregan tan rápido como se leen
+    (medida de rendimiento); con `realtime=True` se espera hasta el
+    instante original de cada frame, escalado por `speed`. En ambos casos
+    el timestamp devuelto es el de la grabación, de modo que el seguimiento
+    y la física ven siempre los mismos intervalos.
+    """
+
+    def __init__(self, path, realtime=False, speed=1.0, fps=None, loop=False):
+        super().__init__()
+        self.path = path
+        self.realtime = realtime
+        self.speed = speed
+        self.loop = loop
+        self.video = None
+        self.files = None
+        self.index = 0
+        self._frame = None
+        self._time_offset = 0.0
+        self._last_timestamp = 0.0
+        self._wall_start = None
+        self._first_timestamp = None
+
+        if os.path.isdir(path):
+            self.files = sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+            if not self.files:
+                raise ValueError(f"No hay imágenes en {path}")
+            self.fps = fps or 10.0
+            self.frame_count = len(self.files)
+        else:
+            self.video = cv2.VideoCapture(path)
+            if not self.video.isOpened():
+                raise ValueError(f"No se pudo abrir el vídeo {path}")
+            self.fps = fps or self.video.get(cv2.CAP_PROP_FPS) or 10.0
+            self.frame_count = int(self.video.get(cv2.CAP_PROP_FRAME_COUNT))
+        print(f"🎞️ Repetición: {path} ({self.frame_count} frames a {self.fps:.1f} FPS)")
+
+    def _read_next(self):
+        """Leer el siguiente frame de la grabación con su timestamp original"""
+        if self.files is not None:
+            if self.index >= len(self.files):
+                return None, None
+            frame = cv2.imread(self.files[self.index], cv2.IMREAD_COLOR)
+            timestamp = self.index / self.fps
+            self.index += 1
+            return frame, timestamp
+
+        # Se reutiliza el mismo buffer en cada lectura del vídeo
+        success, frame = self.video.read(self._frame)
+        if not success:
+            return None, None
+        self._frame = frame
+        position_ms = self.video.get(cv2.CAP_PROP_POS_MSEC)
+        timestamp = position_ms / 1000.0 if position_ms > 0 else self.index / self.fps
+        self.index += 1
+        return frame, timestamp
+
+    def rewind(self):
+        """Volver al principio de la grabación"""
+        self.index = 0
+        if self.video is not None:
+            self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def read(self):
+        if self.finished:
+            return None, None
+
+        frame, timestamp = self._read_next()
+        if frame is None and self.loop and self.index > 0:
+            # Al repetir, el tiempo sigue avanzando un intervalo tras el último frame
+            self._time_offset = self._last_timestamp + 1.0 / self.fps
+            self.rewind()
+            frame, timestamp = self._read_next()
+        if frame is None:
+            self.finished = True
+            return None, None
+
+        timestamp += self._time_offset
+        self._last_timestamp = timestamp
+
+        if self.realtime:
+            if self._wall_start is None:
+                self._wall_start = time.perf_counter()
+                self._first_timestamp = timestamp
+            target = self._wall_start + (timestamp - self._first_timestamp) / self.speed
+            delay = target - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        self.frames_read += 1
+        return frame, timestamp
+
+    def close(self):
+        if self.video is not None:
+            self.video.release()
+            self.video = None
+        super().close()
+
+    def get_info(self):
+        info = super().get_info()
+        info.update({
+            'path': self.path,
+            'fps': self.fps,
+            'frame_count': self.frame_count,
+            'realtime': self.realtime
+        })
+        return info
+
+
+class MemoryFrameSource(FrameSource):
+    """Frames ya cargados en memoria (benchmarks sin coste de E/S)"""
+
+    def __init__(self, frames, timestamps=None, fps=10.0, loop=False):
+        super().__init__()
+        self.frames = frames
+        if timestamps is None:
+            timestamps = np.arange(len(frames)) / fps
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        if len(self.timestamps) != len(frames):
+            raise ValueError("frames y timestamps deben tener la misma longitud")
+        self.fps = fps
+        self.loop = loop
+        self.index = 0
+        self._time_offset = 0.0
+
+    @classmethod
+    def from_source(cls, source, max_frames=None, loop=False):
+        """Cargar en memoria los frames de otro origen (copiándolos)"""
+        frames = []
+        timestamps = []
+        for frame, timestamp in source:
+            frames.append(frame.copy())
+            timestamps.append(timestamp)
+            if max_frames is not None and len(frames) >= max_frames:
+                break
+        fps = getattr(source, 'fps', 10.0)
+        return cls(frames, timestamps, fps=fps, loop=loop)
+
+    def read(self):
+        if self.finished or len(self.frames) == 0:
+            self.finished = True
+            return None, None
+
+        if self.index >= len(self.frames):
+            if not self.loop:
+                self.finished = True
+                return None, None
+            self._time_offset += float(self.timestamps[-1] - self.timestamps[0]) + 1.0 / self.fps
+            self.index = 0
+
+        frame = self.frames[self.index]
+        timestamp = float(self.timestamps[self.index]) + self._time_offset
+        self.index += 1
+        self.frames_read += 1
+        return frame, timestamp
+
+    def rewind(self):
+        """Volver al primer frame"""
+        self.index = 0
+        self._time_offset = 0.0
+        self.finished = False
+
+    def get_info(self):
+        info = super().get_info()
+        info.update({'frame_count': len(self.frames), 'fps': self.fps})
+        return info
+
+
+def open_frame_source(source=None, **kwargs):
+    """Crear un FrameSource a partir de un origen cualquiera
+
+    Acepta un FrameSource (se devuelve tal cual), un ScreenCapture, la ruta
+    de un vídeo o carpeta de imágenes, una lista de frames, o None para la
+    captura de pantalla configurada.
+    """
+    if isinstance(source, FrameSource):
+        return source
+    if source is None:
+        return ScreenFrameSource(**kwargs)
+    if isinstance(source, (str, os.PathLike)):
+        return ReplayFrameSource(os.fspath(source), **kwargs)
+    if isinstance(source, (list, tuple)) or (isinstance(source, np.ndarray) and source.ndim == 4):
+        return MemoryFrameSource(source, **kwargs)
+    if hasattr(source, 'capture_screen'):
+        return ScreenFrameSource(capture=source)
+    raise TypeError(f"Origen de frames no soportado: {type(source).__name__}")
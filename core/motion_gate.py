@@ -0,0 +1,115 @@
+import cv2
+import numpy as np
+
+class MotionGate:
+    """Clasificación barata de frames: duplicado, estático o en movimiento
+
+    Submuestrea la región de interés con un paso fijo (vecino más cercano) y
+    la compara con la miniatura del frame anterior. El paso debe ser menor
+    que el diámetro de la bola para que un objeto en movimiento siempre
+    caiga sobre alguna muestra. Un frame es 'duplicate' si la miniatura no
+    cambia en absoluto (el navegador no repintó), 'static' si solo cambia
+    por ruido (compresión, parpadeos) y 'moving' si alguna muestra cambia
+    más que `motion_threshold`. El trabajo pesado aguas abajo solo tiene
+    sentido en los frames 'moving'.
+    """
+
+    DUPLICATE = 'duplicate'
+    STATIC = 'static'
+    MOVING = 'moving'
+
+    def __init__(self, step=4, motion_threshold=12, min_changed_samples=1):
+        self.step = step
+        self.motion_threshold = motion_threshold
+        self.min_changed_samples = min_changed_samples
+
+        # Miniaturas actual/anterior y diferencia, reutilizadas entre frames
+        self._thumb_size = None
+        self._thumbnail = None
+        self._previous = None
+        self._diff = None
+        self._changed = None
+        self._color_small = None
+        self._has_previous = False
+        self._roi = None
+
+        self.last_state = None
+        self.last_max_diff = 0.0
+        self.counts = {self.DUPLICATE: 0, self.STATIC: 0, self.MOVING: 0}
+
+    def reset(self):
+        """Olvidar el frame anterior (el siguiente se considera en movimiento)"""
+        self._has_previous = False
+        self._roi = None
+
+    def _allocate(self, thumb_size, channels):
+        """Reservar las miniaturas solo cuando cambia su tamaño"""
+        if thumb_size != self._thumb_size:
+            width, height = thumb_size
+            self._thumbnail = np.empty((height, width), dtype=np.uint8)
+            self._previous = np.empty((height, width), dtype=np.uint8)
+            self._diff = np.empty((height, width), dtype=np.uint8)
+            self._changed = np.empty((height, width), dtype=np.uint8)
+            self._color_small = None
+            self._thumb_size = thumb_size
+            self._has_previous = False
+        if channels and (self._color_small is None or self._color_small.shape[2] != channels):
+            width, height = thumb_size
+            self._color_small = np.empty((height, width, channels), dtype=np.uint8)
+
+    def classify(self, image, roi=None):
+        """Clasificar `image` (BGR, BGRA o gris) dentro de `roi` = (x0, y0, x1, y1)"""
+        if roi is not None:
+            x0, y0, x1, y1 = roi
+            image = image[y0:y1, x0:x1]
+        if roi != self._roi:
+            # Cambió la región vigilada: la comparación con el frame anterior no vale
+            self._has_previous = False
+            self._roi = roi
+
+        height, width = image.shape[:2]
+        thumb_size = (max(1, width // self.step), max(1, height // self.step))
+        channels = image.shape[2] if image.ndim == 3 else 0
+        self._allocate(thumb_size, channels)
+
+        if channels == 0:
+            cv2.resize(image, thumb_size, dst=self._thumbnail, interpolation=cv2.INTER_NEAREST)
+        else:
+            cv2.resize(image, thumb_size, dst=self._color_small, interpolation=cv2.INTER_NEAREST)
+            code = cv2.COLOR_BGRA2GRAY if channels == 4 else cv2.COLOR_BGR2GRAY
+            cv2.cvtColor(self._color_small, code, dst=self._thumbnail)
+
+        if not self._has_previous:
+            state = self.MOVING
+            self.last_max_diff = 255.0
+        else:
+            cv2.absdiff(self._thumbnail, self._previous, dst=self._diff)
+            _, max_diff, _, _ = cv2.minMaxLoc(self._diff)
+            self.last_max_diff = max_diff
+            if max_diff == 0:
+                state = self.DUPLICATE
+            elif max_diff < self.motion_threshold:
+                state = self.STATIC
+            else:
+                cv2.threshold(self._diff, self.motion_threshold - 1, 255,
+                              cv2.THRESH_BINARY, dst=self._changed)
+                if cv2.countNonZero(self._changed) >= self.min_changed_samples:
+                    state = self.MOVING
+                else:
+                    state = self.STATIC
+
+        # La miniatura actual pasa a ser la anterior (intercambio sin copia)
+        self._thumbnail, self._previous = self._previous, self._thumbnail
+        self._has_previous = True
+
+        self.last_state = state
+        self.counts[state] += 1
+        return state
+
+    def get_stats(self):
+        """Recuento de frames por estado"""
+        total = sum(self.counts.values())
+        stats = dict(self.counts)
+        stats['total'] = total
+        stats['skipped_rate'] = ((total - self.counts[self.MOVING]) / total * 100) if total > 0 else 0
+        return stats
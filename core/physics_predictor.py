@@ -0,0 +1,179 @@
+import numpy as np
+import json
+import os
+import time
+
+# Orden de los bolsillos en una rueda europea, en el sentido de ángulo creciente
+WHEEL_ORDER = np.array([
+    0, 32, 15, 19, 4, 21, 2, 25, 17, 34, 6, 27, 13, 36, 11, 30, 8, 23, 10,
+    5, 24, 16, 33, 1, 20, 14, 31, 9, 22, 18, 29, 7, 28, 12, 35, 3, 26
+])
+NUM_POCKETS = len(WHEEL_ORDER)
+POCKET_ANGLE = 2 * np.pi / NUM_POCKETS
+
+class PhysicsPredictor:
+    """Predicción física del bolsillo final con Monte Carlo vectorizado
+
+    La bola desacelera a ritmo constante hasta que su velocidad angular cae
+    a la velocidad crítica y abandona la pista; después recorre un ángulo
+    adicional (deflectores y rebotes) durante un tiempo de asentamiento
+    mientras el rotor sigue girando. Cada entrada se perturba con su
+    incertidumbre y se simulan todas las trayectorias a la vez como arrays
+    de NumPy, sin bucles de Python por muestra. Los ángulos usan el mismo
+    convenio que BallTracker (radianes en coordenadas de imagen).
+    """
+
+    def __init__(self, config_file=None, seed=None):
+        if config_file is None:
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            config_file = os.path.join(project_root, 'config', 'settings.json')
+        self.config = self.load_config(config_file)
+        prediction_config = self.config.get('prediction', {})
+
+        self.samples = prediction_config.get('monte_carlo_samples', 5000)
+        self.latency_budget_ms = prediction_config.get('latency_budget_ms', 50.0)
+
+        # ✅ PARÁMETROS DEL MODELO FÍSICO
+        self.model_params = {
+            'drop_velocity': 6.0,          # Velocidad angular (rad/s) a la que la bola cae de la pista
+            'drop_velocity_std': 0.6,
+            'settle_time': 1.2,            # Tiempo (s) desde la caída hasta quedar en un bolsillo
+            'settle_time_std': 0.3,
+            'travel_angle': 1.5,           # Ángulo extra (rad) recorrido tras la caída
+            'travel_angle_std': 0.5,
+            'bounce_pockets_std': 3.0,     # Dispersión por rebotes, en bolsillos
+            'min_velocity_std': 0.2,       # Incertidumbre mínima de velocidades medidas (rad/s)
+            'min_deceleration_std': 0.1,   # Incertidumbre mínima de desaceleraciones (rad/s²)
+            'pocket_direction': 1,         # +1 si los números avanzan con el ángulo de imagen
+        }
+
+        self.rng = np.random.default_rng(seed)
+        self.last_latency_ms = 0.0
+
+    def load_config(self, config_file):
+        """Cargar configuración"""
+        try:
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+                print(f"✅ Configuración cargada desde: {config_file}")
+                return config
+        except Exception as e:
+            print(f"❌ Error cargando configuración: {e}")
+            return {}
+
+    def _sample(self, mean, std, size):
+        """Muestras normales (std cero devuelve el valor constante)"""
+        if std <= 0:
+            return np.full(size, float(mean))
+        return self.rng.normal(mean, std, size)
+
+    @staticmethod
+    def _travel(velocity, deceleration, t):
+        """Ángulo recorrido con desaceleración constante hasta `t`, sin invertir el giro"""
+        speed = np.abs(velocity)
+        decel = np.maximum(deceleration, 1e-9)
+        stop_time = speed / decel
+        t = np.minimum(t, stop_time)
+        return np.sign(velocity) * (speed * t - 0.5 * decel * t * t)
+
+    def simulate(self, ball_state, rotor_state=None, samples=None):
+        """Simular `samples` trayectorias y devolver el índice de bolsillo (orden de rueda)"""
+        n = samples or self.samples
+        params = self.model_params
+        rotor_state = rotor_state or {}
+
+        # Entradas perturbadas según su incertidumbre
+        ball_velocity = self._sample(
+            ball_state['angular_velocity'],
+            max(ball_state.get('velocity_std', 0.0), params['min_velocity_std']), n)
+        ball_decel = np.abs(self._sample(
+            ball_state['angular_deceleration'],
+            max(ball_state.get('deceleration_std', 0.0), params['min_deceleration_std']), n))
+        ball_angle = self._sample(ball_state['angle'], ball_state.get('angle_std', 0.0), n)
+
+        # Sin rotor medido se asume parado y sin incertidumbre
+        rotor_velocity_std = 0.0
+        if rotor_state:
+            rotor_velocity_std = max(rotor_state.get('velocity_std', 0.0), params['min_velocity_std'])
+        rotor_velocity = self._sample(rotor_state.get('angular_velocity', 0.0), rotor_velocity_std, n)
+        rotor_decel = np.abs(self._sample(
+            rotor_state.get('angular_deceleration', 0.0), rotor_state.get('deceleration_std', 0.0), n))
+        rotor_angle = self._sample(rotor_state.get('angle', 0.0), rotor_state.get('angle_std', 0.0), n)
+
+        drop_velocity = np.abs(self._sample(params['drop_velocity'], params['drop_velocity_std'], n))
+        settle_time = np.maximum(self._sample(params['settle_time'], params['settle_time_std'], n), 0.0)
+        travel = np.abs(self._sample(params['travel_angle'], params['travel_angle_std'], n))
+        bounce = self._sample(0.0, params['bounce_pockets_std'] * POCKET_ANGLE, n)
+
+        # Tiempo hasta la caída: |ω| baja hasta la velocidad crítica
+        drop_time = np.maximum(np.abs(ball_velocity) - drop_velocity, 0.0) / np.maximum(ball_decel, 1e-9)
+        drop_angle = ball_angle + self._travel(ball_velocity, ball_decel, drop_time)
+
+        # Tras la caída la bola sigue en su sentido de giro y rebota
+        final_angle = drop_angle + np.sign(ball_velocity) * travel + bounce
+
+        # Posición del rotor (ángulo del bolsillo 0) cuando la bola se asienta
+        total_time = drop_time + settle_time
+        rotor_final = rotor_angle + self._travel(rotor_velocity, rotor_decel, total_time)
+
+        relative = params['pocket_direction'] * (final_angle - rotor_final)
+        slots = np.floor(np.mod(relative, 2 * np.pi) / POCKET_ANGLE + 0.5).astype(np.intp) % NUM_POCKETS
+        return slots, drop_time
+
+    def predict(self, ball_state, rotor_state=None, samples=None):
+        """Distribución de probabilidad sobre los 37 bolsillos
+
+        `ball_state` usa las claves de BallTracker.get_state() (angle,
+        angular_velocity, angular_deceleration y opcionalmente sus *_std).
+        `rotor_state` usa las mismas claves para el rotor; su ángulo es el
+        del centro del bolsillo 0. Las probabilidades se indexan por número.
+        """
+        start = time.perf_counter_ns()
+
+        slots, drop_time = self.simulate(ball_state, rotor_state, samples)
+        counts = np.bincount(slots, minlength=NUM_POCKETS)
+
+        probabilities = np.empty(NUM_POCKETS, dtype=np.float64)
+        probabilities[WHEEL_ORDER] = counts / len(slots)
+
+        best = int(np.argmax(probabilities))
+        self.last_latency_ms = (time.perf_counter_ns() - start) / 1e6
+        return {
+            'probabilities': probabilities,
+            'most_likely': best,
+            'confidence': float(probabilities[best]),
+            'drop_time': float(np.median(drop_time)),
+            'samples': len(slots),
+            'latency_ms': self.last_latency_ms
+        }
+
+    def neighbors(self, number, count=2):
+        """Números vecinos de `number` en la rueda (incluido él mismo)"""
+        index = int(np.nonzero(WHEEL_ORDER == number)[0][0])
+        offsets = np.arange(-count, count + 1)
+        return WHEEL_ORDER[(index + offsets) % NUM_POCKETS].tolist()
+
+    def benchmark(self, runs=200, samples=None):
+        """Medir la latencia de predicción por giro frente al presupuesto configurado"""
+        ball_state = {'angle': 0.3, 'angular_velocity': 14.0, 'angular_deceleration': 1.5,
+                      'velocity_std': 0.3, 'deceleration_std': 0.2, 'angle_std': 0.01}
+        rotor_state = {'angle': 1.0, 'angular_velocity': -3.0, 'angular_deceleration': 0.05}
+
+        # Calentamiento (reserva de memoria, cachés)
+        self.predict(ball_state, rotor_state, samples)
+
+        latencies = np.empty(runs)
+        for i in range(runs):
+            latencies[i] = self.predict(ball_state, rotor_state, samples)['latency_ms']
+
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return {
+            'runs': runs,
+            'samples': samples or self.samples,
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'max_ms': float(latencies.max()),
+            'budget_ms': self.latency_budget_ms,
+            'within_budget': bool(p99 <= self.latency_budget_ms)
+        }
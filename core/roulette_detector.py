@@ -4,12 +4,30 @@ import os
 import json
 import time
 
+from core.frame_buffers import FrameBufferPool
+from core.motion_gate import MotionGate
+from core.ball_tracker import BallTracker
+from core.wheel_geometry import WheelGeometry
+from core.frame_source import FrameSource, open_frame_source
+from core.detection_results import WheelDetection, BallDetection, FrameDetection, DetectionHistory
+
+# Candidatos a bola: coordenadas globales, área (px), distancia al centro
+# relativa al radio de la rueda y puntuación
+BALL_CANDIDATE_DTYPE = np.dtype([
+    ('x', np.float32),
+    ('y', np.float32),
+    ('area', np.float32),
+    ('radius_ratio', np.float32),
+    ('score', np.float32),
+])
+
 class RouletteDetector:
     def __init__(self, config_file=None):
         if config_file is None:
             project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             config_file = os.path.join(project_root, 'config', 'settings.json')
         self.config = self.load_config(config_file)
+        detection_config = self.config.get('detection', {})
         
         # ✅ PARÁMETROS OPTIMIZADOS PARA DETECCIÓN REAL
         self.wheel_params = {
@@ -24,12 +42,80 @@ class RouletteDetector:
         self.ball_params = {
             'min_ball_size': 5,
             'max_ball_size': 30,
-            'brightness_threshold': 160
+            'brightness_threshold': 160,
+            'track_inner_ratio': 0.6,   # Radio interior de la pista de la bola (fracción de r)
+            'track_outer_ratio': 0.95,  # Radio exterior (deja fuera el borde de la rueda)
+            'method': detection_config.get('ball_method', 'blobs')  # 'blobs' (componentes) o 'polar' (franja)
+        }
+        
+        # Máscara anular de la pista de la bola, cacheada por geometría de la rueda
+        self.ball_track_mask = None
+        self.ball_track_bounds = None
+        self.ball_track_key = None
+        self.last_ball_candidates = np.empty(0, dtype=BALL_CANDIDATE_DTYPE)
+        
+        # ✅ BÚSQUEDA PIRAMIDAL para arranque en frío y re-adquisición (detection.pyramid)
+        pyramid_config = detection_config.get('pyramid', {})
+        self.pyramid_params = {
+            'enabled': pyramid_config.get('enabled', True),
+            'max_coarse_width': pyramid_config.get('max_coarse_width', 480),      # Ancho de la imagen reducida para la búsqueda gruesa
+            'accuracy_tolerance': pyramid_config.get('accuracy_tolerance', 2),    # Precisión (px) exigida al refinar centro y radio
+            'max_candidates': pyramid_config.get('max_candidates', 3),            # Candidatos gruesos que se refinan
+            'min_edge_points': pyramid_config.get('min_edge_points', 30),         # Puntos de borde mínimos para aceptar el ajuste
+        }
+        
+        # ✅ BLOQUEO DE RUEDA: tras una detección confiable solo se verifica el círculo
+        self.lock_params = {
+            'enabled': True,
+            'refresh_frames': 90,      # Búsqueda completa forzada cada N frames
+            'samples': 64,             # Puntos muestreados sobre la circunferencia
+            'edge_offset': 4,          # Distancia (px) a cada lado del borde
+            'min_edge_contrast': 12,   # Contraste mínimo para contar un punto como borde
+            'min_support': 0.6,        # Fracción de puntos con borde para bloquear
+            'verify_ratio': 0.7,       # Soporte mínimo relativo al del momento del bloqueo
+        }
+        self.wheel_lock = None
+        self.lock_support = 0.0
+        self.lock_frames = 0
+        self.lock_stats = {'verifications': 0, 'full_searches': 0, 'lock_losses': 0}
+        self._lock_angles = None
+        
+        # ✅ PUERTA DE MOVIMIENTO: evita reprocesar frames repetidos o sin cambios
+        self.gate_params = {
+            'enabled': True,
+            'sample_step': 4,          # Paso de muestreo (menor que el diámetro de la bola)
+            'motion_threshold': 12,    # Cambio mínimo de una muestra para considerar movimiento
         }
+        self.motion_gate = MotionGate(self.gate_params['sample_step'],
+                                      self.gate_params['motion_threshold'])
+        self.last_detection = None
+        self.last_detection_shape = None
         
-        self.detection_history = []
+        # ✅ DESENROLLADO POLAR: tablas de remapeo cacheadas por rueda bloqueada
+        self.polar_params = {
+            'angle_bins': 720,         # Resolución angular de la franja (0.5°)
+            'radius_bins': 48,         # Filas de la franja entre los radios de la pista
+            'axis_ratio': 1.0,         # Corrección de perspectiva: eje menor / eje mayor
+            'rotation': 0.0,           # Orientación del eje mayor (radianes)
+        }
+        self.wheel_geometry = None
+        self.wheel_geometry_key = None
+        
+        # ✅ SEGUIMIENTO DE BOLA: ventana de búsqueda a partir de la predicción
+        self.tracking_enabled = True
+        self.ball_tracker = BallTracker()
+        
+        # Instrumentación opcional (analytics.performance_tracker.PerformanceTracker)
+        self.perf = None
+        
+        # Histórico acotado de detecciones (20 minutos a 30 FPS, ~0.7 MB)
+        self.detection_history = DetectionHistory(capacity=36000)
         self.verbose = True  # ✅ ACTIVADO para debugging
         
+        # Buffers reutilizables: sin reservas de memoria por frame en el bucle
+        self.buffers = FrameBufferPool()
+        self.morph_kernel = np.ones((3, 3), np.uint8)
+        
     def load_config(self, config_file):
         """Cargar configuración"""
         try:
@@ -45,26 +131,127 @@ class RouletteDetector:
         """Activar/desactivar mensajes verbose"""
         self.verbose = verbose
 
+    def to_gray(self, image):
+        """Convertir un frame BGR o BGRA a gris en el buffer reutilizable"""
+        if image.ndim == 2:
+            return image
+        code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        gray = self.buffers.get('gray', image.shape[:2])
+        return cv2.cvtColor(image, code, dst=gray)
+    
+    def circle_edge_support(self, image, circle):
+        """Fracción de puntos de la circunferencia con un borde radial marcado"""
+        x, y, r = circle
+        samples = self.lock_params['samples']
+        if self._lock_angles is None or len(self._lock_angles[0]) != samples:
+            angles = np.linspace(0, 2 * np.pi, samples, endpoint=False)
+            self._lock_angles = (np.cos(angles), np.sin(angles))
+        cos_a, sin_a = self._lock_angles
+        
+        offset = self.lock_params['edge_offset']
+        height, width = image.shape[:2]
+        
+        # Muestrear intensidad justo dentro y justo fuera del borde
+        xs = np.concatenate((x + (r - offset) * cos_a, x + (r + offset) * cos_a)).astype(np.intp)
+        ys = np.concatenate((y + (r - offset) * sin_a, y + (r + offset) * sin_a)).astype(np.intp)
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        np.clip(xs, 0, width - 1, out=xs)
+        np.clip(ys, 0, height - 1, out=ys)
+        
+        values = image[ys, xs].astype(np.int16)
+        contrast = np.abs(values[samples:] - values[:samples])
+        if contrast.ndim == 2:
+            # Frames en color: contraste máximo entre canales B, G, R
+            contrast = contrast[:, :3].max(axis=1)
+        valid = inside[:samples] & inside[samples:]
+        return float(np.count_nonzero(valid & (contrast >= self.lock_params['min_edge_contrast']))) / samples
+    
+    def verify_lock(self, image):
+        """Verificar de forma barata que la rueda bloqueada sigue en su sitio"""
+        self.lock_stats['verifications'] += 1
+        support = self.circle_edge_support(image, self.wheel_lock)
+        return support >= self.lock_params['verify_ratio'] * self.lock_support
+    
+    def reset_lock(self):
+        """Liberar el bloqueo de rueda (la siguiente llamada hará búsqueda completa)"""
+        if self.wheel_lock is not None:
+            self.lock_stats['lock_losses'] += 1
+            if self.verbose:
+                print("🔓 Bloqueo de rueda liberado")
+        self.wheel_lock = None
+        self.lock_support = 0.0
+        self.lock_frames = 0
+    
+    def is_locked(self):
+        """Indica si hay una rueda bloqueada"""
+        return self.wheel_lock is not None
+
     def detect_roulette(self, image):
-        """✅ MÉTODO SIMPLIFICADO - Solo detecta ruleta y devuelve coordenadas"""
+        """Detectar la ruleta usando el bloqueo cuando está disponible"""
+        if not self.lock_params['enabled']:
+            return self.search_roulette(image)
+        
         try:
-            # Convertir a escala de grises
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            if self.wheel_lock is not None:
+                self.lock_frames += 1
+                verified = self.verify_lock(image)
+                if verified and self.lock_frames < self.lock_params['refresh_frames']:
+                    return self.wheel_lock
+            else:
+                verified = False
             
-            # Aplicar desenfoque para reducir ruido
-            blurred = cv2.medianBlur(gray, 5)
+            # Verificación fallida, refresco periódico o sin bloqueo: búsqueda completa
+            wheel = self.search_roulette(image)
+            if wheel is not None:
+                support = self.circle_edge_support(image, wheel)
+                if support >= self.lock_params['min_support']:
+                    if self.wheel_lock is None and self.verbose:
+                        print(f"🔒 Rueda bloqueada - Soporte de borde: {support:.2f}")
+                    self.wheel_lock = wheel
+                    self.lock_support = support
+                    self.lock_frames = 0
+                    return wheel
+                self.reset_lock()
+                return wheel
             
-            # ✅ PARÁMETROS OPTIMIZADOS para detección real
-            circles = cv2.HoughCircles(
-                blurred,
-                cv2.HOUGH_GRADIENT,
-                dp=self.wheel_params['dp'],
-                minDist=self.wheel_params['min_dist'],
-                param1=self.wheel_params['param1'],
-                param2=self.wheel_params['param2'],
-                minRadius=self.wheel_params['min_radius'],
-                maxRadius=self.wheel_params['max_radius']
-            )
+            if verified:
+                # Hough no encontró nada en el refresco pero el borde sigue ahí
+                self.lock_frames = 0
+                return self.wheel_lock
+            
+            self.reset_lock()
+            return None
+            
+        except Exception as e:
+            print(f"❌ Error en detect_roulette: {e}")
+            return None
+
+    def search_roulette(self, image):
+        """✅ Búsqueda completa con HoughCircles - Solo detecta ruleta y devuelve coordenadas"""
+        self.lock_stats['full_searches'] += 1
+        try:
+            # Convertir a escala de grises (acepta BGR o BGRA)
+            gray = self.to_gray(image)
+            
+            if (self.pyramid_params['enabled'] and
+                    gray.shape[1] > self.pyramid_params['max_coarse_width']):
+                # Búsqueda gruesa a baja resolución + refinado local
+                circles = self.pyramid_search(gray)
+            else:
+                # Aplicar desenfoque para reducir ruido
+                blurred = cv2.medianBlur(gray, 5, dst=self.buffers.like('blurred', gray))
+                
+                # ✅ PARÁMETROS OPTIMIZADOS para detección real
+                circles = cv2.HoughCircles(
+                    blurred,
+                    cv2.HOUGH_GRADIENT,
+                    dp=self.wheel_params['dp'],
+                    minDist=self.wheel_params['min_dist'],
+                    param1=self.wheel_params['param1'],
+                    param2=self.wheel_params['param2'],
+                    minRadius=self.wheel_params['min_radius'],
+                    maxRadius=self.wheel_params['max_radius']
+                )
             
             if circles is not None:
                 circles = np.round(circles[0, :]).astype("int")
@@ -95,7 +282,7 @@ class RouletteDetector:
                     if self.verbose:
                         print(f"✅ Ruleta detectada - Centro: ({x}, {y}), Radio: {r}")
                     
-                    return (x, y, r)
+                    return WheelDetection(int(x), int(y), int(r))
                 else:
                     if self.verbose:
                         print("❌ Círculos detectados pero ninguno pasó el filtro")
@@ -106,13 +293,146 @@ class RouletteDetector:
             return None
             
         except Exception as e:
-            print(f"❌ Error en detect_roulette: {e}")
+            print(f"❌ Error en search_roulette: {e}")
             return None
 
-    def detect_roulette_wheel(self, image):
-        """Método original mejorado"""
+    def pyramid_search(self, gray):
+        """Buscar candidatos en una imagen reducida y refinarlos a resolución completa
+        
+        Devuelve el mismo formato que cv2.HoughCircles: array (1, N, 3) o None.
+        """
+        height, width = gray.shape[:2]
+        scale = self.pyramid_params['max_coarse_width'] / width
+        coarse_size = (int(round(width * scale)), int(round(height * scale)))
+        
+        small = cv2.resize(gray, coarse_size, interpolation=cv2.INTER_AREA,
+                           dst=self.buffers.get('coarse_gray', coarse_size[::-1]))
+        small_blurred = cv2.medianBlur(small, 3, dst=self.buffers.like('coarse_blurred', small))
+        
+        min_radius = max(1, int(self.wheel_params['min_radius'] * scale))
+        max_radius = int(np.ceil(self.wheel_params['max_radius'] * scale))
+        circles = self.coarse_hough(small_blurred, scale, min_radius, max_radius)
+        if circles is None:
+            return None
+        
+        # Un píxel de la imagen reducida equivale a 1/scale píxeles a resolución completa
+        margin = int(np.ceil(2.0 / scale)) + self.pyramid_params['accuracy_tolerance']
+        refined = []
+        min_support = self.lock_params['min_support']
+        for coarse in circles[0, :self.pyramid_params['max_candidates']]:
+            # HoughCircles da un solo radio por centro: el cono o el anillo de
+            # bolsillos pueden tapar el borde exterior, que se prueba primero
+            best = None
+            for cx, cy, cr in self.concentric_candidates(small_blurred, scale, coarse, max_radius):
+                coarse_circle = (cx / scale, cy / scale, cr / scale)
+                circle = self.refine_circle(gray, coarse_circle, margin)
+                if circle is not None and self.circle_edge_support(gray, circle) >= min_support:
+                    best = circle
+                    break
+            if best is None:
+                cx, cy, cr = coarse
+                coarse_circle = (cx / scale, cy / scale, cr / scale)
+                best = self.refine_circle(gray, coarse_circle, margin) or coarse_circle
+            refined.append(best)
+        
+        return np.array([refined], dtype=np.float32)
+    
+    def coarse_hough(self, small, scale, min_radius, max_radius, min_dist=None):
+        """HoughCircles sobre la imagen reducida con los parámetros escalados"""
+        if min_dist is None:
+            min_dist = max(1, self.wheel_params['min_dist'] * scale)
+        return cv2.HoughCircles(
+            small,
+            cv2.HOUGH_GRADIENT,
+            dp=self.wheel_params['dp'],
+            minDist=min_dist,
+            param1=self.wheel_params['param1'],
+            param2=self.wheel_params['param2'],
+            minRadius=min_radius,
+            maxRadius=max_radius
+        )
+    
+    def concentric_candidates(self, small, scale, circle, max_radius):
+        """Círculos concéntricos con `circle` en la imagen reducida, de mayor a menor radio"""
+        cx, cy, cr = circle
+        tolerance = 0.05 * cr + 2
+        candidates = [tuple(circle)]
+        min_radius = int(cr) + 3
+        while min_radius < max_radius and len(candidates) < 4:
+            outer = self.coarse_hough(small, scale, min_radius, max_radius, min_dist=1)
+            if outer is None:
+                break
+            match = [c for c in outer[0] if np.hypot(c[0] - cx, c[1] - cy) <= tolerance]
+            if not match:
+                break
+            candidates.append(tuple(match[0]))
+            min_radius = int(match[0][2]) + 3
+        return candidates[::-1]
+    
+    def refine_circle(self, gray, circle, margin):
+        """Ajustar centro y radio con los bordes de un anillo estrecho alrededor de `circle`"""
+        x, y, r = circle
+        height, width = gray.shape[:2]
+        x0 = max(0, int(x - r - margin))
+        y0 = max(0, int(y - r - margin))
+        x1 = min(width, int(x + r + margin) + 1)
+        y1 = min(height, int(y + r + margin) + 1)
+        if x1 - x0 < 3 or y1 - y0 < 3:
+            return None
+        
+        param1 = self.wheel_params['param1']
+        roi = cv2.GaussianBlur(gray[y0:y1, x0:x1], (5, 5), 0)
+        edges = cv2.Canny(roi, param1 / 2, param1)
+        ys, xs = np.nonzero(edges)
+        if len(xs) < 3:
+            return None
+        xs = xs.astype(np.float64) + x0
+        ys = ys.astype(np.float64) + y0
+        
+        # Ajuste algebraico (Kasa) sobre los bordes dentro de la banda; se repite
+        # estrechando la banda hasta la tolerancia de precisión configurada
+        tolerance = self.pyramid_params['accuracy_tolerance']
+        min_points = self.pyramid_params['min_edge_points']
+        band = margin
+        for _ in range(5):
+            distance = np.hypot(xs - x, ys - y)
+            in_band = np.abs(distance - r) <= band
+            if np.count_nonzero(in_band) < min_points:
+                return None
+            bx, by = xs[in_band], ys[in_band]
+            
+            # Por sector angular solo el borde más exterior: el contorno de la
+            # rueda, no los anillos interiores (cono, bolsillos, cara interna del borde)
+            sectors = ((np.arctan2(by - y, bx - x) + np.pi) * (90 / (2 * np.pi))).astype(np.intp)
+            order = np.lexsort((distance[in_band], sectors))
+            sorted_sectors = sectors[order]
+            last = np.append(sorted_sectors[1:] != sorted_sectors[:-1], True)
+            if np.count_nonzero(last) >= min(min_points, 45):
+                bx, by = bx[order[last]], by[order[last]]
+            
+            A = np.column_stack((bx, by, np.ones_like(bx)))
+            b = bx * bx + by * by
+            (a0, a1, a2), _, _, _ = np.linalg.lstsq(A, b, rcond=None)
+            new_x, new_y = a0 / 2, a1 / 2
+            new_r = np.sqrt(a2 + new_x * new_x + new_y * new_y)
+            
+            shift = max(abs(new_x - x), abs(new_y - y), abs(new_r - r))
+            if shift > margin:
+                # El ajuste se fue a otro borde: no es el mismo círculo
+                return None
+            x, y, r = new_x, new_y, new_r
+            if band <= tolerance and shift <= tolerance / 2:
+                break
+            band = max(tolerance, band / 2)
+        
+        return (x, y, r)
+
+    def detect_roulette_wheel(self, image, draw=True):
+        """Método original mejorado (con draw=False no copia ni dibuja el frame)"""
         wheel = self.detect_roulette(image)
         
+        if wheel is not None and not draw:
+            return image, wheel, True
         if wheel is not None:
             x, y, r = wheel
             # Dibujar en la imagen
@@ -125,64 +445,138 @@ class RouletteDetector:
         else:
             return image, None, False
 
-    def detect_ball(self, image, wheel_region):
-        """Detectar la bola"""
+    def find_ball_candidates(self, image, wheel_region, search_window=None):
+        """Extraer y puntuar todos los candidatos a bola dentro de la pista
+        
+        Con `search_window` = (x0, y0, x1, y1) solo se examina la parte de la
+        pista que cae dentro de la ventana. Devuelve un array estructurado
+        (BALL_CANDIDATE_DTYPE) ordenado por puntuación descendente, con
+        coordenadas globales del frame.
+        """
+        if wheel_region is None:
+            return np.empty(0, dtype=BALL_CANDIDATE_DTYPE)
+        
+        x, y, radius = wheel_region
+        
+        # Recortar solo el cuadrado que contiene la pista de la bola
+        track_mask, (x_start, y_start, x_end, y_end) = self.get_ball_track_mask(
+            wheel_region, image.shape[:2])
+        # Los buffers se dimensionan para la pista completa y se usan vistas de ellos
+        full_shape = track_mask.shape
+        
+        if search_window is not None:
+            wx0, wy0, wx1, wy1 = search_window
+            nx0, ny0 = max(x_start, wx0), max(y_start, wy0)
+            nx1, ny1 = min(x_end, wx1), min(y_end, wy1)
+            if nx1 <= nx0 or ny1 <= ny0:
+                return np.empty(0, dtype=BALL_CANDIDATE_DTYPE)
+            track_mask = track_mask[ny0-y_start:ny1-y_start, nx0-x_start:nx1-x_start]
+            x_start, y_start, x_end, y_end = nx0, ny0, nx1, ny1
+        
+        wheel_img = image[y_start:y_end, x_start:x_end]
+        
+        if wheel_img.size == 0:
+            return np.empty(0, dtype=BALL_CANDIDATE_DTYPE)
+        
+        # Buscar objetos brillantes (BGR2HSV acepta también BGRA)
+        ch, cw = wheel_img.shape[:2]
+        hsv = cv2.cvtColor(wheel_img, cv2.COLOR_BGR2HSV,
+                           dst=self.buffers.get('ball_hsv', full_shape + (3,))[:ch, :cw])
+        lower_white = (0, 0, self.ball_params['brightness_threshold'])
+        upper_white = (180, 255, 255)
+        mask = cv2.inRange(hsv, lower_white, upper_white,
+                           dst=self.buffers.get('ball_mask', full_shape)[:ch, :cw])
+        
+        # Descartar todo lo que quede fuera de la pista antes de buscar blobs
+        cv2.bitwise_and(mask, track_mask, dst=mask)
+        
+        # Limpiar máscara
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.morph_kernel,
+                                dst=self.buffers.get('ball_mask_open', full_shape)[:ch, :cw])
+        
+        # Limitar el etiquetado al rectángulo que contiene píxeles brillantes
+        bx, by, bw, bh = cv2.boundingRect(mask)
+        if bw == 0 or bh == 0:
+            return np.empty(0, dtype=BALL_CANDIDATE_DTYPE)
+        labels = self.buffers.get('ball_labels', full_shape, np.int32)[:bh, :bw]
+        
+        # Componentes conexas: estadísticas de todos los blobs en una sola pasada
+        count, _, stats, centroids = cv2.connectedComponentsWithStats(
+            mask[by:by+bh, bx:bx+bw], labels=labels, connectivity=8, ltype=cv2.CV_32S)
+        if count <= 1:
+            return np.empty(0, dtype=BALL_CANDIDATE_DTYPE)
+        
+        # La etiqueta 0 es el fondo
+        stats = stats[1:]
+        centroids = centroids[1:]
+        areas = stats[:, cv2.CC_STAT_AREA]
+        
+        min_area = self.ball_params['min_ball_size']
+        max_area = self.ball_params['max_ball_size']
+        keep = (areas >= min_area) & (areas <= max_area)
+        if not keep.any():
+            return np.empty(0, dtype=BALL_CANDIDATE_DTYPE)
+        
+        areas = areas[keep].astype(np.float32)
+        widths = stats[keep, cv2.CC_STAT_WIDTH].astype(np.float32)
+        heights = stats[keep, cv2.CC_STAT_HEIGHT].astype(np.float32)
+        global_x = centroids[keep, 0] + (x_start + bx)
+        global_y = centroids[keep, 1] + (y_start + by)
+        
+        radius_ratio = np.hypot(global_x - x, global_y - y) / radius
+        
+        # Puntuación: tamaño cercano al esperado, forma compacta y cercanía al borde exterior
+        expected_area = np.sqrt(min_area * max_area)
+        spread = max(np.log(max_area / min_area) / 2, 1e-6)
+        area_score = np.exp(-((np.log(areas / expected_area) / spread) ** 2))
+        aspect_score = np.minimum(widths, heights) / np.maximum(widths, heights)
+        fill_score = np.minimum(areas / (widths * heights) / (np.pi / 4), 1.0)
+        inner = self.ball_params['track_inner_ratio']
+        outer = self.ball_params['track_outer_ratio']
+        track_pos = np.clip((radius_ratio - inner) / max(outer - inner, 1e-6), 0, 1)
+        score = area_score * aspect_score * fill_score * (0.5 + 0.5 * track_pos)
+        
+        candidates = np.empty(len(areas), dtype=BALL_CANDIDATE_DTYPE)
+        candidates['x'] = global_x
+        candidates['y'] = global_y
+        candidates['area'] = areas
+        candidates['radius_ratio'] = radius_ratio
+        candidates['score'] = score
+        return candidates[np.argsort(-score, kind='stable')]
+
+    def locate_ball(self, image, wheel_region, search_window=None):
+        """Posición de la bola con el método de ball_params['method']: BallDetection o None
+        
+        'blobs' puntúa las componentes brillantes de la pista (dentro de
+        `search_window` si se indica); 'polar' hace una búsqueda 1-D sobre
+        la franja desenrollada de toda la pista y deja la validación de la
+        medida a la puerta del tracker.
+        """
+        if self.ball_params['method'] == 'polar':
+            self.last_ball_candidates = np.empty(0, dtype=BALL_CANDIDATE_DTYPE)
+            found = self.detect_ball_polar(image, wheel_region)
+            return BallDetection(*found[0]) if found is not None else None
+        
+        candidates = self.find_ball_candidates(image, wheel_region, search_window)
+        self.last_ball_candidates = candidates
+        if len(candidates) == 0:
+            return None
+        # Mejor candidato según la puntuación
+        return BallDetection(int(candidates[0]['x']), int(candidates[0]['y']))
+
+    def detect_ball(self, image, wheel_region, in_place=False, search_window=None, draw=True):
+        """Detectar la bola (con in_place=True dibuja sobre `image` sin copiarla; con draw=False no dibuja)"""
         try:
             if wheel_region is None:
                 return image, None, False
             
-            x, y, radius = wheel_region
-            
-            # Recortar región de la ruleta
-            margin = 20
-            y_start = max(0, y-radius-margin)
-            y_end = min(image.shape[0], y+radius+margin)
-            x_start = max(0, x-radius-margin)
-            x_end = min(image.shape[1], x+radius+margin)
-            
-            wheel_img = image[y_start:y_end, x_start:x_end]
-            
-            if wheel_img.size == 0:
-                return image, None, False
-            
-            # Buscar objetos brillantes
-            hsv = cv2.cvtColor(wheel_img, cv2.COLOR_BGR2HSV)
-            lower_white = np.array([0, 0, self.ball_params['brightness_threshold']])
-            upper_white = np.array([180, 255, 255])
-            mask = cv2.inRange(hsv, lower_white, upper_white)
+            ball_position = self.locate_ball(image, wheel_region, search_window)
+            output = image if in_place or not draw else image.copy()
             
-            # Limpiar máscara
-            kernel = np.ones((3, 3), np.uint8)
-            mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-            
-            # Encontrar contornos
-            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            ball_position = None
-            output = image.copy()
-            
-            if contours:
-                for contour in contours:
-                    area = cv2.contourArea(contour)
-                    if (area >= self.ball_params['min_ball_size'] and 
-                        area <= self.ball_params['max_ball_size']):
-                        
-                        M = cv2.moments(contour)
-                        if M["m00"] != 0:
-                            cx = int(M["m10"] / M["m00"])
-                            cy = int(M["m01"] / M["m00"])
-                            
-                            global_x = x_start + cx
-                            global_y = y_start + cy
-                            
-                            # Verificar que esté dentro de la ruleta
-                            distance = np.sqrt((global_x - x)**2 + (global_y - y)**2)
-                            if distance <= radius:
-                                ball_position = (global_x, global_y)
-                                cv2.circle(output, (global_x, global_y), 8, (255, 0, 0), -1)
-                                cv2.putText(output, "BOLA", (global_x-20, global_y-15),
-                                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 1)
-                                return output, ball_position, True
+            if ball_position is not None:
+                if draw:
+                    self.draw_ball(output, ball_position)
+                return output, ball_position, True
             
             return output, None, False
             
@@ -190,77 +584,260 @@ class RouletteDetector:
             print(f"❌ Error detectando bola: {e}")
             return image, None, False
 
+    def draw_ball(self, output, ball_position):
+        """Dibujar la bola detectada"""
+        global_x, global_y = ball_position
+        cv2.circle(output, (global_x, global_y), 8, (255, 0, 0), -1)
+        cv2.putText(output, "BOLA", (global_x-20, global_y-15),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 1)
+
+    def get_ball_track_mask(self, wheel_region, image_shape):
+        """Máscara anular de la pista de la bola y su recorte (x0, y0, x1, y1)
+        
+        Se recalcula solo cuando cambia la geometría de la rueda o el tamaño del frame.
+        """
+        key = (tuple(int(v) for v in wheel_region), tuple(image_shape),
+               self.ball_params['track_inner_ratio'], self.ball_params['track_outer_ratio'])
+        if key == self.ball_track_key:
+            return self.ball_track_mask, self.ball_track_bounds
+        
+        x, y, radius = key[0]
+        height, width = image_shape
+        outer = int(np.ceil(radius * self.ball_params['track_outer_ratio']))
+        inner = int(radius * self.ball_params['track_inner_ratio'])
+        
+        x_start = max(0, x - outer)
+        y_start = max(0, y - outer)
+        x_end = min(width, x + outer + 1)
+        y_end = min(height, y + outer + 1)
+        
+        mask = np.zeros((max(0, y_end - y_start), max(0, x_end - x_start)), dtype=np.uint8)
+        center = (x - x_start, y - y_start)
+        cv2.circle(mask, center, outer, 255, -1)
+        cv2.circle(mask, center, inner, 0, -1)
+        
+        self.ball_track_mask = mask
+        self.ball_track_bounds = (x_start, y_start, x_end, y_end)
+        self.ball_track_key = key
+        return mask, self.ball_track_bounds
+
     # Mantener el resto de métodos igual...
-    def test_detection(self, image):
-        """Probar detección completa"""
+    def gate_frame(self, image):
+        """Clasificar el frame (duplicado/estático/movimiento) dentro de la rueda bloqueada"""
+        if not self.gate_params['enabled']:
+            return MotionGate.MOVING
+        
+        roi = None
+        if self.wheel_lock is not None:
+            x, y, r = (int(v) for v in self.wheel_lock)
+            height, width = image.shape[:2]
+            roi = (max(0, x - r), max(0, y - r), min(width, x + r + 1), min(height, y + r + 1))
+        return self.motion_gate.classify(image, roi)
+
+    def get_wheel_geometry(self, wheel):
+        """Geometría polar de la rueda; las tablas solo se rehacen si la rueda cambia"""
+        key = (tuple(int(v) for v in wheel),
+               self.ball_params['track_inner_ratio'], self.ball_params['track_outer_ratio'],
+               tuple(sorted(self.polar_params.items())))
+        if key != self.wheel_geometry_key:
+            self.wheel_geometry = WheelGeometry(
+                key[0],
+                angle_bins=self.polar_params['angle_bins'],
+                radius_bins=self.polar_params['radius_bins'],
+                inner_ratio=self.ball_params['track_inner_ratio'],
+                outer_ratio=self.ball_params['track_outer_ratio'],
+                axis_ratio=self.polar_params['axis_ratio'],
+                rotation=self.polar_params['rotation']
+            )
+            self.wheel_geometry_key = key
+        return self.wheel_geometry
+    
+    def detect_ball_polar(self, image, wheel_region):
+        """Detectar la bola con una búsqueda 1-D sobre la franja polar de la pista
+        
+        Devuelve ((x, y), ángulo, radio) o None.
+        """
+        if wheel_region is None:
+            return None
+        try:
+            geometry = self.get_wheel_geometry(wheel_region)
+            strip = geometry.unwrap(image)
+            found = geometry.find_brightest_angle(strip, self.ball_params['brightness_threshold'])
+            if found is None:
+                return None
+            angle, radius, _ = found
+            x, y = geometry.to_image(angle, radius)
+            return (int(round(x)), int(round(y))), angle, radius
+        except Exception as e:
+            print(f"❌ Error en búsqueda polar de bola: {e}")
+            return None
+
+    def track_ball(self, image, wheel, output=None, timestamp=None):
+        """Detectar la bola guiada por el tracker y actualizar la trayectoria
+        
+        Con el método 'blobs', mientras hay trayectoria se busca solo en la
+        ventana prevista; si la bola no aparece allí cuenta como fallo, y
+        cuando el tracker da la trayectoria por perdida se vuelve a la
+        búsqueda en toda la pista. Con 'polar' se recorre siempre toda la
+        franja y la puerta del tracker descarta las medidas incoherentes.
+        La bola encontrada se dibuja en `output` si se indica.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        
+        window = None
+        if self.tracking_enabled:
+            window = self.ball_tracker.get_search_window(wheel, image.shape, timestamp)
+        
+        perf = self.perf
+        ball = None
+        try:
+            start_ns = time.perf_counter_ns() if perf is not None else 0
+            ball = self.locate_ball(image, wheel, window)
+            if perf is not None:
+                perf.record('ball_detection', time.perf_counter_ns() - start_ns)
+            if ball is not None and output is not None:
+                self.draw_ball(output, ball)
+        except Exception as e:
+            print(f"❌ Error detectando bola: {e}")
+        
+        if self.tracking_enabled:
+            start_ns = time.perf_counter_ns() if perf is not None else 0
+            self.ball_tracker.update(ball, wheel, timestamp)
+            if perf is not None:
+                perf.record('tracking', time.perf_counter_ns() - start_ns)
+        return ball, ball is not None
+
+    def detect_frame(self, image, timestamp=None, detect_ball=True):
+        """Detección sin dibujar nada: FrameDetection(rueda, bola, detectado, timestamp)
+        
+        Con `detect_ball` False solo se busca la rueda (la bola sale None y
+        el tracker no se actualiza), para las fases del giro sin bola en pista.
+        """
+        motion = self.gate_frame(image)
+        previous = self.last_detection
+        
+        # Frame repetido: el resultado anterior sigue siendo válido
+        if (motion == MotionGate.DUPLICATE and previous is not None and
+                self.last_detection_shape == image.shape):
+            self.last_detection = previous._replace(timestamp=timestamp)
+            self.detection_history.append(self.last_detection)
+            return self.last_detection
+        
+        start_ns = time.perf_counter_ns() if self.perf is not None else 0
         wheel = self.detect_roulette(image)
-        result_img = image.copy()
+        if self.perf is not None:
+            self.perf.record('wheel_detection', time.perf_counter_ns() - start_ns)
+        
+        if wheel is not None:
+            if not detect_ball:
+                ball = None
+            elif (motion == MotionGate.STATIC and previous is not None and
+                    previous[0] is not None and tuple(previous[0]) == tuple(wheel)):
+                # Nada se mueve en la rueda: se reutiliza la bola anterior
+                ball = previous[1]
+            else:
+                ball, _ = self.track_ball(image, wheel, None, timestamp)
+            self.last_detection = FrameDetection(wheel, ball, True, timestamp)
+        else:
+            self.last_detection = FrameDetection(None, None, False, timestamp)
         
+        self.last_detection_shape = image.shape
+        self.detection_history.append(self.last_detection)
+        return self.last_detection
+
+    def draw_detection(self, output, wheel, ball):
+        """Dibujar rueda, bola y estado sobre `output`"""
         if wheel is not None:
             x, y, r = wheel
-            cv2.circle(result_img, (x, y), r, (0, 255, 0), 3)
-            cv2.circle(result_img, (x, y), 5, (0, 0, 255), -1)
-            
-            # Detectar bola
-            result_img, ball, ball_found = self.detect_ball(result_img, wheel)
-            
-            status = f"Rueda: SI | Bola: {'SI' if ball_found else 'NO'}"
-            cv2.putText(result_img, status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            
-            return result_img, wheel, ball, True
+            cv2.circle(output, (x, y), r, (0, 255, 0), 3)
+            cv2.circle(output, (x, y), 5, (0, 0, 255), -1)
+            if ball is not None:
+                self.draw_ball(output, ball)
+            status = f"Rueda: SI | Bola: {'SI' if ball is not None else 'NO'}"
+            cv2.putText(output, status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
         else:
-            cv2.putText(result_img, "Rueda: NO | Bola: NO", (10, 30), 
+            cv2.putText(output, "Rueda: NO | Bola: NO", (10, 30), 
                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-            return image, None, None, False
+        return output
 
-    def live_detection_test(self, capture, duration=10):
-        """Prueba en tiempo real"""
-        print("🎥 Iniciando prueba de detección...")
+    def test_detection(self, image, timestamp=None):
+        """Probar detección completa (devuelve también el frame con la detección dibujada)
+        
+        El frame dibujado vive en el buffer reutilizable 'output' y solo es
+        válido hasta la siguiente llamada; para conservarlo hay que copiarlo.
+        """
+        wheel, ball, detected, _ = self.detect_frame(image, timestamp)
+        output = self.buffers.like('output', image)
+        np.copyto(output, image)
+        result_img = self.draw_detection(output, wheel, ball)
+        return result_img, wheel, ball, detected
+
+    def live_detection_test(self, source=None, duration=10, show=True, max_frames=None):
+        """Prueba en tiempo real sobre cualquier origen de frames
+        
+        `source` puede ser un FrameSource, un ScreenCapture, la ruta de un
+        vídeo o carpeta de imágenes, o una lista de frames. Con `duration`
+        None se procesa hasta agotar el origen. Devuelve frames, detecciones
+        y FPS medios. Los orígenes abiertos aquí se cierran al terminar; un
+        FrameSource o ScreenCapture recibido sigue siendo del llamante.
+        """
+        owned = not isinstance(source, FrameSource) and not hasattr(source, 'capture_screen')
+        source = open_frame_source(source)
+        print(f"🎥 Iniciando prueba de detección ({type(source).__name__})...")
         start_time = time.time()
         frame_count = 0
         detection_count = 0
         
-        cv2.namedWindow("Ruleta Detector", cv2.WINDOW_NORMAL)
+        renderer = None
+        if show:
+            # Importación diferida: la vista previa solo hace falta con show=True
+            from interface.preview_renderer import PreviewRenderer
+            renderer = PreviewRenderer(enabled=True, window_name="Ruleta Detector")
+        
+        def preview_lines():
+            return [f"FPS: {frame_count / max(time.time() - start_time, 1e-9):.1f}"]
         
         try:
-            while time.time() - start_time < duration:
-                frame = capture.capture_screen()
-                if frame is not None:
-                    frame_count += 1
-                    
-                    result_img, wheel, ball, detected = self.test_detection(frame)
-                    
-                    if detected:
-                        detection_count += 1
-                    
-                    # Mostrar FPS
-                    fps = frame_count / (time.time() - start_time)
-                    cv2.putText(result_img, f"FPS: {fps:.1f}", (10, 70), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                    
-                    cv2.imshow("Ruleta Detector", result_img)
-                
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+            while duration is None or time.time() - start_time < duration:
+                if max_frames is not None and frame_count >= max_frames:
                     break
+                
+                frame, timestamp = source.read()
+                if frame is None:
+                    if source.finished:
+                        break
+                    continue
+                
+                frame_count += 1
+                wheel, ball, detected, _ = self.detect_frame(frame, timestamp)
+                
+                if detected:
+                    detection_count += 1
+                
+                if renderer is not None:
+                    renderer.submit(frame, wheel, ball, preview_lines)
+                    if renderer.quit_requested:
+                        break
                     
         finally:
-            cv2.destroyAllWindows()
+            if renderer is not None:
+                renderer.close()
+            if owned:
+                source.close()
         
-        print(f"✅ Frames: {frame_count}, Detecciones: {detection_count}")
+        elapsed = time.time() - start_time
+        fps = frame_count / elapsed if elapsed > 0 else 0.0
+        print(f"✅ Frames: {frame_count}, Detecciones: {detection_count}, FPS: {fps:.1f}")
+        return {
+            'frames': frame_count,
+            'detections': detection_count,
+            'elapsed': elapsed,
+            'fps': fps
+        }
 
     def get_detection_stats(self):
-        """Estadísticas de detección"""
-        if not self.detection_history:
+        """Estadísticas de detección (O(1): contadores del histórico circular)"""
+        if len(self.detection_history) == 0:
             return {}
-        
-        total = len(self.detection_history)
-        wheels = sum(1 for r in self.detection_history if r['wheel_detected'])
-        balls = sum(1 for r in self.detection_history if r['ball_detected'])
-        
-        return {
-            'total_detections': total,
-            'wheel_detections': wheels,
-            'ball_detections': balls,
-            'wheel_rate': (wheels / total * 100) if total > 0 else 0,
-            'ball_rate': (balls / total * 100) if total > 0 else 0
-        }
\ No newline at end of file
+        return self.detection_history.get_stats()
@@ -6,6 +6,7 @@ import time
 from PIL import Image
 import json
 import os
+import threading
 
 class ScreenCapture:
     def __init__(self, config_file=None):
@@ -17,6 +18,27 @@ class ScreenCapture:
         self.sct = mss.mss()
         self.setup_capture()
         
+        # Estado del modo productor (captura en segundo plano)
+        self._capture_thread = None
+        self._stop_event = threading.Event()
+        self._frame_ready = threading.Condition()
+        self._ring = None
+        self._ring_timestamps = None
+        self._latest_index = -1
+        self._reading_index = -1
+        self._latest_seq = 0
+        self._consumed_seq = 0
+        self._dropped_frames = 0
+        
+        # Buffer BGR reutilizable de capture_screen (sin asignar memoria por frame)
+        self._bgr_frame = None
+        
+        # Instrumentación opcional (analytics.performance_tracker.PerformanceTracker)
+        self.perf = None
+        
+        if self.config.get('capture', {}).get('threaded', False):
+            self.start_threaded_capture()
+        
     def load_config(self, config_file):
         """Cargar configuración desde archivo JSON"""
         try:
@@ -70,16 +92,39 @@ class ScreenCapture:
             self.monitor = self.sct.monitors[1]
     
     def capture_screen(self):
-        """Capturar la pantalla completa o región configurada"""
+        """Capturar la pantalla completa o región configurada
+        
+        El frame BGR se convierte en un buffer reutilizable y sigue siendo
+        válido hasta la siguiente llamada (igual que en modo productor).
+        Siempre es BGR; para BGRA sin conversión usar capture_screen_bgra().
+        """
+        if self.is_threaded():
+            # En modo productor se entrega el frame más reciente del buffer
+            img, _, _ = self.get_latest_frame()
+            if img is not None and img.shape[2] == 4:
+                # Ring en BGRA (pixel_format 'bgra'): se convierte para respetar el contrato
+                img = self.to_bgr(img)
+            return img, img is not None
+        
         try:
+            perf = self.perf
+            start_ns = time.perf_counter_ns() if perf is not None else 0
+            
             # Capturar según configuración
             screenshot = self.sct.grab(self.monitor)
             
-            # Convertir a array de numpy para OpenCV
-            img = np.array(screenshot)
+            if perf is not None:
+                grabbed_ns = time.perf_counter_ns()
+                perf.record('capture', grabbed_ns - start_ns)
+            
+            # Vista sin copia del buffer BGRA de mss
+            img = self.bgra_view(screenshot)
             
-            # Convertir de BGRA a BGR (OpenCV usa BGR)
-            img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+            # Convertir de BGRA a BGR (OpenCV usa BGR) en el buffer reutilizable
+            img = self.to_bgr(img)
+            
+            if perf is not None:
+                perf.record('conversion', time.perf_counter_ns() - grabbed_ns)
             
             return img, True
             
@@ -87,6 +132,178 @@ class ScreenCapture:
             print(f"❌ Error capturando pantalla: {e}")
             return None, False
     
+    def to_bgr(self, img):
+        """Convertir un frame BGRA a BGR en el buffer reutilizable de capture_screen"""
+        shape = (img.shape[0], img.shape[1], 3)
+        if self._bgr_frame is None or self._bgr_frame.shape != shape:
+            self._bgr_frame = np.empty(shape, dtype=np.uint8)
+        return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR, dst=self._bgr_frame)
+    
+    def capture_screen_bgra(self):
+        """Capturar en BGRA sin copias: el frame envuelve directamente el buffer de mss
+        
+        Lo usa ScreenFrameSource con capture.pixel_format = 'bgra'; el
+        frame es válido hasta la siguiente captura. En modo productor se
+        entrega el frame del ring en su formato (capture.pixel_format).
+        """
+        if self.is_threaded():
+            img, _, _ = self.get_latest_frame()
+            return img, img is not None
+        
+        try:
+            start_ns = time.perf_counter_ns() if self.perf is not None else 0
+            screenshot = self.sct.grab(self.monitor)
+            if self.perf is not None:
+                self.perf.record('capture', time.perf_counter_ns() - start_ns)
+            return self.bgra_view(screenshot), True
+        except Exception as e:
+            print(f"❌ Error capturando pantalla: {e}")
+            return None, False
+    
+    @staticmethod
+    def bgra_view(screenshot):
+        """Envolver el buffer BGRA de una captura de mss sin copiarlo"""
+        return np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(
+            screenshot.height, screenshot.width, 4
+        )
+    
+    def start_threaded_capture(self, buffer_size=None, fps=None, pixel_format=None):
+        """Iniciar captura continua en un hilo productor con buffer circular preasignado"""
+        if self.is_threaded():
+            return True
+        
+        capture_config = self.config.get('capture', {})
+        if buffer_size is None:
+            buffer_size = capture_config.get('buffer_size', 3)
+        if fps is None:
+            fps = capture_config.get('fps', 10)
+        if pixel_format is None:
+            pixel_format = capture_config.get('pixel_format', 'bgr')
+        
+        # Mínimo 3 slots: uno en escritura, el último publicado y el que lee el consumidor
+        buffer_size = max(3, int(buffer_size))
+        height, width = self.monitor['height'], self.monitor['width']
+        channels = 4 if pixel_format == 'bgra' else 3
+        self._ring = np.empty((buffer_size, height, width, channels), dtype=np.uint8)
+        self._ring_timestamps = np.zeros(buffer_size, dtype=np.float64)
+        self._latest_index = -1
+        self._reading_index = -1
+        self._latest_seq = 0
+        self._consumed_seq = 0
+        self._dropped_frames = 0
+        
+        interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self._stop_event.clear()
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop, args=(interval,),
+            name="ScreenCaptureProducer", daemon=True
+        )
+        self._capture_thread.start()
+        print(f"🧵 Captura en segundo plano iniciada: {buffer_size} slots a {fps} FPS")
+        return True
+    
+    def stop_threaded_capture(self, timeout=2.0):
+        """Detener el hilo productor de captura"""
+        if self._capture_thread is None:
+            return
+        self._stop_event.set()
+        with self._frame_ready:
+            self._frame_ready.notify_all()
+        self._capture_thread.join(timeout)
+        self._capture_thread = None
+        print(f"⏹️ Captura en segundo plano detenida (frames descartados: {self._dropped_frames})")
+    
+    def is_threaded(self):
+        """Indica si el hilo productor de captura está activo"""
+        return self._capture_thread is not None and self._capture_thread.is_alive()
+    
+    def get_latest_frame(self, timeout=1.0):
+        """Obtener el frame más reciente: (frame, timestamp, frames_descartados)
+        
+        El frame es una vista del buffer circular y sigue siendo válido hasta
+        la siguiente llamada. Si no llega un frame nuevo en `timeout` segundos
+        se devuelve (None, None, frames_descartados).
+        """
+        with self._frame_ready:
+            self._frame_ready.wait_for(
+                lambda: self._latest_seq > self._consumed_seq or self._stop_event.is_set(),
+                timeout
+            )
+            if self._latest_seq <= self._consumed_seq:
+                return None, None, self._dropped_frames
+            
+            index = self._latest_index
+            self._reading_index = index
+            self._consumed_seq = self._latest_seq
+            return self._ring[index], self._ring_timestamps[index], self._dropped_frames
+    
+    def _next_write_index(self):
+        """Elegir un slot libre: ni el último publicado ni el que lee el consumidor"""
+        for offset in range(1, len(self._ring) + 1):
+            index = (self._latest_index + offset) % len(self._ring)
+            if index != self._latest_index and index != self._reading_index:
+                return index
+        return 0
+    
+    def _capture_loop(self, interval):
+        """Bucle del hilo productor: captura continua al ritmo configurado"""
+        # mss no es thread-safe: cada hilo necesita su propia instancia
+        sct = mss.mss()
+        next_time = time.perf_counter()
+        expected_shape = self._ring.shape[1:]
+        
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    start_ns = time.perf_counter_ns()
+                    screenshot = sct.grab(self.monitor)
+                    timestamp = time.perf_counter()
+                    grabbed_ns = time.perf_counter_ns()
+                    img = self.bgra_view(screenshot)
+                    
+                    if img.shape[:2] != expected_shape[:2]:
+                        print(f"❌ Tamaño de captura inesperado: {img.shape[:2]} != {expected_shape[:2]}")
+                        self._stop_event.wait(0.5)
+                        continue
+                    
+                    with self._frame_ready:
+                        index = self._next_write_index()
+                    
+                    # El slot elegido no es visible para el consumidor hasta publicarlo
+                    if expected_shape[2] == 4:
+                        np.copyto(self._ring[index], img)
+                    else:
+                        cv2.cvtColor(img, cv2.COLOR_BGRA2BGR, dst=self._ring[index])
+                    
+                    perf = self.perf
+                    if perf is not None:
+                        perf.record('capture', grabbed_ns - start_ns)
+                        perf.record('conversion', time.perf_counter_ns() - grabbed_ns)
+                    
+                    with self._frame_ready:
+                        if self._latest_seq > self._consumed_seq:
+                            # El frame anterior nunca se consumió: se descarta
+                            self._dropped_frames += 1
+                        self._ring_timestamps[index] = timestamp
+                        self._latest_index = index
+                        self._latest_seq += 1
+                        self._frame_ready.notify_all()
+                
+                except Exception as e:
+                    print(f"❌ Error en hilo de captura: {e}")
+                    self._stop_event.wait(0.1)
+                
+                # Ritmo fijo compensando la deriva acumulada
+                if interval > 0:
+                    next_time += interval
+                    delay = next_time - time.perf_counter()
+                    if delay > 0:
+                        self._stop_event.wait(delay)
+                    else:
+                        next_time = time.perf_counter()
+        finally:
+            sct.close()
+    
     def capture_region(self, region=None):
         """Capturar una región específica de la pantalla (sobrescribe la configuración)"""
         try:
@@ -104,8 +321,7 @@ class ScreenCapture:
             }
             
             screenshot = self.sct.grab(capture_region)
-            img = np.array(screenshot)
-            img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+            img = cv2.cvtColor(self.bgra_view(screenshot), cv2.COLOR_BGRA2BGR)
             
             return img, True
             
@@ -185,7 +401,9 @@ class ScreenCapture:
         return {
             'monitor': self.monitor,
             'region_configured': 'region' in self.config.get('capture', {}),
-            'config_file': self.config_file if hasattr(self, 'config_file') else 'default'
+            'config_file': self.config_file if hasattr(self, 'config_file') else 'default',
+            'threaded': self.is_threaded(),
+            'dropped_frames': self._dropped_frames
         }
 
 if __name__ == "__main__":
@@ -0,0 +1,227 @@
+import json
+import os
+import time
+from collections import namedtuple
+
+# Evento de frontera de giro: tipo, timestamp del frame, número de giro y datos
+SpinEvent = namedtuple('SpinEvent', ['kind', 'timestamp', 'spin_id', 'data'])
+
+class SpinStateMachine:
+    """Ciclo de vida de un giro a partir de la detección y el tracker
+
+    Fases: 'idle' → 'launched' → 'decelerating' → 'dropped' → 'result' → 'idle'.
+      - idle: mesa en reposo. La bola se busca solo uno de cada
+        `idle_ball_every` frames; si aparece se sigue en todos los frames
+        hasta confirmar (|ω| ≥ `launch_velocity`) o descartar el lanzamiento
+        (bola quieta en un bolsillo, que gira con el rotor).
+      - launched: bola lanzada; el tracker converge.
+      - decelerating: el estado del tracker es fiable (`converged_updates`
+        medidas y σω ≤ `max_velocity_std`); es el momento de predecir.
+      - dropped: |ω| por debajo de `drop_velocity` o trayectoria perdida:
+        la bola abandona la pista y ya no se busca.
+      - result: `settle_time` segundos después de la caída la bola está en
+        su bolsillo; se mantiene `result_hold` segundos sin buscarla.
+    Cada fase activa solo las etapas de `PHASE_STAGES`, y update() devuelve
+    los eventos de frontera (SpinEvent) con el timestamp del frame:
+    'spin_start', 'decelerating', 'ball_dropped', 'spin_result' y
+    'spin_aborted' (rueda perdida durante el giro o bola perdida antes de
+    fiarse del tracker).
+
+    El número ganador no sale de la detección de la bola (no se sigue el
+    rotor): se indica con report_result() en cuanto se conozca, y viaja en
+    los datos del evento 'spin_result'.
+    """
+
+    IDLE = 'idle'
+    LAUNCHED = 'launched'
+    DECELERATING = 'decelerating'
+    DROPPED = 'dropped'
+    RESULT = 'result'
+
+    # Etapas activas en cada fase
+    PHASE_STAGES = {
+        IDLE: frozenset(('wheel', 'ball', 'tracking')),
+        LAUNCHED: frozenset(('wheel', 'ball', 'tracking')),
+        DECELERATING: frozenset(('wheel', 'ball', 'tracking', 'prediction')),
+        DROPPED: frozenset(('wheel',)),
+        RESULT: frozenset(('wheel',)),
+    }
+
+    def __init__(self, config_file=None, tracker=None, verbose=False):
+        if config_file is None:
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            config_file = os.path.join(project_root, 'config', 'settings.json')
+        self.config = self.load_config(config_file)
+
+        # ✅ PARÁMETROS DEL CICLO DE GIRO
+        self.spin_params = {
+            'idle_ball_every': 3,       # En reposo, buscar la bola 1 de cada N frames
+            'launch_velocity': 4.0,     # |ω| mínima (rad/s) para dar la bola por lanzada (> rotor)
+            'launch_updates': 4,        # Medidas antes de confirmar o descartar el lanzamiento
+            'reject_cooldown': 1.0,     # s sin buscar la bola tras descartar un lanzamiento
+            'converged_updates': 8,     # Medidas del tracker para fiarse del estado
+            'max_velocity_std': 1.5,    # Incertidumbre máxima de ω (rad/s) para fiarse del estado
+            'drop_velocity': 6.0,       # |ω| a la que la bola abandona la pista
+            'settle_time': 1.5,         # s desde la caída hasta que la bola queda en el bolsillo
+            'result_hold': 3.0,         # s en 'result' antes de volver a reposo
+            'wheel_timeout': 2.0,       # s sin rueda que anulan un giro en curso
+        }
+
+        # Tracker de la bola (opcional): se reinicia al descartar o terminar un giro
+        self.tracker = tracker
+        self.verbose = verbose
+        self.spin_count = 0
+        self.reset()
+
+    def load_config(self, config_file):
+        """Cargar configuración"""
+        try:
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+                print(f"✅ Configuración cargada desde: {config_file}")
+                return config
+        except Exception as e:
+            print(f"❌ Error cargando configuración: {e}")
+            return {}
+
+    def reset(self):
+        """Volver a reposo sin emitir eventos"""
+        self.phase = self.IDLE
+        self.stages = self.PHASE_STAGES[self.IDLE]
+        self.phase_start = None
+        self.phase_frames = 0
+        self.last_wheel_time = None
+        self.cooldown_until = None
+        self.spin = None
+        self.stats = {phase: 0 for phase in self.PHASE_STAGES}
+        self.stats['spins'] = 0
+        self.stats['aborted'] = 0
+        self.stats['ball_searches'] = 0
+
+    def set_verbose(self, verbose):
+        """Activar/desactivar mensajes de cambio de fase"""
+        self.verbose = verbose
+
+    def is_spinning(self):
+        """Indica si hay un giro en curso (de lanzamiento a resultado)"""
+        return self.phase != self.IDLE
+
+    def ball_detection_due(self, timestamp=None):
+        """Indica si en el siguiente frame hay que buscar la bola"""
+        if 'ball' not in self.stages:
+            return False
+        if self.phase != self.IDLE:
+            return True
+        if self.tracker is not None and self.tracker.is_tracking():
+            # Posible lanzamiento: seguir en todos los frames hasta decidir
+            return True
+        if (self.cooldown_until is not None and timestamp is not None and
+                timestamp < self.cooldown_until):
+            return False
+        return self.phase_frames % self.spin_params['idle_ball_every'] == 0
+
+    def report_result(self, number):
+        """Número ganador del giro en curso (antes de volver a reposo)"""
+        if self.spin is not None:
+            self.spin['result'] = int(number)
+
+    def _enter(self, phase, timestamp):
+        """Cambiar de fase"""
+        self.phase = phase
+        self.stages = self.PHASE_STAGES[phase]
+        self.phase_start = timestamp
+        self.phase_frames = 0
+        if self.verbose:
+            print(f"🎯 Giro: fase '{phase}'")
+
+    def _event(self, kind, timestamp, **data):
+        """Crear un evento del giro en curso"""
+        spin_id = self.spin['id'] if self.spin is not None else None
+        return SpinEvent(kind, timestamp, spin_id, data)
+
+    def _reset_tracker(self):
+        if self.tracker is not None:
+            self.tracker.reset()
+
+    def _abort(self, timestamp, reason):
+        """Anular el giro en curso y volver a reposo"""
+        event = self._event('spin_aborted', timestamp, reason=reason)
+        self.stats['aborted'] += 1
+        self.spin = None
+        self._reset_tracker()
+        self._enter(self.IDLE, timestamp)
+        return event
+
+    def update(self, timestamp, wheel, ball_state, searched_ball=True):
+        """Avanzar con el resultado de un frame; devuelve la lista de eventos
+
+        `ball_state` es BallTracker.get_state() tras el frame y
+        `searched_ball` indica si en este frame se buscó la bola.
+        """
+        params = self.spin_params
+        events = []
+        if self.phase_start is None:
+            self.phase_start = timestamp
+        self.phase_frames += 1
+        self.stats[self.phase] += 1
+        self.stats['ball_searches'] += bool(searched_ball)
+
+        if wheel is not None:
+            self.last_wheel_time = timestamp
+        elif (self.phase in (self.LAUNCHED, self.DECELERATING) and self.last_wheel_time is not None and
+                timestamp - self.last_wheel_time > params['wheel_timeout']):
+            events.append(self._abort(timestamp, 'wheel_lost'))
+            return events
+
+        phase = self.phase
+        if phase == self.IDLE:
+            if ball_state is not None and ball_state['updates'] >= params['launch_updates']:
+                if abs(ball_state['angular_velocity']) >= params['launch_velocity']:
+                    self.spin_count += 1
+                    self.stats['spins'] += 1
+                    self.spin = {'id': self.spin_count, 'launch_time': timestamp,
+                                 'wall_time': time.time(), 'result': None}
+                    self._enter(self.LAUNCHED, timestamp)
+                    events.append(self._event('spin_start', timestamp,
+                                              velocity=ball_state['angular_velocity']))
+                else:
+                    # Bola parada en un bolsillo: no es un lanzamiento
+                    self._reset_tracker()
+                    self.cooldown_until = timestamp + params['reject_cooldown']
+
+        elif phase == self.LAUNCHED:
+            if ball_state is None:
+                events.append(self._abort(timestamp, 'ball_lost'))
+            elif (ball_state['updates'] >= params['converged_updates'] and
+                    ball_state['velocity_std'] <= params['max_velocity_std']):
+                self.spin['ball_velocity'] = ball_state['angular_velocity']
+                self.spin['ball_deceleration'] = ball_state['angular_deceleration']
+                self._enter(self.DECELERATING, timestamp)
+                events.append(self._event('decelerating', timestamp, ball_state=ball_state))
+
+        elif phase == self.DECELERATING:
+            if ball_state is None or abs(ball_state['angular_velocity']) < params['drop_velocity']:
+                self.spin['drop_time'] = timestamp - self.spin['launch_time']
+                self._reset_tracker()
+                self._enter(self.DROPPED, timestamp)
+                events.append(self._event('ball_dropped', timestamp,
+                                          drop_time=self.spin['drop_time']))
+
+        elif phase == self.DROPPED:
+            if timestamp - self.phase_start >= params['settle_time']:
+                self._enter(self.RESULT, timestamp)
+                events.append(self._event('spin_result', timestamp, **self.spin))
+
+        elif phase == self.RESULT:
+            if timestamp - self.phase_start >= params['result_hold']:
+                self._reset_tracker()
+                self.spin = None
+                self._enter(self.IDLE, timestamp)
+
+        return events
+
+    def get_stats(self):
+        """Frames por fase, giros completos y anulados, y búsquedas de bola"""
+        stats = dict(self.stats)
+        stats['phase'] = self.phase
+        return stats
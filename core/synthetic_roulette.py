@@ -0,0 +1,335 @@
+import cv2
+import numpy as np
+
+from core.physics_predictor import WHEEL_ORDER, NUM_POCKETS, POCKET_ANGLE
+
+# Números rojos de la rueda europea (el resto son negros salvo el 0)
+RED_NUMBERS = frozenset((1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36))
+
+# Dibujo con coordenadas subpíxel (OpenCV usa punto fijo con `shift` bits)
+DRAW_SHIFT = 4
+DRAW_SCALE = 1 << DRAW_SHIFT
+
+class SyntheticRoulette:
+    """Generador determinista de frames de ruleta con etiquetas exactas
+
+    Dibuja una mesa con la rueda (cuenco, pista de la bola, anillo de
+    bolsillos que gira con el rotor y cono central) y una bola que sigue
+    una trayectoria angular conocida: desaceleración constante en la pista
+    hasta la velocidad de caída, descenso al anillo de bolsillos durante
+    `settle_time` y después gira con el rotor en su bolsillo. Los ángulos
+    usan el convenio de WheelGeometry y PhysicsPredictor (radianes en
+    coordenadas de imagen; el rotor es el ángulo del centro del bolsillo 0).
+
+    Con la misma semilla se generan exactamente los mismos frames y
+    etiquetas. Los colores de la rueda quedan por debajo del umbral de
+    brillo del detector; solo la bola, el borde y los reflejos son claros.
+    """
+
+    def __init__(self, width=1280, height=720, wheel_center=None, wheel_radius=None,
+                 tilt=0.0, tilt_rotation=0.0, noise_std=0.0, highlight=0.0,
+                 ball_radius=2.25, fps=30.0, seed=None):
+        self.width = width
+        self.height = height
+        if wheel_center is None:
+            wheel_center = (width / 2.0, height / 2.0)
+        if wheel_radius is None:
+            wheel_radius = min(0.3 * min(width, height), 240.0)
+        self.wheel = (float(wheel_center[0]), float(wheel_center[1]), float(wheel_radius))
+        self.axis_ratio = float(np.cos(np.radians(tilt)))
+        self.rotation = float(tilt_rotation)
+        self.noise_std = noise_std
+        self.highlight = highlight
+        self.ball_radius = ball_radius
+        self.fps = fps
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+        # ✅ PARÁMETROS DE LA ESCENA (radios como fracción del radio de la rueda)
+        self.scene_params = {
+            'rim_width': 0.03,             # Grosor del borde claro exterior
+            'ball_track_ratio': 0.86,      # Radio de la bola mientras gira en la pista
+            'pocket_outer_ratio': 0.72,    # Anillo de bolsillos (gira con el rotor)
+            'pocket_inner_ratio': 0.56,
+            'cone_ratio': 0.5,             # Cono central
+            'table_color': (40, 90, 30),
+            'bowl_color': (25, 55, 90),
+            'rim_color': (215, 215, 215),
+            'red_color': (35, 35, 150),
+            'black_color': (25, 25, 25),
+            'green_color': (40, 120, 20),
+            'separator_color': (120, 130, 140),
+            'cone_color': (30, 70, 110),
+            'turret_color': (40, 120, 150),
+            'ball_color': (250, 250, 250),
+            'noise_fields': 4,             # Campos de ruido precalculados (si noise_std > 0)
+        }
+
+        # ✅ PARÁMETROS DEL GIRO (mismo modelo que PhysicsPredictor)
+        self.spin_params = {
+            'ball_velocity': (12.0, 18.0),    # Rango de |ω| inicial de la bola (rad/s)
+            'ball_deceleration': (1.0, 2.0),  # Rango de desaceleración (rad/s²)
+            'rotor_velocity': (1.5, 3.0),     # Rango de |ω| del rotor (rad/s), sentido opuesto
+            'drop_velocity': 6.0,             # |ω| a la que la bola abandona la pista
+            'settle_time': 1.2,               # Tiempo de la caída al bolsillo (s)
+        }
+
+        self.frame = np.empty((height, width, 3), dtype=np.uint8)
+        self._noise = None
+        self.background = self._render_background()
+        self.frame_index = 0
+        self.new_spin()
+
+    def to_image(self, angle, radius):
+        """Punto de la rueda (ángulo, radio) en coordenadas del frame (admite arrays)"""
+        x, y, _ = self.wheel
+        u = radius * np.cos(angle)
+        v = radius * np.sin(angle) * self.axis_ratio
+        cos_r, sin_r = np.cos(self.rotation), np.sin(self.rotation)
+        return x + u * cos_r - v * sin_r, y + u * sin_r + v * cos_r
+
+    def _ellipse(self, image, radius, color, thickness=-1):
+        """Dibujar la proyección de un círculo de la rueda de radio `radius`"""
+        x, y, _ = self.wheel
+        center = (int(round(x * DRAW_SCALE)), int(round(y * DRAW_SCALE)))
+        axes = (int(round(radius * DRAW_SCALE)), int(round(radius * self.axis_ratio * DRAW_SCALE)))
+        cv2.ellipse(image, center, axes, np.degrees(self.rotation), 0, 360, color,
+                    thickness, cv2.LINE_AA, DRAW_SHIFT)
+
+    def _points(self, angles, radii):
+        """Vértices en punto fijo para fillPoly/polylines"""
+        px, py = self.to_image(angles, radii)
+        return np.round(np.stack((px, py), axis=-1) * DRAW_SCALE).astype(np.int32)
+
+    def _render_background(self):
+        """Partes fijas de la escena: mesa, cuenco, pista, borde y reflejo"""
+        params = self.scene_params
+        r = self.wheel[2]
+        background = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        background[:] = params['table_color']
+
+        self._ellipse(background, r, params['bowl_color'])
+        rim = max(2, int(round(r * params['rim_width'])))
+        self._ellipse(background, r - rim / 2.0, params['rim_color'], rim)
+
+        if self.highlight > 0:
+            # Reflejo especular difuso sobre el cuenco (distractor para el detector)
+            glare = np.zeros((self.height, self.width), dtype=np.float32)
+            gx, gy = self.to_image(-2.3, 0.8 * r)
+            cv2.ellipse(glare, (int(gx), int(gy)), (int(0.12 * r), int(0.05 * r)),
+                        np.degrees(-2.3 + np.pi / 2), 0, 360, 1.0, -1)
+            sigma = max(1.0, 0.03 * r)
+            glare = cv2.GaussianBlur(glare, (0, 0), sigma) * float(self.highlight)
+            glare = cv2.merge((glare, glare, glare))
+            background = cv2.add(background, glare, dtype=cv2.CV_8U)
+
+        if self.noise_std > 0:
+            # Banco de campos de ruido: generar ruido gaussiano por frame a 1440p
+            # cuesta más que dibujar la escena; frames consecutivos nunca repiten campo
+            self._noise = [
+                np.clip(np.round(self.rng.standard_normal((self.height, self.width, 3),
+                                                          dtype=np.float32) * self.noise_std),
+                        -127, 127).astype(np.int8)
+                for _ in range(self.scene_params['noise_fields'])
+            ]
+            self._noise_index = 0
+        return background
+
+    def new_spin(self, ball_angle=None, ball_velocity=None, ball_deceleration=None,
+                 rotor_angle=None, rotor_velocity=None):
+        """Nuevo giro; los valores no indicados se sortean con la semilla"""
+        params = self.spin_params
+        rng = self.rng
+        if ball_angle is None:
+            ball_angle = rng.uniform(-np.pi, np.pi)
+        if ball_velocity is None:
+            ball_velocity = -rng.uniform(*params['ball_velocity'])
+        if ball_deceleration is None:
+            ball_deceleration = rng.uniform(*params['ball_deceleration'])
+        if rotor_angle is None:
+            rotor_angle = rng.uniform(-np.pi, np.pi)
+        if rotor_velocity is None:
+            rotor_velocity = -np.sign(ball_velocity) * rng.uniform(*params['rotor_velocity'])
+
+        self.spin = {
+            'ball_angle': float(ball_angle),
+            'ball_velocity': float(ball_velocity),
+            'ball_deceleration': float(abs(ball_deceleration)),
+            'rotor_angle': float(rotor_angle),
+            'rotor_velocity': float(rotor_velocity),
+        }
+
+        # Instantes clave del giro
+        speed = abs(ball_velocity)
+        drop_velocity = min(params['drop_velocity'], speed)
+        self.spin['drop_time'] = (speed - drop_velocity) / max(self.spin['ball_deceleration'], 1e-9)
+        self.spin['settle_time'] = self.spin['drop_time'] + params['settle_time']
+
+        # Bolsillo final: el más cercano al llegar al anillo
+        angle = self._free_ball_angle(self.spin['settle_time'])
+        relative = angle - self.rotor_angle(self.spin['settle_time'])
+        slot = int(np.floor(np.mod(relative, 2 * np.pi) / POCKET_ANGLE + 0.5)) % NUM_POCKETS
+        self.spin['slot'] = slot
+        self.spin['result'] = int(WHEEL_ORDER[slot])
+        self.frame_index = 0
+        return self.spin
+
+    def rotor_angle(self, t):
+        """Ángulo del centro del bolsillo 0 en el instante `t`"""
+        return self.spin['rotor_angle'] + self.spin['rotor_velocity'] * t
+
+    def _free_ball_angle(self, t):
+        """Ángulo de la bola sin contar el asentamiento en el bolsillo"""
+        spin = self.spin
+        direction = np.sign(spin['ball_velocity'])
+        speed = abs(spin['ball_velocity'])
+        decel = spin['ball_deceleration']
+        t_drop = spin['drop_time']
+
+        t_track = min(t, t_drop)
+        angle = spin['ball_angle'] + direction * (speed * t_track - 0.5 * decel * t_track * t_track)
+        if t <= t_drop:
+            return angle
+
+        # Caída: la velocidad pasa linealmente de la de caída a la del rotor
+        settle = self.spin_params['settle_time']
+        tau = min(t - t_drop, settle)
+        drop_velocity = direction * (speed - decel * t_drop)
+        rotor_velocity = spin['rotor_velocity']
+        return angle + drop_velocity * tau + 0.5 * (rotor_velocity - drop_velocity) * tau * tau / settle
+
+    def ball_state(self, t):
+        """Estado real de la bola en `t`: (ángulo, radio, velocidad angular, fase)"""
+        spin = self.spin
+        r = self.wheel[2]
+        params = self.scene_params
+        track_radius = params['ball_track_ratio'] * r
+        pocket_radius = 0.5 * (params['pocket_outer_ratio'] + params['pocket_inner_ratio']) * r
+        direction = np.sign(spin['ball_velocity'])
+        speed = abs(spin['ball_velocity'])
+        decel = spin['ball_deceleration']
+
+        if t <= spin['drop_time']:
+            return self._free_ball_angle(t), track_radius, direction * (speed - decel * t), 'track'
+
+        if t < spin['settle_time']:
+            settle = self.spin_params['settle_time']
+            tau = (t - spin['drop_time']) / settle
+            drop_velocity = direction * (speed - decel * spin['drop_time'])
+            velocity = drop_velocity + (spin['rotor_velocity'] - drop_velocity) * tau
+            radius = track_radius + (pocket_radius - track_radius) * tau
+            return self._free_ball_angle(t), radius, velocity, 'dropping'
+
+        angle = self.rotor_angle(t) + spin['slot'] * POCKET_ANGLE
+        return angle, pocket_radius, spin['rotor_velocity'], 'settled'
+
+    def _draw_rotor(self, image, rotor_angle):
+        """Anillo de bolsillos, separadores y torreta en la posición del rotor"""
+        params = self.scene_params
+        r = self.wheel[2]
+        outer = params['pocket_outer_ratio'] * r
+        inner = params['pocket_inner_ratio'] * r
+
+        # Bolsillo k centrado en rotor_angle + k·POCKET_ANGLE
+        starts = rotor_angle + (np.arange(NUM_POCKETS) - 0.5) * POCKET_ANGLE
+        ends = starts + POCKET_ANGLE
+        angles = np.stack((starts, ends, ends, starts), axis=1)
+        radii = np.array([outer, outer, inner, inner])
+        polygons = self._points(angles, radii[None, :])
+
+        red, black, green = [], [], []
+        for slot, number in enumerate(WHEEL_ORDER):
+            if number == 0:
+                green.append(polygons[slot])
+            elif number in RED_NUMBERS:
+                red.append(polygons[slot])
+            else:
+                black.append(polygons[slot])
+        cv2.fillPoly(image, red, params['red_color'], cv2.LINE_AA, DRAW_SHIFT)
+        cv2.fillPoly(image, black, params['black_color'], cv2.LINE_AA, DRAW_SHIFT)
+        cv2.fillPoly(image, green, params['green_color'], cv2.LINE_AA, DRAW_SHIFT)
+
+        separators = self._points(np.stack((starts, starts), axis=1), np.array([inner, outer])[None, :])
+        cv2.polylines(image, list(separators), False, params['separator_color'], 1, cv2.LINE_AA, DRAW_SHIFT)
+
+        self._ellipse(image, params['cone_ratio'] * r, params['cone_color'])
+        arms = rotor_angle + np.arange(4) * (np.pi / 2)
+        turret = self._points(np.stack((arms, arms + np.pi), axis=1),
+                              np.array([0.25 * r, 0.25 * r])[None, :])
+        cv2.polylines(image, list(turret), False, params['turret_color'],
+                      max(1, int(0.02 * r)), cv2.LINE_AA, DRAW_SHIFT)
+
+    def render(self, t):
+        """Dibujar el frame del instante `t` y devolver (frame, etiqueta)
+
+        El frame es un buffer reutilizado: válido hasta la siguiente llamada.
+        """
+        frame = self.frame
+        np.copyto(frame, self.background)
+
+        rotor_angle = self.rotor_angle(t)
+        self._draw_rotor(frame, rotor_angle)
+
+        angle, radius, velocity, phase = self.ball_state(t)
+        bx, by = self.to_image(angle, radius)
+        cv2.circle(frame, (int(round(bx * DRAW_SCALE)), int(round(by * DRAW_SCALE))),
+                   int(round(self.ball_radius * DRAW_SCALE)), self.scene_params['ball_color'],
+                   -1, cv2.LINE_AA, DRAW_SHIFT)
+
+        if self._noise is not None:
+            step = int(self.rng.integers(1, len(self._noise))) if len(self._noise) > 1 else 0
+            self._noise_index = (self._noise_index + step) % len(self._noise)
+            cv2.add(frame, self._noise[self._noise_index], dst=frame, dtype=cv2.CV_8U)
+
+        label = {
+            'frame': self.frame_index,
+            'timestamp': float(t),
+            'wheel': self.wheel,
+            'axis_ratio': self.axis_ratio,
+            'ball': (float(bx), float(by)),
+            'ball_angle': float(np.arctan2(np.sin(angle), np.cos(angle))),
+            'ball_radius': float(radius),
+            'ball_velocity': float(velocity),
+            'ball_deceleration': self.spin['ball_deceleration'] if phase == 'track' else 0.0,
+            'rotor_angle': float(np.arctan2(np.sin(rotor_angle), np.cos(rotor_angle))),
+            'rotor_velocity': self.spin['rotor_velocity'],
+            'phase': phase,
+            'result': self.spin['result'] if phase == 'settled' else None,
+        }
+        self.frame_index += 1
+        return frame, label
+
+    def frames(self, count=None, duration=None, start=0.0):
+        """Generar (frame, etiqueta) a `fps` durante `count` frames o `duration` segundos"""
+        if count is None:
+            if duration is None:
+                duration = self.spin['settle_time'] + 1.0
+            count = int(round(duration * self.fps))
+        for i in range(count):
+            yield self.render(start + i / self.fps)
+
+    def to_frame_source(self, count=None, duration=None):
+        """Renderizar el giro en memoria: (MemoryFrameSource, etiquetas)"""
+        from core.frame_source import MemoryFrameSource
+        frames, timestamps, labels = [], [], []
+        for frame, label in self.frames(count, duration):
+            frames.append(frame.copy())
+            timestamps.append(label['timestamp'])
+            labels.append(label)
+        return MemoryFrameSource(frames, timestamps, fps=self.fps), labels
+
+    @staticmethod
+    def score(label, wheel=None, ball=None, ball_tolerance=4.0):
+        """Comparar una detección con la etiqueta: errores en píxeles y aciertos"""
+        result = {'wheel_found': wheel is not None, 'ball_found': ball is not None}
+        x, y, r = label['wheel']
+        if wheel is not None:
+            result['center_error'] = float(np.hypot(wheel[0] - x, wheel[1] - y))
+            result['radius_error'] = float(abs(wheel[2] - r))
+        if ball is not None:
+            error = float(np.hypot(ball[0] - label['ball'][0], ball[1] - label['ball'][1]))
+            result['ball_error'] = error
+            result['ball_hit'] = error <= ball_tolerance
+        else:
+            result['ball_hit'] = False
+        return result
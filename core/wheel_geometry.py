@@ -0,0 +1,86 @@
+import cv2
+import numpy as np
+
+class WheelGeometry:
+    """Geometría de una rueda bloqueada y sus tablas de remapeo a coordenadas polares
+
+    Las tablas de cv2.remap se construyen una sola vez por (x, y, r) y se
+    reutilizan en cada frame para convertir la región de la rueda en una
+    franja fija de radio × ángulo: la fila i corresponde al radio
+    inner_ratio·r ... outer_ratio·r y la columna j al ángulo 2π·j/angle_bins
+    (mismo convenio que atan2 en coordenadas de imagen). Opcionalmente
+    corrige la perspectiva modelando la rueda como una elipse con relación
+    de ejes `axis_ratio` y eje mayor girado `rotation` radianes.
+    """
+
+    def __init__(self, wheel, angle_bins=720, radius_bins=48, inner_ratio=0.6,
+                 outer_ratio=0.95, axis_ratio=1.0, rotation=0.0):
+        self.wheel = tuple(float(v) for v in wheel)
+        self.angle_bins = angle_bins
+        self.radius_bins = radius_bins
+        self.inner_ratio = inner_ratio
+        self.outer_ratio = outer_ratio
+        self.axis_ratio = axis_ratio
+        self.rotation = rotation
+
+        self.angles = np.linspace(0, 2 * np.pi, angle_bins, endpoint=False).astype(np.float32)
+        x, y, r = self.wheel
+        self.radii = np.linspace(inner_ratio * r, outer_ratio * r, radius_bins).astype(np.float32)
+
+        # Punto de la rueda para cada (radio, ángulo): círculo aplastado y girado
+        cos_a, sin_a = np.cos(self.angles), np.sin(self.angles)
+        u = self.radii[:, None] * cos_a[None, :]
+        v = self.radii[:, None] * sin_a[None, :] * axis_ratio
+        cos_r, sin_r = np.cos(rotation), np.sin(rotation)
+        map_x = (x + u * cos_r - v * sin_r).astype(np.float32)
+        map_y = (y + u * sin_r + v * cos_r).astype(np.float32)
+
+        # Mapas en punto fijo: remap más rápido que con float32
+        self.map1, self.map2 = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+        self._strip = None
+        self._strip_gray = None
+        self._profile = np.empty((1, angle_bins), dtype=np.uint8)
+
+    def unwrap(self, image, dst=None):
+        """Convertir la rueda del frame en la franja radio × ángulo"""
+        channels = image.shape[2] if image.ndim == 3 else 0
+        if dst is None:
+            shape = (self.radius_bins, self.angle_bins) + ((channels,) if channels else ())
+            if self._strip is None or self._strip.shape != shape:
+                self._strip = np.empty(shape, dtype=image.dtype)
+            dst = self._strip
+        return cv2.remap(image, self.map1, self.map2, cv2.INTER_LINEAR,
+                         dst=dst, borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+
+    def to_gray(self, strip):
+        """Franja en escala de grises (buffer reutilizable)"""
+        if strip.ndim == 2:
+            return strip
+        code = cv2.COLOR_BGRA2GRAY if strip.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        if self._strip_gray is None:
+            self._strip_gray = np.empty(strip.shape[:2], dtype=np.uint8)
+        return cv2.cvtColor(strip, code, dst=self._strip_gray)
+
+    def find_brightest_angle(self, strip, threshold=160):
+        """Búsqueda 1-D de la bola a lo largo del eje angular
+
+        Devuelve (ángulo, radio, brillo) del punto más brillante de la pista,
+        o None si ninguna columna supera `threshold`.
+        """
+        gray = self.to_gray(strip)
+        # Máximo de cada columna (ángulo) a lo largo del radio
+        cv2.reduce(gray, 0, cv2.REDUCE_MAX, dst=self._profile)
+        column = int(np.argmax(self._profile[0]))
+        brightness = int(self._profile[0, column])
+        if brightness < threshold:
+            return None
+        row = int(np.argmax(gray[:, column]))
+        return float(self.angles[column]), float(self.radii[row]), brightness
+
+    def to_image(self, angle, radius):
+        """Convertir (ángulo, radio) de la franja a coordenadas del frame"""
+        x, y, _ = self.wheel
+        u = radius * np.cos(angle)
+        v = radius * np.sin(angle) * self.axis_ratio
+        cos_r, sin_r = np.cos(self.rotation), np.sin(self.rotation)
+        return (x + u * cos_r - v * sin_r, y + u * sin_r + v * cos_r)
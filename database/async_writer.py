@@ -0,0 +1,362 @@
+import queue
+import threading
+import time
+from collections import deque
+
+# Columnas de cada tabla escrita en segundo plano (orden de las tuplas de write)
+TABLE_COLUMNS = {
+    'detections': ('session_id', 'frame_time', 'wheel_x', 'wheel_y', 'wheel_r',
+                   'ball_x', 'ball_y', 'ball_detected'),
+    'spins': ('session_id', 'spin_time', 'result_number', 'predicted_number', 'confidence',
+              'ball_velocity', 'ball_deceleration', 'rotor_velocity', 'drop_time'),
+    'predictions': ('session_id', 'created_at', 'predicted_number', 'confidence',
+                    'probabilities', 'latency_ms'),
+}
+
+# Políticas cuando la cola está llena (MySQL no da abasto)
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+BLOCK = 'block'
+
+class _Flush:
+    """Marca en la cola para forzar una escritura y avisar al terminar (ok: si se escribió)"""
+
+    __slots__ = ('done', 'ok')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = False
+
+_STOP = object()
+
+class AsyncDBWriter:
+    """Escritura en lote de detecciones, giros y predicciones en un hilo aparte
+
+    write() solo encola la fila (sin E/S en el bucle de frames). El hilo
+    escritor agrupa las filas por tabla y las inserta con executemany
+    cuando se juntan `batch_size` filas o pasan `flush_interval` segundos
+    desde la primera pendiente. Si la base de datos va lenta y la cola
+    acotada se llena se aplica la política configurada: descartar la fila
+    más antigua, descartar la nueva o bloquear al productor (con timeout).
+    Los errores de conexión se reintentan con espera exponencial; un error
+    permanente (fila inválida, SQL erróneo) descarta el lote y guarda sus
+    filas en `dead_letters` para no bloquear las escrituras siguientes.
+    Los giros suman también a total_spins de su sesión en la misma
+    transacción. close() vacía la cola y escribe todo lo pendiente.
+    """
+
+    def __init__(self, db_manager, batch_size=500, flush_interval=0.5, max_queue=20000,
+                 policy=DROP_OLDEST, block_timeout=0.05, max_retries=3, max_dead_letters=1000):
+        self.db = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.max_retries = max_retries
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.pending = {table: [] for table in TABLE_COLUMNS}
+        self.pending_count = 0
+        self.statements = {
+            table: db_manager.insert_statement(table, columns)
+            for table, columns in TABLE_COLUMNS.items()
+        }
+
+        # Filas rechazadas por errores permanentes: (tabla, fila, error)
+        self.dead_letters = deque(maxlen=max_dead_letters)
+
+        self.connection = None
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'rejected': 0,
+            'lost_at_close': 0,
+            'batches': 0,
+            'errors': 0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0,
+        }
+
+    def start(self):
+        """Arrancar el hilo escritor"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="AsyncDBWriter", daemon=True)
+        self._thread.start()
+        print(f"🧵 Escritor de base de datos iniciado (lotes de {self.batch_size}, "
+              f"{self.flush_interval}s, política {self.policy})")
+
+    def write(self, table, row):
+        """Encolar una fila (tupla en el orden de TABLE_COLUMNS[table]); False si se descartó"""
+        item = (table, row)
+        try:
+            if self.policy == BLOCK:
+                self.queue.put(item, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(item)
+        except queue.Full:
+            if self.policy != DROP_OLDEST:
+                self._count('dropped')
+                return False
+            # Hacer sitio descartando la fila más antigua; las marcas de
+            # control (_Flush, _STOP) no se descartan: vuelven a la cola
+            controls = []
+            while True:
+                try:
+                    oldest = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if oldest is _STOP or isinstance(oldest, _Flush):
+                    controls.append(oldest)
+                    continue
+                self._count('dropped')
+                break
+            for control in controls:
+                self.queue.put(control)
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self._count('dropped')
+                return False
+        # Contador del productor sin cerrojo: solo lo incrementa el hilo que escribe
+        self.stats['enqueued'] += 1
+        return True
+
+    def write_detection(self, frame_time, wheel, ball, session_id=None):
+        """Encolar la detección de un frame"""
+        if wheel is not None:
+            wheel_x, wheel_y, wheel_r = int(wheel[0]), int(wheel[1]), int(wheel[2])
+        else:
+            wheel_x = wheel_y = wheel_r = None
+        if ball is not None:
+            ball_x, ball_y = int(ball[0]), int(ball[1])
+        else:
+            ball_x = ball_y = None
+        return self.write('detections', (session_id, frame_time, wheel_x, wheel_y, wheel_r,
+                                         ball_x, ball_y, ball is not None))
+
+    def write_spin(self, spin_time, result_number, predicted_number=None, confidence=None,
+                   ball_velocity=None, ball_deceleration=None, rotor_velocity=None,
+                   drop_time=None, session_id=None):
+        """Encolar el resultado de un giro"""
+        return self.write('spins', (session_id, spin_time, int(result_number), predicted_number,
+                                    confidence, ball_velocity, ball_deceleration,
+                                    rotor_velocity, drop_time))
+
+    def write_prediction(self, created_at, predicted_number, confidence, probabilities=None,
+                         latency_ms=None, session_id=None):
+        """Encolar una predicción (probabilities: texto JSON o None)"""
+        return self.write('predictions', (session_id, created_at, int(predicted_number),
+                                          float(confidence), probabilities, latency_ms))
+
+    def flush(self, timeout=5.0):
+        """Escribir ya todo lo encolado; True si se escribió dentro de `timeout`"""
+        if self._thread is None or not self._thread.is_alive():
+            return False
+        marker = _Flush()
+        # Las marcas no pasan por la política de descarte
+        self.queue.put(marker)
+        return marker.done.wait(timeout) and marker.ok
+
+    def close(self, timeout=10.0):
+        """Vaciar la cola, escribir lo pendiente y detener el hilo; devuelve las filas perdidas al cerrar"""
+        if self._thread is None:
+            return 0
+        self.queue.put(_STOP)
+        self._thread.join(timeout)
+        lost = self.stats['lost_at_close']
+        if self._thread.is_alive():
+            unwritten = self.queue.qsize() + self.pending_count
+            print(f"❌ El escritor no terminó en {timeout}s: {unwritten} filas sin escribir")
+            lost += unwritten
+        elif lost:
+            print(f"❌ {lost} filas sin escribir al cerrar (base de datos no disponible)")
+        self._thread = None
+        print(f"⏹️ Escritor detenido: {self.stats['written']} filas escritas, "
+              f"{self.stats['dropped']} descartadas")
+        return lost
+
+    def get_stats(self):
+        """Contadores del escritor y tamaño actual de la cola"""
+        stats = dict(self.stats)
+        stats['queued'] = self.queue.qsize()
+        stats['pending'] = self.pending_count
+        stats['mean_flush_ms'] = (stats['total_flush_ms'] / stats['batches']) if stats['batches'] else 0.0
+        return stats
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _connect(self):
+        """Conexión reservada para el hilo escritor mientras funcione (del pool en MySQL)"""
+        if self.connection is not None:
+            if self.db.ping(self.connection):
+                return True
+            self._release()
+        try:
+            self.connection = self.db.get_connection()
+            return True
+        except self.db.Error as e:
+            print(f"❌ Escritor sin conexión a la base de datos: {e}")
+            self.connection = None
+            return False
+
+    def _release(self):
+        """Devolver la conexión al pool"""
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except self.db.Error:
+                pass
+            self.connection = None
+
+    def _run(self):
+        """Bucle del hilo escritor"""
+        first_pending = None
+        running = True
+        while running:
+            # Esperar como mucho hasta que venza el lote pendiente (o el reintento)
+            timeout = None
+            if first_pending is not None:
+                due = max(first_pending + self.flush_interval, self._retry_at)
+                timeout = max(0.0, due - time.perf_counter())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                running = False
+                # Lo que quede en la cola se escribe antes de salir
+                markers = []
+                while True:
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(item, _Flush):
+                        markers.append(item)
+                    elif item is not _STOP:
+                        self._add(item)
+                written = self._flush_with_retries()
+                if self.pending_count:
+                    # Último intento fallido: lo que queda se pierde y se cuenta
+                    self._count('lost_at_close', self.pending_count)
+                    self._count('dropped', self.pending_count)
+                    for rows in self.pending.values():
+                        rows.clear()
+                    self.pending_count = 0
+                for marker in markers:
+                    marker.ok = written
+                    marker.done.set()
+                break
+
+            if isinstance(item, _Flush):
+                item.ok = self._flush_with_retries()
+                first_pending = time.perf_counter() if self.pending_count else None
+                item.done.set()
+                continue
+
+            if item is not None:
+                self._add(item)
+                if first_pending is None:
+                    first_pending = time.perf_counter()
+
+            now = time.perf_counter()
+            if now >= self._retry_at and (self.pending_count >= self.batch_size or (
+                    first_pending is not None and now - first_pending >= self.flush_interval)):
+                self._flush_pending()
+                first_pending = time.perf_counter() if self.pending_count else None
+
+        self._release()
+
+    def _flush_with_retries(self):
+        """Escribir lo pendiente reintentando con espera exponencial; True si se escribió"""
+        for attempt in range(self.max_retries):
+            if self._flush_pending():
+                return True
+            if self.pending_count == 0:
+                # Lote rechazado por un error permanente: no hay nada que reintentar
+                return False
+            time.sleep(min(0.1 * 2 ** attempt, 1.0))
+        return False
+
+    def _add(self, item):
+        table, row = item
+        self.pending[table].append(row)
+        self.pending_count += 1
+
+    def _flush_pending(self):
+        """Insertar las filas pendientes con un executemany por tabla; True si se escribieron"""
+        if self.pending_count == 0:
+            return True
+        start = time.perf_counter()
+        written = False
+        rejected = None
+        if self._connect():
+            try:
+                for table, rows in self.pending.items():
+                    if rows:
+                        self.db.insert_many(self.connection, self.statements[table], rows)
+                # Contador de giros de cada sesión en la misma transacción (como insert_spin)
+                counts = {}
+                for row in self.pending['spins']:
+                    if row[0] is not None:
+                        counts[row[0]] = counts.get(row[0], 0) + 1
+                if counts:
+                    self.db.count_spins(self.connection, counts)
+                self.connection.commit()
+                written = True
+            except self.db.Error as e:
+                print(f"❌ Error escribiendo lote ({self.pending_count} filas): {e}")
+                if isinstance(e, self.db.PERMANENT_ERRORS):
+                    rejected = e
+                try:
+                    self.connection.rollback()
+                except self.db.Error:
+                    self._release()
+
+        if rejected is not None:
+            # Reintentar el mismo lote fallaría igual: se descarta y se guarda aparte
+            self._count('errors')
+            self._count('rejected', self.pending_count)
+            self._count('dropped', self.pending_count)
+            message = str(rejected)
+            for table, rows in self.pending.items():
+                self.dead_letters.extend((table, row, message) for row in rows)
+                rows.clear()
+            self.pending_count = 0
+        elif written:
+            self._count('written', self.pending_count)
+            self._count('batches')
+            for rows in self.pending.values():
+                rows.clear()
+            self.pending_count = 0
+            self._backoff = 0.0
+            self._retry_at = 0.0
+        else:
+            # Reintento con espera exponencial; mientras tanto las filas se acumulan
+            self._count('errors')
+            self._backoff = min(max(0.1, self._backoff * 2), 5.0)
+            self._retry_at = time.perf_counter() + self._backoff
+            excess = self.pending_count - self.queue.maxsize
+            if excess > 0:
+                # Memoria acotada: se descartan las filas pendientes más antiguas
+                self._count('dropped', excess)
+                self.pending_count -= excess
+                for rows in self.pending.values():
+                    removed = min(excess, len(rows))
+                    del rows[:removed]
+                    excess -= removed
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.stats['total_flush_ms'] += elapsed_ms
+            self.stats['max_flush_ms'] = max(self.stats['max_flush_ms'], elapsed_ms)
+        return written
@@ -1,80 +1,230 @@
 import mysql.connector
-import json
-import os
-from datetime import datetime
+import mysql.connector.pooling
+from mysql.connector import errorcode
+import threading
+import time
+from contextlib import contextmanager
+
+from database.storage_backend import StorageBackend
+
+# Sentencias frecuentes: se preparan una vez por conexión física del pool
+STATEMENTS = {
+    'get_parameter': "SELECT parameter_value FROM learned_parameters WHERE parameter_name = %s",
+    'set_parameter': ("INSERT INTO learned_parameters (parameter_name, parameter_value) VALUES (%s, %s) "
+                      "ON DUPLICATE KEY UPDATE parameter_value = VALUES(parameter_value)"),
+    'active_session': ("SELECT id, session_name, start_time, total_spins FROM prediction_sessions "
+                       "WHERE is_active = TRUE ORDER BY id DESC LIMIT 1"),
+    'start_session': "INSERT INTO prediction_sessions (session_name) VALUES (%s)",
+    'end_session': ("UPDATE prediction_sessions SET end_time = NOW(), is_active = FALSE "
+                    "WHERE id = %s"),
+    'count_spin': "UPDATE prediction_sessions SET total_spins = total_spins + 1 WHERE id = %s",
+    'count_spins': "UPDATE prediction_sessions SET total_spins = total_spins + %s WHERE id = %s",
+    'insert_spin': ("INSERT INTO spins (session_id, spin_time, result_number, predicted_number, "
+                    "confidence, ball_velocity, ball_deceleration, rotor_velocity, drop_time) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)"),
+    'insert_prediction': ("INSERT INTO predictions (session_id, created_at, predicted_number, "
+                          "confidence, probabilities, latency_ms) VALUES (%s, %s, %s, %s, %s, %s)"),
+}
+
+# Errores tras los que los cursores preparados de la conexión ya no sirven:
+# conexión perdida o sentencia desconocida en el servidor (reconexión silenciosa)
+STALE_CURSOR_ERRNOS = (errorcode.CR_SERVER_GONE_ERROR, errorcode.CR_SERVER_LOST,
+                       errorcode.ER_UNKNOWN_STMT_HANDLER)
+
+class DatabaseManager(StorageBackend):
+    """Backend MySQL con un pool de conexiones compartido entre subsistemas
+
+    Cada hilo (GUI, analítica, escritor) toma una conexión del pool con
+    `with db.checkout() as conn:` y la devuelve al salir. Al tomarla se
+    comprueba con ping y se reconecta si el servidor la cerró. Las
+    sentencias de STATEMENTS se preparan en el servidor una sola vez por
+    conexión física y se reutilizan en las llamadas siguientes; si el pool
+    reconecta la conexión (cambia su connection_id) se vuelven a preparar.
+    """
+
+    name = 'mysql'
+    placeholder = '%s'
+    Error = mysql.connector.Error
+    PERMANENT_ERRORS = (mysql.connector.errors.IntegrityError, mysql.connector.errors.ProgrammingError,
+                        mysql.connector.errors.DataError)
+    STATEMENTS = STATEMENTS
 
-class DatabaseManager:
     def __init__(self, config_file=None):
-        if config_file is None:
-            # Buscar config file desde la raíz del proyecto
-            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            config_file = os.path.join(project_root, 'config', 'settings.json')
-        self.config = self.load_config(config_file)
-        self.connection = None
+        super().__init__(config_file)
+
+        # ✅ PARÁMETROS DEL POOL
+        self.pool_params = {
+            'pool_name': self.config.get('pool_name', 'ruleta_pool'),
+            'pool_size': int(self.config.get('pool_size', 5)),       # Conexiones físicas
+            'pool_timeout': float(self.config.get('pool_timeout', 5.0))  # Espera máxima por una libre (s)
+        }
+        self.pool = None
+        self._pool_lock = threading.Lock()
+        # Cursores preparados por conexión física:
+        # {id(conexión): (connection_id, {sentencia: cursor})}
+        self._prepared = {}
     
-    def load_config(self, config_file):
-        """Cargar configuración desde archivo JSON"""
+    def get_pool(self):
+        """Pool de conexiones, creado la primera vez que se necesita"""
+        if self.pool is None:
+            with self._pool_lock:
+                if self.pool is None:
+                    # Sin reset de sesión al devolver: conservaría las sentencias preparadas
+                    self.pool = mysql.connector.pooling.MySQLConnectionPool(
+                        pool_name=self.pool_params['pool_name'],
+                        pool_size=self.pool_params['pool_size'],
+                        pool_reset_session=False,
+                        **self.connection_config()
+                    )
+                    print(f"✅ Pool MySQL creado ({self.pool_params['pool_size']} conexiones)")
+        return self.pool
+
+    def get_connection(self, timeout=None):
+        """Tomar una conexión del pool (esperando si están todas ocupadas)
+
+        El pool ya comprueba la conexión con is_connected() y reconecta si
+        el servidor la cerró; no se hace un segundo ping.
+        """
+        pool = self.get_pool()
+        if timeout is None:
+            timeout = self.pool_params['pool_timeout']
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                conn = pool.get_connection()
+                break
+            except mysql.connector.errors.PoolError:
+                if time.perf_counter() >= deadline:
+                    raise
+                time.sleep(0.01)
+        return conn
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """Conexión del pool para un bloque with; se devuelve al pool al salir"""
+        conn = self.get_connection(timeout)
         try:
-            with open(config_file, 'r') as f:
-                config = json.load(f)
-                print(f"✅ Configuración cargada desde: {config_file}")
-                return config['database']
-        except Exception as e:
-            print(f"❌ Error cargando configuración desde {config_file}: {e}")
-            # Configuración por defecto
-            return {
-                'host': 'localhost',
-                'user': 'root',
-                'password': '',
-                'database': 'ruleta_db',
-                'port': 3306
-            }
-    
-    def connect(self):
-        """Conectar a la base de datos MySQL"""
+            yield conn
+        finally:
+            try:
+                # Sin reset de sesión: no devolver al pool una transacción abierta
+                if conn.in_transaction:
+                    conn.rollback()
+            except mysql.connector.Error:
+                self._prepared.pop(self._physical_id(conn), None)
+            conn.close()
+
+    def _physical_id(self, conn):
+        """Identificador de la conexión física detrás de una conexión del pool"""
+        return id(getattr(conn, '_cnx', conn))
+
+    def _prepared_cursor(self, conn, name):
+        """Cursor preparado de la sentencia `name` para esta conexión física"""
+        key = self._physical_id(conn)
+        connection_id = conn.connection_id
+        entry = self._prepared.get(key)
+        if entry is None or entry[0] != connection_id:
+            # Conexión nueva o reconectada: las sentencias anteriores ya no existen
+            entry = (connection_id, {})
+            self._prepared[key] = entry
+        cursors = entry[1]
+        cursor = cursors.get(name)
+        if cursor is None:
+            cursor = conn.cursor(prepared=True)
+            cursors[name] = cursor
+        return cursor
+
+    def _execute(self, conn, name, params, fetch):
+        """Ejecutar la sentencia preparada `name` sobre una conexión ya tomada"""
+        cursor = self._prepared_cursor(conn, name)
+        cursor.execute(self.STATEMENTS[name], params)
+        if fetch == 'one':
+            result = cursor.fetchone()
+            # Consumir el resto para poder reutilizar el cursor
+            cursor.fetchall()
+            return result
+        if fetch == 'all':
+            return cursor.fetchall()
+        return cursor.lastrowid
+
+    def execute(self, name, params=(), fetch=None, commit=False):
+        """Ejecutar una sentencia preparada de STATEMENTS
+
+        fetch: None (nada), 'one' o 'all'. Devuelve las filas o el lastrowid.
+        Si la conexión se pierde a mitad o el servidor ya no conoce la
+        sentencia preparada se descartan sus cursores y se reintenta una vez.
+        """
+        for attempt in range(2):
+            with self.checkout() as conn:
+                try:
+                    result = self._execute(conn, name, params, fetch)
+                    if commit:
+                        conn.commit()
+                    return result
+                except mysql.connector.Error as e:
+                    stale = e.errno in STALE_CURSOR_ERRNOS or isinstance(
+                        e, (mysql.connector.errors.OperationalError,
+                            mysql.connector.errors.InterfaceError))
+                    if not stale:
+                        raise
+                    # Conexión caída o sentencia desconocida: sus cursores ya no sirven
+                    self._prepared.pop(self._physical_id(conn), None)
+                    if attempt == 1:
+                        raise
+
+    def ping(self, conn):
+        """Comprobar una conexión de larga duración y reconectar si el servidor la cerró"""
         try:
-            self.connection = mysql.connector.connect(**self.config)
-            print("✅ Conectado a la base de datos MySQL")
+            conn.ping(reconnect=True, attempts=1, delay=0)
             return True
-        except mysql.connector.Error as e:
-            print(f"❌ Error conectando a MySQL: {e}")
+        except mysql.connector.Error:
+            self._prepared.pop(self._physical_id(conn), None)
             return False
-    
-    def test_connection(self):
-        """Probar la conexión y estructura de la base de datos"""
-        if not self.connect():
-            return False
-        
+
+    def stream_cursor(self, conn):
+        """Cursor sin buffer: las filas se leen del socket según se piden"""
+        return conn.cursor(buffered=False)
+
+    def close_stream(self, conn, cursor):
+        """Descartar las filas sin leer (si se abandonó el generador) y cerrar el cursor"""
         try:
-            cursor = self.connection.cursor()
-            
-            # Verificar tablas existentes
-            cursor.execute("SHOW TABLES")
-            tables = cursor.fetchall()
-            print("📊 Tablas en la base de datos:")
-            for table in tables:
-                print(f"  - {table[0]}")
-            
-            # Verificar sesiones existentes
-            cursor.execute("SELECT * FROM prediction_sessions")
-            sessions = cursor.fetchall()
-            print("🎯 Sesiones existentes:")
-            for session in sessions:
-                print(f"  - ID: {session[0]}, Nombre: {session[1]}, Activa: {session[5]}")
-            
-            # Verificar parámetros aprendidos
-            cursor.execute("SELECT * FROM learned_parameters")
-            parameters = cursor.fetchall()
-            print("⚙️ Parámetros aprendidos:")
-            for param in parameters:
-                print(f"  - {param[1]}: {param[2]}")
-            
+            if conn.unread_result:
+                conn.consume_results()
             cursor.close()
-            return True
-            
-        except mysql.connector.Error as e:
-            print(f"❌ Error probando base de datos: {e}")
-            return False
+        except mysql.connector.Error:
+            self._prepared.pop(self._physical_id(conn), None)
+
+    def list_tables(self, cursor):
+        """Nombres de las tablas de la base de datos"""
+        cursor.execute("SHOW TABLES")
+        return [table[0] for table in cursor.fetchall()]
+
+    def close(self):
+        """Cerrar cursores preparados y las conexiones libres del pool
+
+        Las conexiones que otro hilo tenga tomadas no se tocan: al
+        devolverlas quedan en el pool abandonado y se liberan con él.
+        """
+        for _, cursors in self._prepared.values():
+            for cursor in cursors.values():
+                try:
+                    cursor.close()
+                except mysql.connector.Error:
+                    pass
+        self._prepared = {}
+        super().close()
+        pool, self.pool = self.pool, None
+        if pool is not None:
+            # Vaciar el pool con su API pública y desconectar cada conexión libre
+            while True:
+                try:
+                    conn = pool.get_connection()
+                except mysql.connector.Error:
+                    break
+                try:
+                    conn.disconnect()
+                except mysql.connector.Error:
+                    pass
 
 if __name__ == "__main__":
     # Probar la conexión
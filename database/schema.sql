@@ -0,0 +1,65 @@
+-- Esquema de ruleta_db (MySQL)
+
+CREATE DATABASE IF NOT EXISTS ruleta_db;
+USE ruleta_db;
+
+-- Sesiones de predicción
+CREATE TABLE IF NOT EXISTS prediction_sessions (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    session_name VARCHAR(100) NOT NULL,
+    start_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    end_time DATETIME NULL,
+    total_spins INT NOT NULL DEFAULT 0,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE
+);
+
+-- Parámetros aprendidos (LearningEngine, calibración...)
+CREATE TABLE IF NOT EXISTS learned_parameters (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    parameter_name VARCHAR(100) NOT NULL UNIQUE,
+    parameter_value MEDIUMTEXT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Resultado de cada giro
+CREATE TABLE IF NOT EXISTS spins (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    session_id INT NULL,
+    spin_time DOUBLE NOT NULL,                -- Epoch en segundos
+    result_number TINYINT NOT NULL,
+    predicted_number TINYINT NULL,
+    confidence FLOAT NULL,
+    ball_velocity FLOAT NULL,                 -- rad/s al iniciar la predicción
+    ball_deceleration FLOAT NULL,             -- rad/s²
+    rotor_velocity FLOAT NULL,
+    drop_time FLOAT NULL,                     -- s desde el lanzamiento hasta la caída
+    INDEX idx_spins_session (session_id, spin_time),
+    FOREIGN KEY (session_id) REFERENCES prediction_sessions(id)
+);
+
+-- Predicciones emitidas
+CREATE TABLE IF NOT EXISTS predictions (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    session_id INT NULL,
+    created_at DOUBLE NOT NULL,
+    predicted_number TINYINT NOT NULL,
+    confidence FLOAT NOT NULL,
+    probabilities TEXT NULL,                  -- JSON con las 37 probabilidades
+    latency_ms FLOAT NULL,
+    INDEX idx_predictions_session (session_id, created_at),
+    FOREIGN KEY (session_id) REFERENCES prediction_sessions(id)
+);
+
+-- Detecciones por frame
+CREATE TABLE IF NOT EXISTS detections (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    session_id INT NULL,
+    frame_time DOUBLE NOT NULL,
+    wheel_x SMALLINT NULL,
+    wheel_y SMALLINT NULL,
+    wheel_r SMALLINT NULL,
+    ball_x SMALLINT NULL,
+    ball_y SMALLINT NULL,
+    ball_detected BOOLEAN NOT NULL DEFAULT FALSE,
+    INDEX idx_detections_session (session_id, frame_time)
+);
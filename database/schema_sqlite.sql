@@ -0,0 +1,60 @@
+-- Esquema de ruleta_db (SQLite, mismas tablas y columnas que schema.sql)
+
+-- Sesiones de predicción
+CREATE TABLE IF NOT EXISTS prediction_sessions (
+    id INTEGER PRIMARY KEY,
+    session_name TEXT NOT NULL,
+    start_time TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    end_time TEXT NULL,
+    total_spins INTEGER NOT NULL DEFAULT 0,
+    is_active INTEGER NOT NULL DEFAULT 1
+);
+
+-- Parámetros aprendidos (LearningEngine, calibración...)
+CREATE TABLE IF NOT EXISTS learned_parameters (
+    id INTEGER PRIMARY KEY,
+    parameter_name TEXT NOT NULL UNIQUE,
+    parameter_value TEXT NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Resultado de cada giro
+CREATE TABLE IF NOT EXISTS spins (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NULL REFERENCES prediction_sessions(id),
+    spin_time REAL NOT NULL,                  -- Epoch en segundos
+    result_number INTEGER NOT NULL,
+    predicted_number INTEGER NULL,
+    confidence REAL NULL,
+    ball_velocity REAL NULL,                  -- rad/s al iniciar la predicción
+    ball_deceleration REAL NULL,              -- rad/s²
+    rotor_velocity REAL NULL,
+    drop_time REAL NULL                       -- s desde el lanzamiento hasta la caída
+);
+CREATE INDEX IF NOT EXISTS idx_spins_session ON spins (session_id, spin_time);
+
+-- Predicciones emitidas
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NULL REFERENCES prediction_sessions(id),
+    created_at REAL NOT NULL,
+    predicted_number INTEGER NOT NULL,
+    confidence REAL NOT NULL,
+    probabilities TEXT NULL,                  -- JSON con las 37 probabilidades
+    latency_ms REAL NULL
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_session ON predictions (session_id, created_at);
+
+-- Detecciones por frame
+CREATE TABLE IF NOT EXISTS detections (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NULL,
+    frame_time REAL NOT NULL,
+    wheel_x INTEGER NULL,
+    wheel_y INTEGER NULL,
+    wheel_r INTEGER NULL,
+    ball_x INTEGER NULL,
+    ball_y INTEGER NULL,
+    ball_detected INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_detections_session ON detections (session_id, frame_time);
@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from database.storage_backend import StorageBackend
+
+# Mismas claves que STATEMENTS de db_manager, en el dialecto de SQLite
+STATEMENTS = {
+    'get_parameter': "SELECT parameter_value FROM learned_parameters WHERE parameter_name = ?",
+    'set_parameter': ("INSERT INTO learned_parameters (parameter_name, parameter_value) VALUES (?, ?) "
+                      "ON CONFLICT(parameter_name) DO UPDATE SET "
+                      "parameter_value = excluded.parameter_value, updated_at = CURRENT_TIMESTAMP"),
+    'active_session': ("SELECT id, session_name, start_time, total_spins FROM prediction_sessions "
+                       "WHERE is_active = 1 ORDER BY id DESC LIMIT 1"),
+    'start_session': "INSERT INTO prediction_sessions (session_name) VALUES (?)",
+    'end_session': ("UPDATE prediction_sessions SET end_time = CURRENT_TIMESTAMP, is_active = 0 "
+                    "WHERE id = ?"),
+    'count_spin': "UPDATE prediction_sessions SET total_spins = total_spins + 1 WHERE id = ?",
+    'count_spins': "UPDATE prediction_sessions SET total_spins = total_spins + ? WHERE id = ?",
+    'insert_spin': ("INSERT INTO spins (session_id, spin_time, result_number, predicted_number, "
+                    "confidence, ball_velocity, ball_deceleration, rotor_velocity, drop_time) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"),
+    'insert_prediction': ("INSERT INTO predictions (session_id, created_at, predicted_number, "
+                          "confidence, probabilities, latency_ms) VALUES (?, ?, ?, ?, ?, ?)"),
+}
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema_sqlite.sql')
+
+class SQLiteDatabaseManager(StorageBackend):
+    """Backend SQLite embebido en modo WAL, sin servidor
+
+    Mismo esquema y API que DatabaseManager (MySQL). Cada hilo usa su
+    propia conexión (checkout) y el escritor asíncrono abre una dedicada
+    con get_connection(). En WAL los lectores no bloquean al escritor, y
+    con synchronous=NORMAL un commit no espera al fsync del disco (solo los
+    checkpoints), así que confirmar un lote cuesta microsegundos en lugar
+    de una ida y vuelta al servidor.
+    """
+
+    name = 'sqlite'
+    placeholder = '?'
+    Error = sqlite3.Error
+    PERMANENT_ERRORS = (sqlite3.IntegrityError, sqlite3.ProgrammingError, sqlite3.DataError)
+    STATEMENTS = STATEMENTS
+
+    def __init__(self, config_file=None, path=None):
+        super().__init__(config_file)
+
+        if path is None:
+            path = self.config.get('sqlite_path', os.path.join('data', 'ruleta.db'))
+        if not os.path.isabs(path):
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            path = os.path.join(project_root, path)
+        self.path = path
+
+        # ✅ PARÁMETROS DE SQLITE
+        self.sqlite_params = {
+            'journal_mode': 'WAL',        # Lectores concurrentes con un escritor
+            'synchronous': 'NORMAL',      # Seguro en WAL; fsync solo en checkpoints
+            'cache_size': -32000,         # 32 MB de caché de páginas (negativo = KiB)
+            'temp_store': 'MEMORY',
+            'mmap_size': 268435456,       # 256 MB mapeados en memoria para lecturas
+            'busy_timeout': 5000,         # ms esperando un bloqueo antes de fallar
+            'foreign_keys': 'ON',
+            'wal_autocheckpoint': 1000,   # Páginas de WAL antes de un checkpoint automático
+            'cached_statements': 256      # Sentencias compiladas reutilizadas por conexión
+        }
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    def get_connection(self, timeout=None):
+        """Nueva conexión configurada (el llamante la cierra con close())"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if timeout is None:
+            timeout = self.sqlite_params['busy_timeout'] / 1000.0
+        conn = sqlite3.connect(self.path, timeout=timeout, check_same_thread=False,
+                               cached_statements=self.sqlite_params['cached_statements'])
+        for pragma in ('journal_mode', 'synchronous', 'cache_size', 'temp_store', 'mmap_size',
+                       'busy_timeout', 'foreign_keys', 'wal_autocheckpoint'):
+            conn.execute(f"PRAGMA {pragma} = {self.sqlite_params[pragma]}")
+
+        with self._lock:
+            if not self._schema_ready:
+                with open(SCHEMA_FILE, 'r') as f:
+                    conn.executescript(f.read())
+                self._schema_ready = True
+        return conn
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """Conexión propia del hilo actual, reutilizada entre llamadas"""
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            conn = self.get_connection(timeout)
+            self._local.connection = conn
+            with self._lock:
+                self._connections.append(conn)
+        try:
+            yield conn
+        finally:
+            # No dejar una transacción abierta entre usos
+            if conn.in_transaction:
+                conn.rollback()
+
+    def list_tables(self, cursor):
+        """Nombres de las tablas de la base de datos"""
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")
+        return [table[0] for table in cursor.fetchall()]
+
+    def checkpoint(self):
+        """Volcar el WAL al fichero principal (p. ej. antes de copiar la base de datos)"""
+        with self.checkout() as conn:
+            return conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+
+    def close(self):
+        """Cerrar las conexiones de todos los hilos"""
+        super().close()
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections = []
+        self._local = threading.local()
+
+if __name__ == "__main__":
+    # Probar la base de datos embebida
+    print("🧪 Probando base de datos SQLite...")
+    db = SQLiteDatabaseManager()
+    if db.test_connection():
+        print("🎉 ¡Base de datos SQLite operativa!")
+    else:
+        print("❌ Falló la base de datos SQLite")
+    db.close()
@@ -0,0 +1,373 @@
+import json
+import os
+import re
+from contextlib import contextmanager
+
+# Claves de la sección database que usa el gestor y no el conector de cada backend
+MANAGER_KEYS = ('backend', 'sqlite_path', 'pool_name', 'pool_size', 'pool_timeout')
+
+# Backend por defecto si settings.json no indica ninguno
+DEFAULT_BACKEND = 'mysql'
+
+# Columnas de cada tabla: lista blanca para las lecturas por columnas
+TABLE_SCHEMAS = {
+    'prediction_sessions': ('id', 'session_name', 'start_time', 'end_time', 'total_spins', 'is_active'),
+    'learned_parameters': ('id', 'parameter_name', 'parameter_value', 'updated_at'),
+    'spins': ('id', 'session_id', 'spin_time', 'result_number', 'predicted_number', 'confidence',
+              'ball_velocity', 'ball_deceleration', 'rotor_velocity', 'drop_time'),
+    'predictions': ('id', 'session_id', 'created_at', 'predicted_number', 'confidence',
+                    'probabilities', 'latency_ms'),
+    'detections': ('id', 'session_id', 'frame_time', 'wheel_x', 'wheel_y', 'wheel_r',
+                   'ball_x', 'ball_y', 'ball_detected'),
+}
+
+# Filtro de lectura: "columna" (igualdad) o "columna<op>" con op en =, !=, <, <=, >, >=
+FILTER_PATTERN = re.compile(r'^(\w+)\s*(=|!=|<=|>=|<|>)?$')
+
+class StorageBackend:
+    """Interfaz común de almacenamiento (MySQL, SQLite)
+
+    Cada backend define su diálogo SQL en STATEMENTS (mismas claves en
+    todos), el marcador de parámetros, la excepción base del conector y
+    cómo se obtiene una conexión. Las operaciones de alto nivel
+    (parámetros aprendidos, sesiones, giros, predicciones) y las
+    inserciones en lote del escritor asíncrono se implementan aquí una sola
+    vez sobre esas piezas.
+    """
+
+    name = None
+    placeholder = '%s'
+    Error = Exception
+    # Errores de los datos o del SQL: reintentar el mismo lote no sirve de nada
+    PERMANENT_ERRORS = ()
+    STATEMENTS = {}
+
+    def __init__(self, config_file=None):
+        if config_file is None:
+            # Buscar config file desde la raíz del proyecto
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            config_file = os.path.join(project_root, 'config', 'settings.json')
+        self.config_file = config_file
+        self.config = self.load_config(config_file)
+        self.connection = None
+
+    def load_config(self, config_file):
+        """Cargar configuración desde archivo JSON"""
+        try:
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+                print(f"✅ Configuración cargada desde: {config_file}")
+                return config['database']
+        except Exception as e:
+            print(f"❌ Error cargando configuración desde {config_file}: {e}")
+            # Configuración por defecto
+            return {
+                'host': 'localhost',
+                'user': 'root',
+                'password': '',
+                'database': 'ruleta_db',
+                'port': 3306
+            }
+
+    def connection_config(self):
+        """Argumentos del conector sin las claves propias del gestor"""
+        return {key: value for key, value in self.config.items() if key not in MANAGER_KEYS}
+
+    def get_connection(self, timeout=None):
+        """Conexión lista para usar; el llamante la cierra (o devuelve al pool) con close()"""
+        raise NotImplementedError
+
+    def checkout(self, timeout=None):
+        """Gestor de contexto con una conexión para un bloque with"""
+        raise NotImplementedError
+
+    def ping(self, conn):
+        """Comprobar (y reconectar si hace falta) una conexión de larga duración"""
+        return True
+
+    def list_tables(self, cursor):
+        """Nombres de las tablas de la base de datos"""
+        raise NotImplementedError
+
+    @contextmanager
+    def cursor(self, commit=False):
+        """Cursor para un bloque with; con commit=True confirma al salir sin errores"""
+        with self.checkout() as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                if commit:
+                    conn.commit()
+            except self.Error:
+                if commit:
+                    conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def _execute(self, conn, name, params, fetch):
+        """Ejecutar la sentencia `name` sobre una conexión ya tomada"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute(self.STATEMENTS[name], params)
+            if fetch == 'one':
+                return cursor.fetchone()
+            if fetch == 'all':
+                return cursor.fetchall()
+            return cursor.lastrowid
+        finally:
+            cursor.close()
+
+    def execute(self, name, params=(), fetch=None, commit=False):
+        """Ejecutar una sentencia de STATEMENTS
+
+        fetch: None (nada), 'one' o 'all'. Devuelve las filas o el lastrowid.
+        """
+        with self.checkout() as conn:
+            result = self._execute(conn, name, params, fetch)
+            if commit:
+                conn.commit()
+            return result
+
+    def insert_statement(self, table, columns):
+        """INSERT de `columns` en `table` con el marcador del backend"""
+        return "INSERT INTO {} ({}) VALUES ({})".format(
+            table, ', '.join(columns), ', '.join([self.placeholder] * len(columns)))
+
+    def insert_many(self, conn, statement, rows):
+        """Insertar un lote de filas (sin confirmar)"""
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(statement, rows)
+        finally:
+            cursor.close()
+
+    def count_spins(self, conn, counts):
+        """Sumar a total_spins los giros escritos en lote: {session_id: giros} (sin confirmar)"""
+        self.insert_many(conn, self.STATEMENTS['count_spins'],
+                         [(spins, session_id) for session_id, spins in counts.items()])
+
+    def _check_columns(self, table, columns):
+        """Validar tabla y columnas contra TABLE_SCHEMAS (se interpolan en el SQL)"""
+        if table not in TABLE_SCHEMAS:
+            raise ValueError(f"Tabla desconocida: {table}")
+        for column in columns:
+            if column not in TABLE_SCHEMAS[table]:
+                raise ValueError(f"Columna desconocida en {table}: {column}")
+
+    def select_statement(self, table, columns, where=None, order_by=None, limit=None):
+        """SELECT de solo `columns`; where es {columna u "columna>=": valor}. Devuelve (sql, params)"""
+        self._check_columns(table, columns)
+        sql = "SELECT {} FROM {}".format(', '.join(columns), table)
+        params = []
+        if where:
+            conditions = []
+            for key, value in where.items():
+                match = FILTER_PATTERN.match(key)
+                if match is None:
+                    raise ValueError(f"Filtro no válido: {key}")
+                column, operator = match.group(1), match.group(2) or '='
+                self._check_columns(table, (column,))
+                if value is None and operator in ('=', '!='):
+                    conditions.append(f"{column} IS {'NOT ' if operator == '!=' else ''}NULL")
+                else:
+                    conditions.append(f"{column} {operator} {self.placeholder}")
+                    params.append(value)
+            sql += " WHERE " + " AND ".join(conditions)
+        if order_by:
+            column, _, direction = order_by.partition(' ')
+            self._check_columns(table, (column,))
+            if direction.upper() not in ('', 'ASC', 'DESC'):
+                raise ValueError(f"Orden no válido: {order_by}")
+            sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return sql, tuple(params)
+
+    def stream_cursor(self, conn):
+        """Cursor que entrega las filas según se piden, sin cargar el resultado entero"""
+        return conn.cursor()
+
+    def close_stream(self, conn, cursor):
+        """Cerrar un cursor de streaming aunque queden filas sin leer"""
+        cursor.close()
+
+    def iter_chunks(self, table, columns, where=None, order_by=None, limit=None, chunk_size=1000):
+        """Generar listas de hasta `chunk_size` filas con fetchmany
+
+        La conexión queda ocupada mientras se consume el generador; la
+        memoria es la de un bloque, sea cual sea el tamaño de la tabla.
+        """
+        sql, params = self.select_statement(table, columns, where, order_by, limit)
+        with self.checkout() as conn:
+            cursor = self.stream_cursor(conn)
+            try:
+                cursor.execute(sql, params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                self.close_stream(conn, cursor)
+
+    def iter_rows(self, table, columns, where=None, order_by=None, limit=None, chunk_size=1000):
+        """Generar filas una a una leyendo por bloques"""
+        for rows in self.iter_chunks(table, columns, where, order_by, limit, chunk_size):
+            yield from rows
+
+    def fetch_page(self, table, columns, after=None, page_size=100, key='id', where=None,
+                   descending=False):
+        """Página por clave (keyset): filas con `key` posterior a `after` y la clave para la siguiente
+
+        `key` tiene que estar entre `columns`. A diferencia de OFFSET, cada
+        página cuesta lo mismo aunque se esté al final de la tabla.
+        """
+        if key not in columns:
+            raise ValueError(f"La clave de paginación {key} tiene que estar en las columnas")
+        where = dict(where or {})
+        if after is not None:
+            where[f"{key}{'<' if descending else '>'}"] = after
+        order_by = f"{key} DESC" if descending else key
+        sql, params = self.select_statement(table, columns, where, order_by, page_size)
+        with self.checkout() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        next_after = rows[-1][columns.index(key)] if len(rows) == page_size else None
+        return rows, next_after
+
+    def iter_pages(self, table, columns, page_size=1000, key='id', where=None, descending=False):
+        """Generar páginas por clave; la conexión se libera entre páginas"""
+        columns = tuple(columns)
+        after = None
+        while True:
+            rows, after = self.fetch_page(table, columns, after, page_size, key, where, descending)
+            if rows:
+                yield rows
+            if after is None:
+                break
+
+    def iter_dataframes(self, table, columns, where=None, order_by=None, limit=None, chunk_size=10000):
+        """Generar DataFrames de pandas de hasta `chunk_size` filas"""
+        import pandas as pd
+
+        columns = tuple(columns)
+        for rows in self.iter_chunks(table, columns, where, order_by, limit, chunk_size):
+            yield pd.DataFrame.from_records(rows, columns=columns)
+
+    def get_parameter(self, name, default=None):
+        """Valor de un parámetro aprendido"""
+        row = self.execute('get_parameter', (name,), fetch='one')
+        return row[0] if row else default
+
+    def set_parameter(self, name, value):
+        """Guardar (o actualizar) un parámetro aprendido"""
+        self.execute('set_parameter', (name, str(value)), commit=True)
+
+    def get_active_session(self):
+        """Sesión activa más reciente como (id, nombre, inicio, giros) o None"""
+        return self.execute('active_session', fetch='one')
+
+    def start_session(self, session_name):
+        """Crear una sesión de predicción y devolver su id"""
+        return self.execute('start_session', (session_name,), commit=True)
+
+    def end_session(self, session_id):
+        """Cerrar una sesión de predicción"""
+        self.execute('end_session', (session_id,), commit=True)
+
+    def insert_spin(self, session_id, spin_time, result_number, predicted_number=None,
+                    confidence=None, ball_velocity=None, ball_deceleration=None,
+                    rotor_velocity=None, drop_time=None):
+        """Guardar un giro al momento (para lotes usar AsyncDBWriter)"""
+        with self.checkout() as conn:
+            spin_id = self._execute(conn, 'insert_spin', (session_id, spin_time, int(result_number),
+                                                          predicted_number, confidence, ball_velocity,
+                                                          ball_deceleration, rotor_velocity, drop_time),
+                                    None)
+            if session_id is not None:
+                self._execute(conn, 'count_spin', (session_id,), None)
+            conn.commit()
+        return spin_id
+
+    def insert_prediction(self, session_id, created_at, predicted_number, confidence,
+                          probabilities=None, latency_ms=None):
+        """Guardar una predicción al momento"""
+        return self.execute('insert_prediction', (session_id, created_at, int(predicted_number),
+                                                  float(confidence), probabilities, latency_ms),
+                            commit=True)
+
+    def connect(self):
+        """Abrir la conexión de self.connection"""
+        try:
+            self.connection = self.get_connection()
+            print(f"✅ Conectado a la base de datos ({self.name})")
+            return True
+        except self.Error as e:
+            print(f"❌ Error conectando a {self.name}: {e}")
+            return False
+
+    def close(self):
+        """Cerrar la conexión de self.connection"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def test_connection(self, preview_rows=20):
+        """Probar la conexión y estructura de la base de datos (muestra hasta `preview_rows` filas)"""
+        if not self.connect():
+            return False
+
+        try:
+            cursor = self.connection.cursor()
+
+            # Verificar tablas existentes
+            tables = self.list_tables(cursor)
+            print("📊 Tablas en la base de datos:")
+            for table in tables:
+                print(f"  - {table}")
+
+            cursor.close()
+
+            # Verificar sesiones existentes (las más recientes, solo las columnas mostradas)
+            print("🎯 Sesiones existentes:")
+            for session_id, name, active in self.iter_rows(
+                    'prediction_sessions', ('id', 'session_name', 'is_active'),
+                    order_by='id DESC', limit=preview_rows):
+                print(f"  - ID: {session_id}, Nombre: {name}, Activa: {active}")
+
+            # Verificar parámetros aprendidos
+            print("⚙️ Parámetros aprendidos:")
+            for name, value in self.iter_rows(
+                    'learned_parameters', ('parameter_name', 'parameter_value'),
+                    order_by='parameter_name', limit=preview_rows):
+                print(f"  - {name}: {value[:80]}")
+            return True
+
+        except self.Error as e:
+            print(f"❌ Error probando base de datos: {e}")
+            return False
+
+def create_database_manager(config_file=None, backend=None, **kwargs):
+    """Gestor de base de datos del backend configurado (database.backend en settings.json)"""
+    if backend is None:
+        backend = DEFAULT_BACKEND
+        try:
+            if config_file is None:
+                project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                config_file = os.path.join(project_root, 'config', 'settings.json')
+            with open(config_file, 'r') as f:
+                backend = json.load(f).get('database', {}).get('backend', DEFAULT_BACKEND)
+        except (OSError, ValueError):
+            pass
+    if backend == 'sqlite':
+        from database.sqlite_manager import SQLiteDatabaseManager
+        return SQLiteDatabaseManager(config_file, **kwargs)
+    if backend == 'mysql':
+        from database.db_manager import DatabaseManager
+        return DatabaseManager(config_file, **kwargs)
+    raise ValueError(f"Backend de base de datos desconocido: {backend}")
@@ -0,0 +1,160 @@
+import cv2
+import json
+import os
+import threading
+import time
+
+class PreviewRenderer:
+    """Vista previa en un hilo propio, desacoplada del bucle de detección
+
+    El bucle de detección llama a submit() con el frame y los datos de la
+    detección (rueda, bola y texto opcional). Solo cuando toca mostrar un
+    frame según `preview_fps` se reduce a `preview_max_width` y se pasa al
+    hilo de dibujo, que pinta los círculos y el texto sobre la copia
+    reducida y la muestra. Los demás frames no se copian ni se dibujan, así
+    que el coste de la vista previa no crece con los FPS de detección, y con
+    interface.show_preview a false submit() retorna sin hacer nada.
+
+    La ventana se crea, se pinta y atiende el teclado siempre desde el hilo
+    de dibujo (HighGUI en Linux y Windows; en macOS las ventanas tienen que
+    vivir en el hilo principal).
+    """
+
+    def __init__(self, config_file=None, enabled=None, max_fps=None, max_width=None,
+                 window_name="Ruleta Predictor"):
+        if config_file is None:
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            config_file = os.path.join(project_root, 'config', 'settings.json')
+        self.config = self.load_config(config_file)
+        interface_config = self.config.get('interface', {})
+
+        # ✅ PARÁMETROS DE LA VISTA PREVIA
+        self.preview_params = {
+            'enabled': interface_config.get('show_preview', True) if enabled is None else enabled,
+            'max_fps': max_fps or interface_config.get('preview_fps', 10),            # Frames mostrados por segundo
+            'max_width': max_width or interface_config.get('preview_max_width', 960), # Ancho máximo mostrado (px)
+        }
+        self.window_name = window_name
+
+        self.interval = 1.0 / self.preview_params['max_fps']
+        self._next_due = 0.0
+        self._pending = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.quit_requested = False
+        self.stats = {'submitted': 0, 'rendered': 0}
+
+    def load_config(self, config_file):
+        """Cargar configuración"""
+        try:
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+                print(f"✅ Configuración cargada desde: {config_file}")
+                return config
+        except Exception as e:
+            print(f"❌ Error cargando configuración: {e}")
+            return {}
+
+    def is_enabled(self):
+        """Indica si la vista previa está activa"""
+        return self.preview_params['enabled']
+
+    def start(self):
+        """Arrancar el hilo de dibujo"""
+        if not self.is_enabled() or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="PreviewRenderer", daemon=True)
+        self._thread.start()
+
+    def submit(self, frame, wheel=None, ball=None, lines=()):
+        """Ofrecer un frame a la vista previa; solo se copia si toca mostrarlo
+
+        `lines` son textos extra (o una función que los devuelve, para no
+        formatearlos en los frames que no se muestran).
+        """
+        if not self.preview_params['enabled']:
+            return False
+        self.stats['submitted'] += 1
+        now = time.perf_counter()
+        if now < self._next_due:
+            return False
+        self._next_due = max(self._next_due + self.interval, now)
+        if self._thread is None:
+            self.start()
+        if callable(lines):
+            lines = lines()
+
+        # Reducir aquí: la copia pequeña es independiente del buffer de captura
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.preview_params['max_width'] / width)
+        if scale < 1.0:
+            small = cv2.resize(frame, (int(width * scale), int(height * scale)),
+                               interpolation=cv2.INTER_AREA)
+        else:
+            small = frame.copy()
+        with self._lock:
+            # Si el hilo va con retraso se sustituye el frame pendiente
+            self._pending = (small, scale, wheel, ball, tuple(lines))
+        self._ready.set()
+        return True
+
+    def draw(self, image, scale, wheel, ball, lines):
+        """Dibujar la detección (en coordenadas del frame original) sobre la copia reducida"""
+        if wheel is not None:
+            x, y, r = (int(round(v * scale)) for v in wheel)
+            cv2.circle(image, (x, y), r, (0, 255, 0), 2)
+            cv2.circle(image, (x, y), 3, (0, 0, 255), -1)
+        if ball is not None:
+            bx, by = int(round(ball[0] * scale)), int(round(ball[1] * scale))
+            cv2.circle(image, (bx, by), 6, (255, 0, 0), -1)
+        status = f"Rueda: {'SI' if wheel is not None else 'NO'} | Bola: {'SI' if ball is not None else 'NO'}"
+        color = (0, 255, 0) if wheel is not None else (0, 0, 255)
+        cv2.putText(image, status, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        for i, line in enumerate(lines):
+            cv2.putText(image, line, (10, 50 + 22 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.55,
+                        (255, 255, 255), 1)
+        return image
+
+    def _run(self):
+        """Bucle del hilo de dibujo"""
+        try:
+            cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
+        except cv2.error as e:
+            print(f"❌ Vista previa no disponible (OpenCV sin interfaz gráfica): {e}")
+            self.preview_params['enabled'] = False
+            return
+
+        try:
+            while not self._stop.is_set():
+                if not self._ready.wait(0.05):
+                    # Atender la ventana aunque no lleguen frames
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        self.quit_requested = True
+                    continue
+                with self._lock:
+                    pending = self._pending
+                    self._pending = None
+                    self._ready.clear()
+                if pending is None:
+                    continue
+
+                image, scale, wheel, ball, lines = pending
+                cv2.imshow(self.window_name, self.draw(image, scale, wheel, ball, lines))
+                self.stats['rendered'] += 1
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    self.quit_requested = True
+        finally:
+            cv2.destroyWindow(self.window_name)
+            cv2.waitKey(1)
+
+    def close(self, timeout=2.0):
+        """Detener el hilo y cerrar la ventana"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._ready.set()
+        self._thread.join(timeout)
+        self._thread = None
@@ -0,0 +1,445 @@
+"""
+RULETA PREDICTOR - Punto de entrada
+
+Encadena captura → detección → seguimiento → predicción → almacenamiento.
+
+Uso:
+    python main.py                            # En vivo con vista previa
+    python main.py --headless                 # En vivo sin ventanas ni dibujos (servidor)
+    python main.py --replay grabacion.mp4     # Repetición de un vídeo o carpeta de imágenes
+    python main.py --replay grabacion.mp4 --realtime
+    python main.py --synthetic --bench        # Giro sintético con informe de rendimiento
+    python main.py --headless --workers 4     # Detección repartida en varios procesos
+    python main.py --max-rate                 # En vivo sin ritmo adaptativo (lo más rápido posible)
+    python main.py --store-detections         # Guardar también cada frame (para reentrenar)
+    python main.py --synthetic --ball-method polar  # Búsqueda de la bola en la franja desenrollada
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from functools import partial
+
+from analytics.learning_engine import LearningEngine
+from analytics.performance_tracker import PerformanceTracker
+from core.frame_scheduler import FrameScheduler
+from core.frame_source import ReplayFrameSource, ScreenFrameSource
+from core.physics_predictor import PhysicsPredictor
+from core.roulette_detector import RouletteDetector
+from core.spin_state import SpinStateMachine
+from database.async_writer import AsyncDBWriter
+from database.storage_backend import create_database_manager
+from interface.preview_renderer import PreviewRenderer
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def synthetic_generator(seed=1, width=1280, height=720):
+    """Generador del giro sintético (misma semilla y tamaño = mismo giro)"""
+    from core.synthetic_roulette import SyntheticRoulette
+    return SyntheticRoulette(width, height, noise_std=3.0, seed=seed)
+
+
+def synthetic_source(seed=1, width=1280, height=720):
+    """Giro sintético en memoria (función de módulo para poder usarla en los workers)"""
+    source, _ = synthetic_generator(seed, width, height).to_frame_source()
+    return source
+
+
+_SYNTHETIC_SPINS = {}
+
+
+def synthetic_spin(seed=1, width=1280, height=720):
+    """Parámetros del giro sintético, calculados una vez (crear el generador tarda ~0.25s)"""
+    key = (seed, width, height)
+    if key not in _SYNTHETIC_SPINS:
+        _SYNTHETIC_SPINS[key] = synthetic_generator(seed, width, height).spin
+    return _SYNTHETIC_SPINS[key]
+
+
+def synthetic_result(spin, seed=1, width=1280, height=720):
+    """Número ganador del giro sintético"""
+    return synthetic_spin(seed, width, height)['result']
+
+
+def synthetic_rotor(spin, timestamp, seed=1, width=1280, height=720):
+    """Estado del rotor del giro sintético en `timestamp` (gira a velocidad constante)"""
+    synthetic = synthetic_spin(seed, width, height)
+    return {
+        'angle': synthetic['rotor_angle'] + synthetic['rotor_velocity'] * timestamp,
+        'angular_velocity': synthetic['rotor_velocity'],
+        'angular_deceleration': 0.0
+    }
+
+
+class RoulettePredictor:
+    """Bucle principal: un frame entra, se detecta, se sigue, se predice y se guarda
+
+    En modo headless no se abre ninguna ventana ni se dibuja nada sobre los
+    frames; la detección devuelve solo datos. SpinStateMachine sigue el
+    ciclo de cada giro y decide en qué frames se busca la bola; la
+    predicción se lanza una vez por giro, al entrar en 'decelerating' si la
+    bola aún va rápida, y el giro se guarda una vez, con su resultado, en el
+    escritor asíncrono de base de datos sin bloquear el bucle. Las
+    detecciones por frame solo se guardan con `store_detections`.
+
+    El número ganador lo da `result_provider(spin)` (o report_result() de la
+    máquina de estados); sin él el giro se registra como predicción sin
+    resultado. El estado del rotor (ángulo del bolsillo 0 y velocidad) lo
+    da `rotor_provider(spin, timestamp)`: todavía no se mide en la imagen, y
+    sin él no se predice, porque suponer el rotor parado daría un número
+    sin relación con el giro real.
+    """
+
+    def __init__(self, config_file=None, headless=False, store=True, store_detections=False,
+                 result_provider=None, rotor_provider=None, ball_method=None):
+        if config_file is None:
+            config_file = os.path.join(PROJECT_ROOT, 'config', 'settings.json')
+        self.config_file = config_file
+        self.config = self.load_config(config_file)
+
+        self.headless = headless
+        self.show_preview = not headless and self.config.get('interface', {}).get('show_preview', True)
+        self.renderer = PreviewRenderer(config_file, enabled=self.show_preview)
+
+        self.perf = PerformanceTracker()
+        self.perf.add_stage('frame')
+
+        self.detector = RouletteDetector(config_file)
+        self.detector.set_verbose(False)
+        self.detector.perf = self.perf
+        # Método de búsqueda de la bola: el de la línea de comandos o detection.ball_method
+        self.ball_method = ball_method
+        if ball_method is not None:
+            self.detector.ball_params['method'] = ball_method
+        self.predictor = PhysicsPredictor(config_file)
+        self.learning = LearningEngine(config_file)
+        self.spin_state = SpinStateMachine(config_file, tracker=self.detector.ball_tracker,
+                                           verbose=not headless)
+        self.result_provider = result_provider
+        self.rotor_provider = rotor_provider
+
+        # ✅ PARÁMETROS DE DISPARO DE LA PREDICCIÓN (el tracker ya es fiable en 'decelerating')
+        self.prediction_params = {
+            'min_velocity': 8.0,       # rad/s: por debajo la bola está a punto de caer
+        }
+        self.last_prediction = None
+
+        self.db = None
+        self.writer = None
+        self.session_id = None
+        self.store_detections = store_detections
+        if store:
+            self.open_storage()
+
+        self.stats = {'frames': 0, 'detections': 0, 'balls': 0, 'predictions': 0, 'spins': 0,
+                      'no_rotor': 0}
+
+    def load_config(self, config_file):
+        """Cargar configuración"""
+        try:
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+                print(f"✅ Configuración cargada desde: {config_file}")
+                return config
+        except Exception as e:
+            print(f"❌ Error cargando configuración: {e}")
+            return {}
+
+    def open_storage(self):
+        """Abrir la base de datos, crear la sesión y arrancar el escritor asíncrono"""
+        db = create_database_manager(self.config_file)
+        try:
+            self.session_id = db.start_session(time.strftime("Sesión %Y-%m-%d %H:%M:%S"))
+        except db.Error as e:
+            print(f"⚠️ Sin almacenamiento ({db.name}): {e}")
+            db.close()
+            return
+        self.db = db
+        self.writer = AsyncDBWriter(db)
+        self.writer.start()
+
+    def handle_detection(self, timestamp, wheel, ball, ball_state, searched_ball=True):
+        """Avanzar el ciclo del giro con el resultado de un frame"""
+        self.stats['frames'] += 1
+        self.stats['detections'] += wheel is not None
+        self.stats['balls'] += ball is not None
+
+        for event in self.spin_state.update(timestamp, wheel, ball_state, searched_ball):
+            self.handle_spin_event(event)
+
+        if self.writer is not None and self.store_detections:
+            start_ns = time.perf_counter_ns()
+            self.writer.write_detection(timestamp, wheel, ball, self.session_id)
+            self.perf.record('db_write', time.perf_counter_ns() - start_ns)
+
+    def handle_spin_event(self, event):
+        """Predicción y almacenamiento en las fronteras del giro"""
+        if event.kind == 'decelerating':
+            if self.ready_to_predict(event.data['ball_state']):
+                rotor_state = None
+                if self.rotor_provider is not None:
+                    rotor_state = self.rotor_provider(self.spin_state.spin, event.timestamp)
+                if rotor_state is None:
+                    # Sin rotor la predicción no vale nada: ni se guarda ni se puntúa
+                    self.stats['no_rotor'] += 1
+                    if not self.headless:
+                        print(f"⚠️ Giro {event.spin_id} sin estado del rotor: no se predice")
+                    return
+                self.predict(event.data['ball_state'], rotor_state)
+        elif event.kind == 'spin_result':
+            self.record_spin(event.data)
+        elif event.kind == 'spin_aborted' and not self.headless:
+            print(f"⚠️ Giro {event.spin_id} anulado ({event.data['reason']})")
+
+    def ready_to_predict(self, ball_state):
+        """Todavía queda tiempo antes de la caída"""
+        return abs(ball_state['angular_velocity']) >= self.prediction_params['min_velocity']
+
+    def predict(self, ball_state, rotor_state):
+        """Predecir el número final (una vez por giro)"""
+        start_ns = time.perf_counter_ns()
+        prediction = self.predictor.predict(ball_state, rotor_state)
+        probabilities = prediction['probabilities']
+        if self.learning.is_ready():
+            probabilities = self.learning.adjust_probabilities(probabilities)
+        number = int(probabilities.argmax())
+        confidence = float(probabilities[number])
+        self.perf.record('prediction', time.perf_counter_ns() - start_ns)
+
+        spin = self.spin_state.spin
+        if spin is not None:
+            spin['predicted_number'] = number
+            spin['confidence'] = confidence
+            spin['rotor_velocity'] = rotor_state['angular_velocity']
+        self.stats['predictions'] += 1
+        self.last_prediction = {'number': number, 'confidence': confidence,
+                                'drop_time': prediction['drop_time']}
+        if not self.headless:
+            print(f"🎯 Predicción: {number} ({confidence * 100:.1f}%), "
+                  f"caída en {prediction['drop_time']:.1f}s")
+
+        if self.writer is not None:
+            start_ns = time.perf_counter_ns()
+            self.writer.write_prediction(time.time(), number, confidence,
+                                         json.dumps([round(float(p), 5) for p in probabilities]),
+                                         prediction['latency_ms'], self.session_id)
+            self.perf.record('db_write', time.perf_counter_ns() - start_ns)
+
+    def record_spin(self, spin):
+        """Aprender del giro terminado y guardarlo (una fila por giro)"""
+        number = spin['result']
+        if number is None and self.result_provider is not None:
+            number = self.result_provider(spin)
+        if number is None:
+            if not self.headless:
+                print(f"⚠️ Giro {spin['id']} sin número ganador: no se guarda")
+            return
+        predicted = spin.get('predicted_number')
+        self.learning.record_spin(number, predicted)
+        self.stats['spins'] += 1
+        if not self.headless:
+            print(f"🎯 Resultado del giro {spin['id']}: {number}"
+                  f"{f' (previsto {predicted})' if predicted is not None else ''}")
+
+        if self.writer is not None:
+            start_ns = time.perf_counter_ns()
+            self.writer.write_spin(spin['wall_time'], number, predicted, spin.get('confidence'),
+                                   spin.get('ball_velocity'), spin.get('ball_deceleration'),
+                                   spin.get('rotor_velocity'), spin.get('drop_time'), self.session_id)
+            self.perf.record('db_write', time.perf_counter_ns() - start_ns)
+
+    def preview_lines(self, start_time):
+        """Texto de la vista previa (solo se formatea en los frames mostrados)"""
+        lines = [f"FPS: {self.stats['frames'] / max(time.perf_counter() - start_time, 1e-9):.1f}"]
+        if self.last_prediction is not None:
+            lines.append(f"Prediccion: {self.last_prediction['number']} "
+                         f"({self.last_prediction['confidence'] * 100:.0f}%)")
+        return lines
+
+    def run(self, source, max_frames=None, duration=None, scheduler=None):
+        """Procesar frames de `source` en este proceso
+
+        Con `scheduler` (FrameScheduler) el ritmo de lectura se adapta a la
+        fase del giro; sin él se procesa lo más rápido posible.
+        """
+        print(f"🎥 Procesando {type(source).__name__}"
+              f"{' (headless)' if self.headless else ''}...")
+        perf = self.perf
+        detector = self.detector
+        if scheduler is not None:
+            scheduler.reset()
+        start_time = time.perf_counter()
+        try:
+            while duration is None or time.perf_counter() - start_time < duration:
+                if max_frames is not None and self.stats['frames'] >= max_frames:
+                    break
+                frame_start = time.perf_counter_ns()
+                frame, timestamp = source.read()
+                perf.record('capture', time.perf_counter_ns() - frame_start)
+                if frame is None:
+                    if source.finished:
+                        break
+                    continue
+
+                # La fase del giro decide si en este frame se busca la bola
+                detect_ball = self.spin_state.ball_detection_due(timestamp)
+                detection = detector.detect_frame(frame, timestamp, detect_ball)
+                self.handle_detection(timestamp, detection.wheel, detection.ball,
+                                      detector.ball_tracker.get_state(), detect_ball)
+
+                if self.show_preview:
+                    self.renderer.submit(frame, detection.wheel, detection.ball,
+                                         partial(self.preview_lines, start_time))
+                    if self.renderer.quit_requested:
+                        break
+                perf.record('frame', time.perf_counter_ns() - frame_start)
+
+                if scheduler is not None:
+                    scheduler.update(detection.wheel, detection.ball,
+                                     detector.motion_gate.last_state)
+                    scheduler.wait()
+        except KeyboardInterrupt:
+            print("⏹️ Detenido por el usuario")
+        finally:
+            source.close()
+            self.renderer.close()
+        return self.summary(time.perf_counter() - start_time)
+
+    def run_pipeline(self, source_factory, workers, max_frames=None, duration=None):
+        """Procesar frames con la detección repartida en `workers` procesos
+
+        La máquina de estados del giro usa el tracker del pipeline, y su
+        decisión de buscar o no la bola se pasa a los workers; se aplica con
+        el retraso de los frames que ya están en curso.
+        """
+        from core.detection_pipeline import DetectionPipeline
+
+        if self.show_preview:
+            print("⚠️ Sin vista previa con --workers: los frames no salen de los procesos de detección")
+        pipeline = DetectionPipeline(self.config_file, source_factory=source_factory, workers=workers,
+                                     ball_method=self.ball_method)
+        self.spin_state.tracker = pipeline.ball_tracker
+        pipeline.start()
+        start_time = time.perf_counter()
+        try:
+            for result in pipeline.results():
+                self.handle_detection(result['timestamp'], result['wheel'], result['ball'],
+                                      result['ball_state'], result['searched_ball'])
+                pipeline.set_ball_detection(self.spin_state.ball_detection_due(result['timestamp']))
+                self.perf.record('frame', int(result['latency_ms'] * 1e6))
+                if max_frames is not None and self.stats['frames'] >= max_frames:
+                    break
+                if duration is not None and time.perf_counter() - start_time >= duration:
+                    break
+        except KeyboardInterrupt:
+            print("⏹️ Detenido por el usuario")
+        finally:
+            pipeline.stop()
+            self.spin_state.tracker = self.detector.ball_tracker
+        summary = self.summary(time.perf_counter() - start_time)
+        summary['dropped'] = pipeline.stats['dropped']
+        return summary
+
+    def summary(self, elapsed):
+        """Resumen de la ejecución"""
+        summary = dict(self.stats)
+        summary['elapsed'] = elapsed
+        summary['fps'] = self.stats['frames'] / elapsed if elapsed > 0 else 0.0
+        return summary
+
+    def close(self):
+        """Vaciar el escritor y cerrar la sesión"""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self.db is not None:
+            try:
+                self.db.end_session(self.session_id)
+            except self.db.Error as e:
+                print(f"❌ Error cerrando la sesión: {e}")
+            self.db.close()
+            self.db = None
+
+
+def build_source_factory(args, config_file):
+    """Función sin argumentos que crea el origen de frames pedido"""
+    if args.synthetic:
+        return partial(synthetic_source, seed=args.seed)
+    if args.replay:
+        return partial(ReplayFrameSource, args.replay, realtime=args.realtime, loop=args.loop)
+    return partial(ScreenFrameSource, config_file=config_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ruleta Predictor")
+    parser.add_argument('--config', help="Ruta de settings.json")
+    parser.add_argument('--headless', action='store_true', help="Sin ventanas ni dibujos sobre los frames")
+    parser.add_argument('--replay', help="Vídeo o carpeta de imágenes en lugar de la pantalla")
+    parser.add_argument('--realtime', action='store_true', help="Repetir al ritmo original de la grabación")
+    parser.add_argument('--loop', action='store_true', help="Repetir la grabación en bucle")
+    parser.add_argument('--synthetic', action='store_true', help="Giro sintético en lugar de la pantalla")
+    parser.add_argument('--seed', type=int, default=1, help="Semilla del giro sintético")
+    parser.add_argument('--bench', action='store_true', help="Informe de rendimiento al terminar")
+    parser.add_argument('--workers', type=int, default=0, help="Procesos de detección (0 = en este proceso)")
+    parser.add_argument('--ball-method', choices=('blobs', 'polar'),
+                        help="Búsqueda de la bola (por defecto detection.ball_method de settings.json)")
+    parser.add_argument('--max-frames', type=int)
+    parser.add_argument('--duration', type=float, help="Segundos de ejecución")
+    parser.add_argument('--no-db', action='store_true', help="No guardar en base de datos")
+    parser.add_argument('--perf-json', help="Guardar las métricas de rendimiento en JSON")
+    parser.add_argument('--store-detections', action='store_true',
+                        help="Guardar la detección de cada frame además de los giros")
+    parser.add_argument('--max-rate', action='store_true',
+                        help="Capturar en vivo sin ritmo adaptativo (capture.fps / idle_fps)")
+    args = parser.parse_args()
+
+    config_file = args.config or os.path.join(PROJECT_ROOT, 'config', 'settings.json')
+    result_provider = None
+    rotor_provider = None
+    if args.synthetic:
+        # Calcular el giro antes del bucle: en mitad de él pararía el proceso principal
+        synthetic_spin(args.seed)
+        result_provider = partial(synthetic_result, seed=args.seed)
+        # El rotor aún no se mide en la imagen: solo el giro sintético lo conoce
+        rotor_provider = partial(synthetic_rotor, seed=args.seed)
+    app = RoulettePredictor(config_file, headless=args.headless or args.bench, store=not args.no_db,
+                            store_detections=args.store_detections, result_provider=result_provider,
+                            rotor_provider=rotor_provider, ball_method=args.ball_method)
+    source_factory = build_source_factory(args, config_file)
+
+    try:
+        if args.workers > 0:
+            summary = app.run_pipeline(source_factory, args.workers, args.max_frames, args.duration)
+        else:
+            source = source_factory()
+            scheduler = None
+            if source.live and not args.max_rate:
+                # Solo en vivo: las repeticiones y el giro sintético ya traen su propio ritmo
+                scheduler = FrameScheduler(config_file, verbose=not app.headless)
+            summary = app.run(source, args.max_frames, args.duration, scheduler)
+            if scheduler is not None:
+                summary['schedule'] = scheduler.get_stats()
+    finally:
+        app.close()
+
+    print(f"✅ Frames: {summary['frames']}, rueda: {summary['detections']}, bola: {summary['balls']}, "
+          f"predicciones: {summary['predictions']}, giros: {summary['spins']}")
+    if summary['no_rotor']:
+        print(f"⚠️ {summary['no_rotor']} giros sin predicción: no hay estado del rotor")
+    print(f"📊 {summary['fps']:.1f} FPS en {summary['elapsed']:.2f}s")
+    if 'schedule' in summary:
+        frames = summary['schedule']['frames']
+        print(f"⏱️ Frames por fase: activa {frames['active']}, reposo {frames['idle']}, "
+              f"sin rueda {frames['absent']}; dormido {summary['schedule']['slept']:.1f}s")
+    if args.bench:
+        app.perf.print_report()
+    if args.perf_json:
+        app.perf.export_json(args.perf_json)
+        print(f"💾 Métricas guardadas en {args.perf_json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
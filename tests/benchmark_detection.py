@@ -0,0 +1,316 @@
+"""
+BENCHMARK DEL PIPELINE DE DETECCIÓN - Frames sintéticos o grabados
+
+Mide captura/conversión, detect_roulette (bloqueada y búsqueda completa),
+detect_ball (componentes en la pista y búsqueda polar 1-D), test_detection, BallTracker y PhysicsPredictor a 720p, 1080p
+y 1440p. Informa FPS, percentiles de latencia por llamada y memoria
+reservada por frame (pico transitorio medido con tracemalloc), guarda los
+resultados en JSON y los compara con una línea base. La línea base no se
+versiona (depende de la máquina): sin ella el benchmark avisa de que no
+ha comparado nada.
+
+Uso:
+    python tests/benchmark_detection.py
+    python tests/benchmark_detection.py --resolutions 720p --frames 60
+    python tests/benchmark_detection.py --replay grabacion.mp4
+    python tests/benchmark_detection.py --output resultados.json --save-baseline
+    python tests/benchmark_detection.py --baseline base.json --threshold 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# Agregar ruta del proyecto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.synthetic_roulette import SyntheticRoulette
+from core.roulette_detector import RouletteDetector
+from core.ball_tracker import BallTracker
+from core.physics_predictor import PhysicsPredictor
+from core.frame_source import ReplayFrameSource, MemoryFrameSource
+
+RESOLUTIONS = {
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '1440p': (2560, 1440),
+}
+
+# Complejidad de la escena sintética
+SCENES = {
+    'clean': {'noise_std': 0.0, 'highlight': 0.0},
+    'noisy': {'noise_std': 4.0, 'highlight': 120.0},
+}
+
+BENCHMARKS = ('capture_conversion', 'detect_roulette', 'search_roulette', 'detect_ball',
+              'detect_ball_polar', 'test_detection', 'ball_tracker', 'physics_predictor')
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+# Imita el objeto de mss para medir la conversión sin pantalla
+Screenshot = namedtuple('Screenshot', ['raw', 'width', 'height'])
+
+
+def measure(step, calls, warmup=5):
+    """Ejecutar step(i) `calls` veces: latencias (ns) y memoria reservada por llamada (bytes)"""
+    for i in range(min(warmup, calls)):
+        step(i)
+
+    latencies = np.empty(calls, dtype=np.int64)
+    for i in range(calls):
+        start = time.perf_counter_ns()
+        step(i)
+        latencies[i] = time.perf_counter_ns() - start
+
+    # Segunda pasada con tracemalloc (lo ralentiza, por eso va aparte)
+    alloc_calls = min(calls, 30)
+    allocated = np.empty(alloc_calls, dtype=np.int64)
+    tracemalloc.start()
+    try:
+        for i in range(alloc_calls):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            step(i)
+            allocated[i] = tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) / 1e6
+    mean_ms = latencies.mean() / 1e6
+    return {
+        'calls': calls,
+        'fps': 1000.0 / mean_ms if mean_ms > 0 else 0.0,
+        'mean_ms': float(mean_ms),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'max_ms': float(latencies.max() / 1e6),
+        'alloc_kb_per_call': float(allocated.mean() / 1024)
+    }
+
+
+def new_detector():
+    """Detector silencioso con la configuración del proyecto"""
+    detector = RouletteDetector()
+    detector.set_verbose(False)
+    return detector
+
+
+def load_frames(resolution, scene, count, seed):
+    """Frames sintéticos con sus etiquetas"""
+    width, height = RESOLUTIONS[resolution]
+    generator = SyntheticRoulette(width, height, seed=seed, **SCENES[scene])
+    source, labels = generator.to_frame_source(count=count)
+    return source.frames, [label['timestamp'] for label in labels], labels
+
+
+def load_replay(path, count):
+    """Frames grabados; las etiquetas se sustituyen por las detecciones del propio detector"""
+    source = ReplayFrameSource(path)
+    memory = MemoryFrameSource.from_source(source, max_frames=count)
+    source.close()
+    frames, timestamps = memory.frames, memory.timestamps.tolist()
+
+    detector = new_detector()
+    labels = []
+    for frame, timestamp in zip(frames, timestamps):
+        _, wheel, ball, _ = detector.test_detection(frame, timestamp)
+        labels.append({'wheel': wheel, 'ball': ball, 'timestamp': timestamp})
+    return frames, timestamps, labels
+
+
+def run_benchmarks(frames, timestamps, labels, selected):
+    """Medir cada etapa sobre el mismo conjunto de frames"""
+    results = {}
+    n = len(frames)
+    wheel = next((label['wheel'] for label in labels if label['wheel'] is not None), None)
+    wheel = tuple(int(round(v)) for v in wheel) if wheel is not None else None
+
+    if 'capture_conversion' in selected:
+        # Buffers BGRA como los entrega mss: vista sin copia + conversión a BGR
+        # en un buffer reutilizable (como ScreenCapture.capture_screen)
+        shots = []
+        for frame in frames[:min(n, 10)]:
+            bgra = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+            shots.append(Screenshot(bgra.tobytes(), bgra.shape[1], bgra.shape[0]))
+        bgr = np.empty_like(frames[0])
+
+        def step(i):
+            shot = shots[i % len(shots)]
+            view = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+            cv2.cvtColor(view, cv2.COLOR_BGRA2BGR, dst=bgr)
+        results['capture_conversion'] = measure(step, n)
+
+    if 'detect_roulette' in selected:
+        detector = new_detector()
+        results['detect_roulette'] = measure(lambda i: detector.detect_roulette(frames[i % n]), n)
+
+    if 'search_roulette' in selected:
+        detector = new_detector()
+
+        def step(i):
+            detector.reset_lock()
+            detector.detect_roulette(frames[i % n])
+        results['search_roulette'] = measure(step, min(n, 40))
+
+    if 'detect_ball' in selected and wheel is not None:
+        detector = new_detector()
+        results['detect_ball'] = measure(lambda i: detector.detect_ball(frames[i % n], wheel, draw=False), n)
+
+    if 'detect_ball_polar' in selected and wheel is not None:
+        # Misma búsqueda en toda la pista con la franja polar (tablas de remapeo cacheadas)
+        detector = new_detector()
+        detector.ball_params['method'] = 'polar'
+        results['detect_ball_polar'] = measure(
+            lambda i: detector.detect_ball(frames[i % n], wheel, draw=False), n)
+
+    if 'test_detection' in selected:
+        # Secuencia completa en orden: puerta de movimiento, bloqueo y seguimiento
+        state = {'detector': new_detector(), 'index': 0}
+
+        def step(i):
+            index = state['index']
+            if index == n:
+                state['detector'] = new_detector()
+                index = 0
+            state['detector'].test_detection(frames[index], timestamps[index])
+            state['index'] = index + 1
+        results['test_detection'] = measure(step, n, warmup=0)
+
+    tracker = BallTracker()
+    if ('ball_tracker' in selected or 'physics_predictor' in selected) and wheel is not None:
+        def step(i):
+            label = labels[i % n]
+            if i % n == 0:
+                tracker.reset()
+            tracker.update(label['ball'], wheel, timestamps[i % n])
+        if 'ball_tracker' in selected:
+            results['ball_tracker'] = measure(step, n, warmup=0)
+        else:
+            for i in range(n):
+                step(i)
+
+    if 'physics_predictor' in selected:
+        predictor = PhysicsPredictor(seed=0)
+        ball_state = tracker.get_state() or {
+            'angle': 0.3, 'angular_velocity': 14.0, 'angular_deceleration': 1.5}
+        results['physics_predictor'] = measure(lambda i: predictor.predict(ball_state), min(n, 100))
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Regresiones: casos cuyo p50 empeora más de `threshold` respecto a la línea base"""
+    regressions = []
+    for case, stages in results.items():
+        for stage, current in stages.items():
+            previous = baseline.get(case, {}).get(stage)
+            if not previous or previous['p50_ms'] <= 0:
+                continue
+            change = current['p50_ms'] / previous['p50_ms'] - 1.0
+            current['baseline_p50_ms'] = previous['p50_ms']
+            current['change'] = change
+            if change > threshold:
+                regressions.append((case, stage, previous['p50_ms'], current['p50_ms'], change))
+    return regressions
+
+
+def print_results(results):
+    """Tabla de resultados por caso"""
+    for case, stages in results.items():
+        print(f"\n📊 {case}")
+        print(f"  {'etapa':<20}{'FPS':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'KB/frame':>10}{'vs base':>9}")
+        for stage, r in stages.items():
+            change = f"{r['change'] * 100:+.0f}%" if 'change' in r else '-'
+            print(f"  {stage:<20}{r['fps']:>9.1f}{r['p50_ms']:>9.3f}{r['p95_ms']:>9.3f}"
+                  f"{r['p99_ms']:>9.3f}{r['alloc_kb_per_call']:>10.1f}{change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de detección")
+    parser.add_argument('--resolutions', default='720p,1080p,1440p')
+    parser.add_argument('--scenes', default='clean,noisy')
+    parser.add_argument('--benchmarks', default=','.join(BENCHMARKS))
+    parser.add_argument('--frames', type=int, default=120)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--replay', help="Vídeo o carpeta de imágenes en lugar de frames sintéticos")
+    parser.add_argument('--output', help="Guardar resultados en JSON")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="Guardar estos resultados como línea base")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Regresión máxima admitida (0.2 = +20%% en p50)")
+    args = parser.parse_args()
+
+    selected = set(args.benchmarks.split(','))
+    print("⏱️ BENCHMARK DEL PIPELINE DE DETECCIÓN")
+    print("=" * 50)
+
+    results = {}
+    if args.replay:
+        frames, timestamps, labels = load_replay(args.replay, args.frames)
+        height, width = frames[0].shape[:2]
+        case = f"replay/{os.path.basename(os.path.normpath(args.replay))}/{width}x{height}"
+        print(f"🎞️ {case}: {len(frames)} frames")
+        results[case] = run_benchmarks(frames, timestamps, labels, selected)
+    else:
+        for resolution in args.resolutions.split(','):
+            for scene in args.scenes.split(','):
+                case = f"{resolution}/{scene}"
+                print(f"🎨 Generando {case} ({args.frames} frames)...")
+                frames, timestamps, labels = load_frames(resolution, scene, args.frames, args.seed)
+                results[case] = run_benchmarks(frames, timestamps, labels, selected)
+
+    regressions = []
+    compared = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f).get('results', {})
+        regressions = compare(results, baseline, args.threshold)
+        compared = sum('change' in r for stages in results.values() for r in stages.values())
+
+    print_results(results)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'frames': args.frames,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Resultados guardados en {args.output}")
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Línea base guardada en {args.baseline}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regresiones por encima del {args.threshold * 100:.0f}%:")
+        for case, stage, before, after, change in regressions:
+            print(f"  {case} {stage}: {before:.3f}ms -> {after:.3f}ms ({change * 100:+.0f}%)")
+        sys.exit(1)
+    if args.save_baseline:
+        return
+    if not os.path.exists(args.baseline):
+        # La línea base no se versiona: depende de la máquina donde se genera
+        print(f"\n⚠️ Sin comparación: no existe la línea base {args.baseline}")
+        print("   Genérala en la máquina de referencia con --save-baseline")
+    elif compared == 0:
+        print(f"\n⚠️ Sin comparación: ningún caso de {args.baseline} coincide con esta ejecución")
+    else:
+        print(f"\n✅ Sin regresiones en {compared} medidas comparadas con la línea base")
+
+
+if __name__ == "__main__":
+    main()
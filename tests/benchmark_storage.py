@@ -0,0 +1,121 @@
+"""
+BENCHMARK DE ESCRITURA - MySQL frente a SQLite (WAL)
+
+Mide en cada backend disponible el camino de escritura: giro suelto con
+commit (insert_spin), lote de detecciones con executemany + commit (lo que
+hace AsyncDBWriter) y la consulta de un parámetro aprendido. Las filas de
+prueba llevan tiempos negativos y se borran al terminar. Si MySQL no está
+disponible solo se mide SQLite.
+
+Uso:
+    python tests/benchmark_storage.py
+    python tests/benchmark_storage.py --backends sqlite --rows 50000
+    python tests/benchmark_storage.py --sqlite-path /tmp/bench.db
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Agregar ruta del proyecto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.storage_backend import create_database_manager
+from database.async_writer import TABLE_COLUMNS
+
+BACKENDS = ('mysql', 'sqlite')
+
+
+def latencies_ms(step, calls):
+    """Percentiles de latencia de step(i) en ms"""
+    samples = np.empty(calls, dtype=np.int64)
+    for i in range(calls):
+        start = time.perf_counter_ns()
+        step(i)
+        samples[i] = time.perf_counter_ns() - start
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) / 1e6
+    return {'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99),
+            'mean_ms': float(samples.mean() / 1e6)}
+
+
+def run_backend(db, rows, batch_size, single_calls):
+    """Medir las tres operaciones en un backend ya conectado"""
+    results = {}
+
+    results['insert_spin'] = latencies_ms(
+        lambda i: db.insert_spin(None, -1.0 - i, i % 37, confidence=0.1), single_calls)
+
+    statement = db.insert_statement('detections', TABLE_COLUMNS['detections'])
+    batch = [(None, -1.0 - i, 640, 360, 216, 600, 500, True) for i in range(batch_size)]
+    batches = max(1, rows // batch_size)
+    with db.checkout() as conn:
+        def step(i):
+            db.insert_many(conn, statement, batch)
+            conn.commit()
+        batch_stats = latencies_ms(step, batches)
+    batch_stats['rows_per_s'] = batch_size / (batch_stats['mean_ms'] / 1000.0)
+    results['detections_batch'] = batch_stats
+
+    db.set_parameter('benchmark_parameter', 1.0)
+    results['get_parameter'] = latencies_ms(
+        lambda i: db.get_parameter('benchmark_parameter'), single_calls)
+
+    # Limpiar las filas de prueba
+    with db.cursor(commit=True) as cursor:
+        cursor.execute("DELETE FROM spins WHERE spin_time < 0")
+        cursor.execute("DELETE FROM detections WHERE frame_time < 0")
+        cursor.execute("DELETE FROM learned_parameters WHERE parameter_name = 'benchmark_parameter'")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de escritura de los backends de base de datos")
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--rows', type=int, default=20000, help="Detecciones escritas en lotes")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--calls', type=int, default=200, help="Giros sueltos y consultas")
+    parser.add_argument('--sqlite-path', help="Fichero SQLite (por defecto uno temporal)")
+    args = parser.parse_args()
+
+    print("⏱️ BENCHMARK DE ESCRITURA EN BASE DE DATOS")
+    print("=" * 50)
+
+    results = {}
+    for backend in args.backends.split(','):
+        if backend == 'sqlite':
+            path = args.sqlite_path or os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+            db = create_database_manager(backend=backend, path=path)
+            print(f"📁 SQLite en {db.path}")
+        else:
+            db = create_database_manager(backend=backend)
+        try:
+            with db.checkout():
+                pass
+        except db.Error as e:
+            print(f"⚠️ {backend} no disponible: {e}")
+            continue
+        try:
+            results[backend] = run_backend(db, args.rows, args.batch_size, args.calls)
+        except db.Error as e:
+            print(f"❌ Error midiendo {backend}: {e}")
+        finally:
+            db.close()
+
+    for backend, stages in results.items():
+        print(f"\n📊 {backend}")
+        print(f"  {'operación':<20}{'p50':>9}{'p95':>9}{'p99':>9}{'filas/s':>12}")
+        for stage, r in stages.items():
+            rate = f"{r['rows_per_s']:.0f}" if 'rows_per_s' in r else '-'
+            print(f"  {stage:<20}{r['p50_ms']:>9.3f}{r['p95_ms']:>9.3f}{r['p99_ms']:>9.3f}{rate:>12}")
+
+    if 'mysql' in results and 'sqlite' in results:
+        for stage in ('insert_spin', 'detections_batch'):
+            ratio = results['mysql'][stage]['p50_ms'] / max(results['sqlite'][stage]['p50_ms'], 1e-9)
+            print(f"\n🎯 {stage}: SQLite {ratio:.1f}x más rápido que MySQL (p50)")
+
+
+if __name__ == "__main__":
+    main()
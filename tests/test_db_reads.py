@@ -0,0 +1,50 @@
+import sys
+import os
+import time
+import tracemalloc
+
+# Agregar la carpeta raíz al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.storage_backend import create_database_manager
+
+def main():
+    print("📚 Prueba de lecturas por bloques del histórico de giros...")
+
+    try:
+        db = create_database_manager()
+
+        # Recorrer todos los giros leyendo solo dos columnas, 5000 filas por bloque
+        tracemalloc.start()
+        start = time.perf_counter()
+        counts = [0] * 37
+        rows = 0
+        for chunk in db.iter_chunks('spins', ('id', 'result_number'), chunk_size=5000):
+            for _, number in chunk:
+                counts[number] += 1
+            rows += len(chunk)
+        elapsed = time.perf_counter() - start
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        print(f"✅ {rows} giros leídos en {elapsed:.2f}s, pico de memoria {peak_mb:.1f}MB")
+        if rows:
+            hot = max(range(37), key=counts.__getitem__)
+            print(f"🎯 Número más frecuente: {hot} ({counts[hot]} veces)")
+
+        # Paginación por clave para listados (p. ej. la GUI)
+        page, after = db.fetch_page('spins', ('id', 'spin_time', 'result_number'),
+                                    page_size=10, descending=True)
+        print(f"📄 Última página: {len(page)} giros, siguiente página tras id {after}")
+
+        # Carga por bloques en pandas
+        frames = 0
+        for df in db.iter_dataframes('spins', ('spin_time', 'result_number'), chunk_size=20000):
+            frames += 1
+        print(f"🐼 {frames} bloques de DataFrame")
+        db.close()
+
+    except Exception as e:
+        print(f"❌ Error en prueba de lecturas: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import sys
+import os
+import time
+import tempfile
+
+# Agregar la carpeta raíz al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.storage_backend import create_database_manager
+from database.async_writer import AsyncDBWriter
+
+def open_backend():
+    """Backend configurado, o el indicado como argumento (sqlite en un archivo temporal)"""
+    backend = sys.argv[1] if len(sys.argv) > 1 else None
+    if backend == 'sqlite':
+        path = os.path.join(tempfile.mkdtemp(), 'test_writer.db')
+        return create_database_manager(backend=backend, path=path)
+    return create_database_manager(backend=backend)
+
+def check_rejected_batch(db):
+    """Una fila inválida no debe bloquear las escrituras siguientes"""
+    writer = AsyncDBWriter(db, batch_size=500, flush_interval=0.5)
+    writer.start()
+
+    # result_number NOT NULL: error permanente, reintentar no lo arregla
+    writer.write('spins', (None, time.time(), None, None, None, None, None, None, None))
+    rejected_flush = writer.flush(timeout=10.0)
+    for _ in range(100):
+        writer.write_detection(time.time(), (640, 360, 216), None)
+    later_flush = writer.flush(timeout=10.0)
+    writer.close()
+
+    stats = writer.get_stats()
+    print(f"📊 Lote inválido: rechazadas {stats['rejected']}, escritas después {stats['written']}, "
+          f"en dead_letters {len(writer.dead_letters)}")
+    if (not rejected_flush and later_flush and stats['rejected'] == 1
+            and stats['written'] == 100 and len(writer.dead_letters) == 1):
+        print("✅ Lote con error permanente descartado sin bloquear la cola")
+    else:
+        print("❌ El lote inválido no se trató como error permanente")
+
+def main():
+    print("🗄️ Prueba del escritor asíncrono de base de datos...")
+
+    try:
+        db = open_backend()
+        writer = AsyncDBWriter(db, batch_size=500, flush_interval=0.5)
+        writer.start()
+
+        # Simular el bucle de frames: 3000 detecciones a ritmo libre
+        rows = 3000
+        start = time.perf_counter_ns()
+        for i in range(rows):
+            writer.write_detection(time.time(), (640, 360, 216), (600, 500) if i % 3 else None)
+        enqueue_us = (time.perf_counter_ns() - start) / rows / 1000
+        print(f"⏱️ Coste por fila en el bucle: {enqueue_us:.2f}µs")
+
+        writer.write_spin(time.time(), 17, predicted_number=20, confidence=0.12)
+        flushed = writer.flush(timeout=10.0)
+        lost = writer.close()
+
+        stats = writer.get_stats()
+        print(f"📊 Escritas: {stats['written']}, descartadas: {stats['dropped']}, "
+              f"perdidas al cerrar: {lost}, lotes: {stats['batches']}, errores: {stats['errors']}")
+        print(f"📊 Lote medio: {stats['mean_flush_ms']:.1f}ms, máximo: {stats['max_flush_ms']:.1f}ms")
+
+        if flushed and stats['written'] == rows + 1:
+            print("✅ Todas las filas escritas")
+        else:
+            print("❌ No se escribieron todas las filas")
+
+        check_rejected_batch(db)
+
+    except Exception as e:
+        print(f"❌ Error en prueba del escritor: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import sys
+import os
+import time
+
+import numpy as np
+
+# Agregar la carpeta raíz al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.frame_scheduler import FrameScheduler
+from core.motion_gate import MotionGate
+
+WHEEL = (640, 360, 216)
+
+def main():
+    print("⏱️ Prueba del ritmo de captura adaptativo...")
+
+    try:
+        scheduler = FrameScheduler(fps=20, verbose=True)
+        scheduler.schedule_params.update({'idle_fps': 5, 'active_hold': 0.3,
+                                          'absent_max_interval': 0.8})
+
+        # Guion de fases: reposo → giro → reposo → mesa desaparece → vuelve
+        script = ([(WHEEL, None, MotionGate.STATIC)] * 4 +
+                  [(WHEEL, (800, 360), MotionGate.MOVING)] * 40 +
+                  [(WHEEL, None, MotionGate.STATIC)] * 8 +
+                  [(None, None, None)] * 8 +
+                  [(WHEEL, (800, 360), MotionGate.MOVING)] * 5)
+
+        rng = np.random.default_rng(0)
+        stamps = []
+        phases = []
+        start = time.perf_counter()
+        for wheel, ball, motion in script:
+            stamps.append(time.perf_counter())
+            # Tiempo de proceso variable (2-20 ms) que no debe alterar el intervalo
+            time.sleep(rng.uniform(0.002, 0.02))
+            phases.append(scheduler.update(wheel, ball, motion))
+            scheduler.wait()
+        elapsed = time.perf_counter() - start
+
+        stamps = np.array(stamps)
+        phases = np.array(phases)
+        intervals = np.diff(stamps)
+        active = intervals[(phases[:-1] == 'active') & (phases[1:] == 'active')]
+        print(f"📊 Intervalo en fase activa: media {active.mean() * 1000:.1f} ms, "
+              f"desviación {active.std() * 1000:.2f} ms (objetivo 50 ms)")
+
+        absent = intervals[phases[:-1] == 'absent']
+        print(f"📊 Intervalos sin rueda: {', '.join(f'{v:.2f}s' for v in absent)}")
+
+        stats = scheduler.get_stats()
+        print(f"📊 Frames por fase: {stats['frames']}, dormido {stats['slept']:.2f}s "
+              f"de {elapsed:.2f}s, retrasos {stats['overruns']}")
+
+        if abs(active.mean() - 0.05) < 0.005 and absent[-1] >= absent[0]:
+            print("✅ Ritmo regular en giro y espera creciente sin rueda")
+        else:
+            print("❌ El ritmo no coincide con lo esperado")
+
+    except Exception as e:
+        print(f"❌ Error en la prueba del ritmo de captura: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Agregar la carpeta raíz al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.learning_engine import LearningEngine
+from core.physics_predictor import NUM_POCKETS
+
+SPINS = 5000
+
+def new_engine(capacity):
+    """Motor con una ventana de `capacity` giros"""
+    engine = LearningEngine()
+    engine.capacity = capacity
+    engine.reset()
+    return engine
+
+def brute_force(engine, history):
+    """Recalcular desde cero todo lo que el motor mantiene de forma incremental"""
+    window = history[-engine.capacity:]
+    numbers = np.array([number for number, _ in window])
+    residuals = np.array([engine.wheel_distance(predicted, number)
+                          for number, predicted in window if predicted is not None], dtype=np.int64)
+
+    decay = engine.learning_params['decay']
+    bias = np.full(NUM_POCKETS, 1.0 / NUM_POCKETS)
+    for number, _ in history:
+        bias *= (1.0 - decay)
+        bias[number] += decay
+
+    return {
+        'window_counts': np.bincount(numbers, minlength=NUM_POCKETS),
+        'sector_counts': np.bincount(engine.pocket_sector[numbers],
+                                     minlength=engine.learning_params['num_sectors']),
+        'residual_counts': np.bincount(residuals + NUM_POCKETS // 2, minlength=NUM_POCKETS),
+        'residual_mean': residuals.mean() if len(residuals) else 0.0,
+        'residual_std': residuals.std() if len(residuals) else 0.0,
+        'bias': bias / bias.sum(),
+    }
+
+def compare(engine, history):
+    """Diferencias entre el estado incremental y el recalculado (lista vacía si coinciden)"""
+    expected = brute_force(engine, history)
+    residual_stats = engine.get_residual_stats()
+    errors = []
+    for key in ('window_counts', 'sector_counts', 'residual_counts'):
+        if not np.array_equal(getattr(engine, key), expected[key]):
+            errors.append(key)
+    if not np.isclose(residual_stats['mean'], expected['residual_mean']):
+        errors.append('residual_mean')
+    if not np.isclose(residual_stats['std'], expected['residual_std']):
+        errors.append('residual_std')
+    if not np.allclose(engine.get_bias(), expected['bias'], rtol=1e-9, atol=1e-12):
+        errors.append('bias')
+    return errors
+
+def update_cost_us(capacity, spins=20000):
+    """Coste medio (µs) de record_spin con una ventana llena de `capacity` giros"""
+    engine = new_engine(capacity)
+    rng = np.random.default_rng(1)
+    numbers = rng.integers(0, NUM_POCKETS, size=capacity + spins)
+    for number in numbers[:capacity]:
+        engine.record_spin(number, number)
+    start = time.perf_counter_ns()
+    for number in numbers[capacity:]:
+        engine.record_spin(number, number)
+    return (time.perf_counter_ns() - start) / spins / 1000
+
+def main():
+    print("🧠 Prueba del aprendizaje incremental frente a un recálculo completo...")
+
+    try:
+        rng = np.random.default_rng(7)
+        engine = new_engine(capacity=200)
+        history = []
+        mismatches = 0
+        # Sesgo hacia algunos números para que el ajuste tenga algo que aprender
+        weights = np.ones(NUM_POCKETS)
+        weights[[17, 32, 5]] = 3.0
+        weights /= weights.sum()
+        for i in range(SPINS):
+            number = int(rng.choice(NUM_POCKETS, p=weights))
+            predicted = int(rng.integers(NUM_POCKETS)) if rng.random() < 0.7 else None
+            engine.record_spin(number, predicted)
+            history.append((number, predicted))
+            # Comprobar a menudo al principio (ventana llenándose) y después cada 97 giros
+            if i < 300 or i % 97 == 0 or i == SPINS - 1:
+                errors = compare(engine, history)
+                if errors:
+                    mismatches += 1
+                    if mismatches <= 3:
+                        print(f"❌ Giro {i}: difiere {', '.join(errors)}")
+        print(f"📊 {SPINS} giros, ventana de {engine.capacity}, escala del sesgo {engine.bias_scale:.3g}")
+
+        # Guardar y restaurar el estado reproduce la misma ventana
+        restored = new_engine(capacity=200)
+        restored.load_state(engine.get_state())
+        restored_errors = compare(restored, history)
+
+        probabilities = np.full(NUM_POCKETS, 1.0 / NUM_POCKETS)
+        adjusted = engine.adjust_probabilities(probabilities)
+        print(f"🎯 Ajuste de una distribución uniforme: más probable {int(adjusted.argmax())}, "
+              f"suma {adjusted.sum():.6f}")
+
+        # O(1): el coste por giro no depende del tamaño de la ventana
+        small = update_cost_us(100)
+        large = update_cost_us(100000)
+        print(f"⏱️ record_spin: {small:.2f}µs con ventana de 100, {large:.2f}µs con ventana de 100000")
+
+        if mismatches == 0 and not restored_errors:
+            print("✅ El estado incremental coincide con el recálculo completo")
+        else:
+            print(f"❌ {mismatches} comprobaciones con diferencias, restauración: {restored_errors or 'ok'}")
+        if large < 3 * small:
+            print("✅ Coste por giro independiente del tamaño de la ventana")
+        else:
+            print("❌ El coste por giro crece con la ventana")
+
+    except Exception as e:
+        print(f"❌ Error en prueba del aprendizaje: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()
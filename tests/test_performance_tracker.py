@@ -0,0 +1,143 @@
+import sys
+import os
+import re
+import threading
+import numpy as np
+
+# Agregar la carpeta raíz al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.performance_tracker import PerformanceTracker, PROMETHEUS_BUCKETS
+
+SAMPLES = 50000
+SUB_BUCKETS = 8
+
+# Línea de una muestra en formato de texto de Prometheus: nombre{etiquetas} valor
+SAMPLE_LINE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)\{([^}]*)\} (\S+)$')
+
+def latencies_ns(rng):
+    """Latencias con la forma habitual: cuerpo lognormal y cola larga"""
+    body = rng.lognormal(mean=np.log(2e6), sigma=0.5, size=SAMPLES)
+    tail = rng.pareto(1.5, size=SAMPLES // 50) * 5e6 + 10e6
+    return np.concatenate([body, tail]).astype(np.int64)
+
+def check_percentiles(tracker, stage, durations):
+    """Error relativo de p50/p95/p99 frente a numpy.percentile"""
+    errors = {}
+    for q in (50, 95, 99):
+        expected = np.percentile(durations, q) / 1e6
+        value = tracker.percentile(stage, q)
+        errors[q] = abs(value - expected) / expected
+        print(f"📊 p{q}: {value:.3f}ms (numpy {expected:.3f}ms, error {errors[q] * 100:.1f}%)")
+    return errors
+
+def check_prometheus(text, stage, durations):
+    """Errores de formato o de contenido en la exportación de Prometheus"""
+    problems = []
+    name = 'ruleta_stage_latency_seconds'
+    lines = text.rstrip('\n').split('\n')
+    if f'# TYPE {name} histogram' not in lines:
+        problems.append('falta # TYPE histogram')
+
+    buckets = []
+    values = {}
+    for line in lines:
+        if line.startswith('#'):
+            continue
+        match = SAMPLE_LINE.match(line)
+        if match is None:
+            problems.append(f'línea no válida: {line}')
+            continue
+        metric, labels, value = match.groups()
+        labels = dict(re.findall(r'(\w+)="([^"]*)"', labels))
+        if labels.get('stage') != stage:
+            continue
+        if metric == f'{name}_bucket':
+            buckets.append((labels['le'], int(value)))
+        else:
+            values[metric] = float(value)
+
+    # Buckets en orden, acumulados, y +Inf igual al total
+    expected_le = [str(le) for le in PROMETHEUS_BUCKETS] + ['+Inf']
+    if [le for le, _ in buckets] != expected_le:
+        problems.append('límites de bucket desordenados o incompletos')
+    counts = [count for _, count in buckets]
+    if any(b < a for a, b in zip(counts, counts[1:])):
+        problems.append('buckets no acumulados')
+    if counts and counts[-1] != len(durations):
+        problems.append(f'+Inf {counts[-1]} != {len(durations)}')
+    if values.get(f'{name}_count') != len(durations):
+        problems.append('_count no coincide')
+    if not np.isclose(values.get(f'{name}_sum', 0.0), durations.sum() / 1e9, rtol=1e-6):
+        problems.append('_sum no coincide')
+
+    # Cada bucket cuenta lo que cabe en `le`, con el error de los buckets finos
+    for (le, count) in buckets[:-1]:
+        limit = float(le) * 1e9
+        upper = np.count_nonzero(durations <= limit)
+        lower = np.count_nonzero(durations < limit * (1 - 1 / SUB_BUCKETS))
+        if not lower <= count <= upper:
+            problems.append(f'bucket le={le}: {count} fuera de [{lower}, {upper}]')
+    return problems
+
+def check_threads(threads=3, per_thread=100000):
+    """Registrar desde varios hilos mientras se exporta: no se pierde ninguna medida"""
+    tracker = PerformanceTracker(sub_buckets=SUB_BUCKETS)
+
+    def producer():
+        for i in range(per_thread):
+            tracker.record('capture', 1000 + i % 5000)
+
+    workers = [threading.Thread(target=producer) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    exports = 0
+    while any(worker.is_alive() for worker in workers):
+        tracker.export_prometheus()
+        tracker.snapshot()
+        exports += 1
+    for worker in workers:
+        worker.join()
+    recorded = tracker.get_summary()['capture']['count']
+    print(f"🧵 {threads} hilos: {recorded} medidas de {threads * per_thread}, {exports} exportaciones")
+    return recorded == threads * per_thread
+
+def main():
+    print("📊 Prueba del registro de rendimiento frente a numpy...")
+
+    try:
+        rng = np.random.default_rng(11)
+        durations = latencies_ns(rng)
+        tracker = PerformanceTracker(sub_buckets=SUB_BUCKETS)
+        for duration in durations:
+            tracker.record('wheel_detection', int(duration))
+
+        summary = tracker.get_summary()['wheel_detection']
+        print(f"📊 {summary['count']} medidas, media {summary['mean_ms']:.3f}ms "
+              f"(numpy {durations.mean() / 1e6:.3f}ms)")
+        errors = check_percentiles(tracker, 'wheel_detection', durations)
+        problems = check_prometheus(tracker.export_prometheus(), 'wheel_detection', durations)
+        threads_ok = check_threads()
+
+        # Los buckets log-lineales garantizan un error relativo menor que 1/sub_buckets
+        if max(errors.values()) < 1 / SUB_BUCKETS:
+            print(f"✅ Percentiles dentro del {100 / SUB_BUCKETS:.1f}% de numpy.percentile")
+        else:
+            print("❌ Percentiles fuera de la tolerancia de los buckets")
+        if not problems:
+            print("✅ Exportación de Prometheus válida y coherente con las medidas")
+        else:
+            for problem in problems[:5]:
+                print(f"❌ Prometheus: {problem}")
+        if threads_ok:
+            print("✅ Sin medidas perdidas con varios hilos")
+        else:
+            print("❌ Se perdieron medidas con varios hilos")
+
+    except Exception as e:
+        print(f"❌ Error en prueba de rendimiento: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import sys
+import os
+
+# Agregar la carpeta raíz al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.physics_predictor import PhysicsPredictor
+
+def main():
+    print("🎲 Iniciando prueba del predictor físico...")
+    
+    try:
+        predictor = PhysicsPredictor(seed=42)
+        print("✅ Predictor inicializado correctamente")
+        
+        # Predicción de ejemplo con un estado típico de bola y rotor
+        ball_state = {'angle': 0.3, 'angular_velocity': 14.0, 'angular_deceleration': 1.5,
+                      'velocity_std': 0.3, 'deceleration_std': 0.2}
+        rotor_state = {'angle': 1.0, 'angular_velocity': -3.0, 'angular_deceleration': 0.05}
+        
+        result = predictor.predict(ball_state, rotor_state)
+        probabilities = result['probabilities']
+        print(f"🎯 Número más probable: {result['most_likely']} ({result['confidence']*100:.1f}%)")
+        print(f"⏱️ Caída estimada en {result['drop_time']:.2f}s - {result['samples']} muestras")
+        print(f"📊 Suma de probabilidades: {probabilities.sum():.3f}")
+        print(f"🔢 Vecinos: {predictor.neighbors(result['most_likely'])}")
+        
+        # Latencia por giro frente al presupuesto configurado
+        print("🧪 Midiendo latencia de predicción...")
+        stats = predictor.benchmark(runs=200)
+        print(f"📊 p50: {stats['p50_ms']:.2f}ms | p95: {stats['p95_ms']:.2f}ms | p99: {stats['p99_ms']:.2f}ms")
+        
+        if stats['within_budget']:
+            print(f"✅ Dentro del presupuesto de {stats['budget_ms']:.0f}ms")
+        else:
+            print(f"❌ Fuera del presupuesto de {stats['budget_ms']:.0f}ms")
+            
+    except Exception as e:
+        print(f"❌ Error en prueba de predicción: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import sys
+import os
+
+# Agregar la carpeta raíz al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.frame_source import ReplayFrameSource, MemoryFrameSource
+from core.roulette_detector import RouletteDetector
+
+def main():
+    print("🎞️ Prueba de detección sobre una grabación (sin pantalla)...")
+
+    if len(sys.argv) < 2:
+        print("❌ Uso: python tests/test_replay_detection.py <video|carpeta_de_imagenes> [--realtime]")
+        return
+
+    try:
+        realtime = '--realtime' in sys.argv
+        source = ReplayFrameSource(sys.argv[1], realtime=realtime)
+        detector = RouletteDetector()
+        detector.set_verbose(False)
+
+        # Pasada 1: lectura desde disco (incluye decodificación)
+        stats = detector.live_detection_test(source, duration=None, show=False)
+        print(f"📊 Desde disco: {stats['fps']:.1f} FPS")
+
+        # Pasada 2: frames en memoria, solo coste de detección
+        source = ReplayFrameSource(sys.argv[1])
+        frames = MemoryFrameSource.from_source(source)
+        source.close()
+        detector = RouletteDetector()
+        detector.set_verbose(False)
+        stats = detector.live_detection_test(frames, duration=None, show=False)
+        print(f"📊 En memoria: {stats['fps']:.1f} FPS")
+
+    except Exception as e:
+        print(f"❌ Error en prueba de repetición: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import sys
+import os
+
+# Agregar la carpeta raíz al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.roulette_detector import RouletteDetector
+from core.spin_state import SpinStateMachine
+from core.synthetic_roulette import SyntheticRoulette
+
+def main():
+    print("🎯 Prueba del ciclo de giro sobre un giro sintético...")
+
+    try:
+        detector = RouletteDetector()
+        detector.set_verbose(False)
+        machine = SyntheticRoulette(1280, 720, noise_std=3.0, seed=2)
+        spin_state = SpinStateMachine(tracker=detector.ball_tracker, verbose=True)
+
+        # Giro completo y 8 s más con la bola quieta en su bolsillo
+        truth = machine.spin
+        events = []
+        frames = 0
+        for frame, label in machine.frames(duration=truth['settle_time'] + 8.0):
+            timestamp = label['timestamp']
+            detect_ball = spin_state.ball_detection_due(timestamp)
+            wheel, _, _, _ = detector.detect_frame(frame, timestamp, detect_ball)
+            for event in spin_state.update(timestamp, wheel, detector.ball_tracker.get_state(),
+                                           detect_ball):
+                events.append(event)
+                if event.kind == 'spin_result':
+                    spin_state.report_result(truth['result'])
+            frames += 1
+
+        for event in events:
+            print(f"📊 {event.timestamp:6.2f}s  {event.kind:<14} giro {event.spin_id}")
+        print(f"📊 Caída real {truth['drop_time']:.2f}s, asentamiento {truth['settle_time']:.2f}s")
+
+        stats = spin_state.get_stats()
+        print(f"📊 Frames por fase: " +
+              ", ".join(f"{phase} {stats[phase]}" for phase in SpinStateMachine.PHASE_STAGES))
+        print(f"📊 Búsquedas de bola: {stats['ball_searches']} de {frames} frames "
+              f"({stats['ball_searches'] / frames * 100:.0f}%)")
+
+        kinds = [event.kind for event in events]
+        if kinds == ['spin_start', 'decelerating', 'ball_dropped', 'spin_result']:
+            print("✅ Un giro completo, sin falsos lanzamientos con la bola en el bolsillo")
+        else:
+            print(f"❌ Secuencia de eventos inesperada: {kinds}")
+
+    except Exception as e:
+        print(f"❌ Error en la prueba del ciclo de giro: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import sys
+import os
+import numpy as np
+
+# Agregar la carpeta raíz al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.synthetic_roulette import SyntheticRoulette
+from core.roulette_detector import RouletteDetector
+
+def main():
+    print("🎨 Prueba de detección sobre un giro sintético...")
+
+    try:
+        generator = SyntheticRoulette(1280, 720, noise_std=3.0, highlight=80, seed=7)
+        source, labels = generator.to_frame_source()
+        print(f"✅ Giro generado: {len(labels)} frames, resultado real {generator.spin['result']}")
+
+        total = len(labels)
+        # Mismo giro con cada método de búsqueda de la bola
+        for method in ('blobs', 'polar'):
+            detector = RouletteDetector()
+            detector.set_verbose(False)
+            detector.ball_params['method'] = method
+            source.rewind()
+
+            wheel_hits = 0
+            ball_hits = 0
+            ball_errors = []
+            for (frame, timestamp), label in zip(source, labels):
+                wheel, ball, _, _ = detector.detect_frame(frame, timestamp)
+                score = generator.score(label, wheel, ball)
+                wheel_hits += score['wheel_found'] and score['center_error'] <= 2.0
+                ball_hits += score['ball_hit']
+                if 'ball_error' in score:
+                    ball_errors.append(score['ball_error'])
+
+            print(f"🔎 Método '{method}'")
+            print(f"🎯 Rueda: {wheel_hits}/{total} ({wheel_hits / total * 100:.1f}%)")
+            print(f"⚪ Bola: {ball_hits}/{total} ({ball_hits / total * 100:.1f}%)")
+            if ball_errors:
+                print(f"📏 Error medio de la bola: {np.mean(ball_errors):.2f}px")
+
+        if len(sys.argv) > 1:
+            # Guardar un frame de ejemplo para inspección visual
+            import cv2
+            frame, _ = generator.render(labels[len(labels) // 2]['timestamp'])
+            cv2.imwrite(sys.argv[1], frame)
+            print(f"💾 Frame de ejemplo guardado en {sys.argv[1]}")
+
+    except Exception as e:
+        print(f"❌ Error en prueba sintética: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()